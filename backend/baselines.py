@@ -0,0 +1,212 @@
+"""
+Per-role baseline roadmaps — generated offline, personalized per request.
+
+Features:
+  - `python baselines.py` pre-generates a full roadmap (Call 1 + Call 2 for a
+    generic entry-level profile) for every role in roles.json into
+    data/baselines.json; roles that fail are skipped, existing ones kept
+  - get_baseline(role): deep copy of the stored roadmap, or None
+  - fallback_roadmap(role): the role's baseline, else the static mock — used
+    whenever the LLM fails, so the fallback matches the requested role
+  - select_days(): which baseline days to rewrite for a student — days on
+    their critical/important gaps, and days spent on skills they already have
+"""
+import argparse
+import asyncio
+import copy
+import json
+import re
+import threading
+import time
+from pathlib import Path
+
+from config import env
+from mock_data import MOCK_ROADMAP_RESPONSE
+from log_config import get_logger
+
+
+BASELINES_PATH = Path(env("BASELINES_PATH", str(Path(__file__).parent / "data" / "baselines.json")))
+PERSONALIZE_MAX_DAYS = int(env("PERSONALIZE_MAX_DAYS", "10"))
+
+# Who the baseline is written for — personalization adjusts from here
+BASELINE_PROFILE = (
+    "Generic entry-level candidate: computer science student with intermediate Python, "
+    "basic Git and SQL, a few coursework projects and no professional experience in this role."
+)
+
+KNOWN_LEVELS = ("intermediate", "advanced")
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+_STOPWORDS = {"and", "the", "for", "with", "basics", "basic", "fundamentals", "skills", "advanced"}
+
+logger = get_logger("baselines")
+
+_lock = threading.Lock()
+_baselines: dict | None = None
+
+
+# ── Storage ─────────────────────────────────────────────────────
+def load_baselines(path: Path = BASELINES_PATH) -> dict:
+    """{role: roadmap} from disk; empty if baselines were never generated."""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("roles", {})
+
+
+def _all() -> dict:
+    global _baselines
+    with _lock:
+        if _baselines is None:
+            _baselines = load_baselines()
+            logger.info("Loaded %d baseline roadmaps", len(_baselines))
+        return _baselines
+
+
+def reset_baselines(baselines: dict | None = None) -> None:
+    """Replace the in-memory baselines (None = reload from disk on next use)."""
+    global _baselines
+    with _lock:
+        _baselines = baselines
+
+
+def discard_baselines(roles: set[str]) -> None:
+    """Stop serving baselines for roles whose catalog entry changed (until regenerated)."""
+    stale = [r for r in roles if r in _all()]
+    if not stale:
+        return
+    with _lock:
+        for dream_role in stale:
+            _baselines.pop(dream_role, None)
+    logger.warning("Baselines dropped after a catalog change — regenerate with: python baselines.py %s",
+                   " ".join(f"--role {r!r}" for r in stale))
+
+
+def get_baseline(dream_role: str) -> dict | None:
+    baseline = _all().get(dream_role)
+    return copy.deepcopy(baseline) if baseline else None
+
+
+def fallback_roadmap(dream_role: str) -> dict:
+    """What to serve when the LLM fails: the role's baseline, else the static mock."""
+    return get_baseline(dream_role) or copy.deepcopy(MOCK_ROADMAP_RESPONSE)
+
+
+# ── Day selection ───────────────────────────────────────────────
+def _alternatives(skill: str) -> list[set[str]]:
+    """"PyTorch/TensorFlow" → [{"pytorch"}, {"tensorflow"}]; each set must fully match."""
+    alternatives = []
+    for part in re.split(r"[/,(]| or ", skill.lower()):
+        words = {w for w in _WORD_RE.findall(part) if len(w) > 2 and w not in _STOPWORDS}
+        if words:
+            alternatives.append(words)
+    return alternatives
+
+
+def text_words(text: str) -> set[str]:
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def mentions(words: set[str], skill: str) -> bool:
+    """Whether text (as text_words) covers one of the skill's alternatives."""
+    return any(alt <= words for alt in _alternatives(skill))
+
+
+def _day_words(day: dict) -> set[str]:
+    return text_words(f"{day.get('objective', '')} {day.get('task', '')}")
+
+
+def classify_days(days: list[dict], gaps: list[str], known: list[str]) -> tuple[list[int], list[int]]:
+    """(days only on skills the student already has, days on their gaps)."""
+    known = [k for k in known if k not in gaps]
+    redundant, on_gaps = [], []
+    for day in days:
+        words = _day_words(day)
+        if any(mentions(words, g) for g in gaps):
+            on_gaps.append(day["day"])
+        elif any(mentions(words, k) for k in known):
+            redundant.append(day["day"])
+    return redundant, on_gaps
+
+
+def uncovered_gaps(days: list[dict], gaps: list[str]) -> list[str]:
+    """Gaps no day of the plan mentions, in the given order."""
+    words = [_day_words(day) for day in days]
+    return [g for g in gaps if not any(mentions(w, g) for w in words)]
+
+
+def select_days(days: list[dict], gaps: list[str], known: list[str], limit: int = PERSONALIZE_MAX_DAYS) -> list[int]:
+    """
+    Day numbers to rewrite: days that only cover skills the student already
+    has come first (they are freed up for the student's gaps), then days on
+    the student's gaps (adjusted to their level). At most `limit`.
+    """
+    redundant, on_gaps = classify_days(days, gaps, known)
+    return sorted((redundant + on_gaps)[:limit])
+
+
+def known_skills(result: dict) -> list[str]:
+    """Skills the student already has at intermediate level or above."""
+    skills = result.get("skill_map", {}).get("skills", [])
+    return [s.get("name", "") for s in skills if isinstance(s, dict) and s.get("level") in KNOWN_LEVELS]
+
+
+# ── Offline generation ──────────────────────────────────────────
+async def generate_baseline(dream_role: str, roles: dict, llm) -> dict | None:
+    """Call 1 + Call 2 for the generic profile; None if Call 1 fails."""
+    from pipeline import build_role_context, _gap_skills
+    from prompts import build_roadmap_prompt, build_project_prompt
+    from llm_schemas import ROADMAP_SCHEMA, PROJECT_SCHEMA
+    from normalizer import post_process_roadmap, normalize_project
+
+    role_context = build_role_context(roles, dream_role)
+    result = await llm(build_roadmap_prompt(BASELINE_PROFILE, dream_role, role_context), ROADMAP_SCHEMA)
+    if not isinstance(result, dict):
+        return None
+    result = post_process_roadmap(result, dream_role)
+    skills = [s.get("name", "") for s in result["skill_map"].get("skills", [])]
+    project = await llm(build_project_prompt(dream_role, skills, _gap_skills(result)), PROJECT_SCHEMA)
+    if isinstance(project, dict):
+        fp = project.get("flagship_project") or project
+        if isinstance(fp, dict):
+            result["flagship_project"] = normalize_project(fp, dream_role)
+    return result
+
+
+async def generate_all(roles: dict, only: list[str] | None, path: Path) -> dict:
+    from pipeline import direct_llm
+
+    existing = load_baselines(path)
+    report = {}
+    for dream_role in only or list(roles):
+        started = time.perf_counter()
+        baseline = await generate_baseline(dream_role, roles, direct_llm)
+        report[dream_role] = {"ok": baseline is not None, "seconds": round(time.perf_counter() - started, 1)}
+        if baseline is not None:
+            existing[dream_role] = baseline
+    from llm_service import OLLAMA_MODEL
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"model": OLLAMA_MODEL, "generated_at": time.time(), "roles": existing}, indent=2),
+                   encoding="utf-8")
+    tmp.replace(path)
+    return report
+
+
+def main() -> None:
+    from log_config import setup_logging
+    from pipeline import load_roles
+
+    parser = argparse.ArgumentParser(description="Pre-generate per-role baseline roadmaps.")
+    parser.add_argument("--role", action="append", help="only this role (repeatable)")
+    parser.add_argument("--out", type=Path, default=BASELINES_PATH)
+    args = parser.parse_args()
+
+    setup_logging()
+    report = asyncio.run(generate_all(load_roles(), args.role, args.out))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
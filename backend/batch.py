@@ -0,0 +1,370 @@
+"""
+Batch roadmap generation for cohorts.
+
+Reads a JSONL or CSV file of students and writes one JSONL result per row.
+Each row runs through a streaming pipeline with bounded stages:
+
+    read → PDF extraction → GitHub enrichment → LLM (Call 1 + Call 2) → write
+
+Row fields:
+    id               optional — stable key for checkpointing (default: row-<n>)
+    resume_text      plain text resume, or
+    resume_pdf       path to a PDF resume (CLI only)
+    dream_role       target role
+    github_username  optional
+
+The output file doubles as the checkpoint: rows already written with
+status "ok" are skipped when the same output path is reused. It is also
+enough to rebuild a batch's counts after a restart (results_counts).
+
+A full LLM queue is back-pressure, not a row failure: the row waits out
+the Retry-After and tries again. If a stage itself crashes (e.g. the
+results file can't be written), the other stages are stopped and the
+batch ends in the "failed" state.
+
+With a RateLimiter (the API, not the CLI), each row is admitted against
+the submitting client's request rate — waiting out Retry-After rather
+than failing — and its LLM tokens are charged to that client.
+
+Usage:
+    python batch.py cohort.jsonl -o roadmaps.jsonl --llm-workers 4
+"""
+import argparse
+import asyncio
+import csv
+import functools
+import io
+import json
+import time
+from pathlib import Path
+
+from models import RoadmapRequest
+from llm_service import call_llm
+from pdf_service import extract_text_from_pdf
+from pipeline import (
+    load_roles, resolve_role, build_role_context, build_github_context, run_roadmap_pipeline, to_roadmap_response,
+)
+from scheduler import scheduler, PRIORITY_BATCH, QueueFullError
+from rate_limit import RateLimiter, RateLimitedError
+from log_config import setup_logging, get_logger
+
+
+# ── Constants ───────────────────────────────────────────────────
+
+STAGES = ("pdf", "github", "llm")
+QUEUE_SIZE = 8  # items buffered between stages
+DEFAULT_WORKERS = {"pdf": 2, "github": 4, "llm": scheduler.concurrency}
+
+logger = get_logger("batch")
+
+
+# ── Input / checkpoint ──────────────────────────────────────────
+
+def parse_rows(text: str, fmt: str) -> list[dict]:
+    """Parse JSONL or CSV text into row dicts with a stable `id`."""
+    if fmt == "csv":
+        rows = list(csv.DictReader(io.StringIO(text)))
+    else:
+        rows = []
+        for n, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError(f"line {n}: expected a JSON object")
+            rows.append(row)
+    for i, row in enumerate(rows, start=1):
+        row["id"] = str(row.get("id") or f"row-{i}")
+    return rows
+
+
+def read_rows(path: Path) -> list[dict]:
+    fmt = "csv" if path.suffix.lower() == ".csv" else "jsonl"
+    return parse_rows(path.read_text(encoding="utf-8"), fmt)
+
+
+def completed_ids(output_path: Path) -> set[str]:
+    """Row IDs already written successfully (the resume checkpoint)."""
+    done = set()
+    if not output_path.exists():
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partial line from an interrupted write
+            if record.get("status") == "ok":
+                done.add(record.get("id"))
+    return done
+
+
+def results_counts(output_path: Path) -> dict:
+    """ok / degraded / failed rows in a results file (latest line per row wins)."""
+    latest = {}
+    if output_path.exists():
+        with open(output_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                latest[record.get("id")] = record.get("status")
+    statuses = list(latest.values())
+    return {
+        "ok": statuses.count("ok"),
+        "degraded": statuses.count("degraded"),
+        "failed": statuses.count("error"),
+    }
+
+
+# ── Stats ───────────────────────────────────────────────────────
+
+class BatchStats:
+    """Counters and per-stage timings for one batch run."""
+
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.skipped = 0
+        self.ok = 0
+        self.degraded = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self.finished: float | None = None
+        self.error: str | None = None
+        self.stage_time = {stage: 0.0 for stage in STAGES}
+        self.stage_count = {stage: 0 for stage in STAGES}
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.stage_time[stage] += seconds
+        self.stage_count[stage] += 1
+
+    @property
+    def status(self) -> str:
+        if self.finished is None:
+            return "running"
+        return "failed" if self.error else "done"
+
+    def report(self) -> dict:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        produced = self.ok + self.degraded
+        return {
+            "status": self.status,
+            "error": self.error,
+            "total": self.total,
+            "skipped": self.skipped,
+            "ok": self.ok,
+            "degraded": self.degraded,
+            "failed": self.failed,
+            "done": self.finished is not None,
+            "elapsed_s": round(elapsed, 2),
+            "roadmaps_per_minute": round(produced / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "stages": {
+                stage: {
+                    "count": self.stage_count[stage],
+                    "total_s": round(self.stage_time[stage], 2),
+                    "avg_s": round(self.stage_time[stage] / self.stage_count[stage], 3)
+                    if self.stage_count[stage] else 0.0,
+                }
+                for stage in STAGES
+            },
+        }
+
+
+# ── Stage functions ─────────────────────────────────────────────
+
+async def _stage_pdf(item: dict, allow_pdf_paths: bool) -> None:
+    row = item["row"]
+    if (row.get("resume_text") or "").strip():
+        item["resume_text"] = row["resume_text"]
+        return
+    pdf_path = (row.get("resume_pdf") or "").strip()
+    if not pdf_path:
+        raise ValueError("Row has neither resume_text nor resume_pdf.")
+    if not allow_pdf_paths:
+        raise ValueError("resume_pdf paths are only supported from the CLI.")
+    data = await asyncio.to_thread(Path(pdf_path).read_bytes)
+    item["resume_text"] = await asyncio.to_thread(extract_text_from_pdf, data)
+
+
+async def _stage_github(item: dict) -> None:
+    username = (item["row"].get("github_username") or "").strip()
+    item["github_context"] = await asyncio.to_thread(build_github_context, username) if username else ""
+
+
+async def _admit(limiter: RateLimiter, client_id: str) -> None:
+    """Wait until the client's buckets admit one more row."""
+    while True:
+        try:
+            limiter.acquire(client_id)
+            return
+        except RateLimitedError as e:
+            await asyncio.sleep(e.retry_after)
+
+
+async def _stage_llm(
+    item: dict, roles: dict, batch_id: str, limiter: RateLimiter | None = None, client_id: str | None = None,
+) -> None:
+    row = item["row"]
+    on_usage = None
+    if limiter is not None:
+        await _admit(limiter, client_id)
+
+        def on_usage(usage: dict) -> None:
+            limiter.charge(client_id, usage["prompt_tokens"] + usage["output_tokens"])
+
+    req = resolve_role(roles, RoadmapRequest(
+        resume_text=item["resume_text"],
+        dream_role=row.get("dream_role", ""),
+        github_username=row.get("github_username") or "",
+    ))
+    failures = []
+
+    async def llm(prompt: str, schema: dict | None = None) -> dict | None:
+        while True:
+            try:
+                result = await scheduler.run(
+                    functools.partial(call_llm, prompt, schema=schema, on_usage=on_usage),
+                    priority=PRIORITY_BATCH, client_id=f"batch:{batch_id}",
+                )
+                break
+            except QueueFullError as e:
+                # Interactive traffic has the queue — wait our turn instead of failing the row
+                logger.debug("LLM queue full, row %s retries in %ds", row["id"], e.retry_after)
+                await asyncio.sleep(e.retry_after)
+        if result is None:
+            failures.append(prompt[:40])
+        return result
+
+    result = await run_roadmap_pipeline(
+        req, build_role_context(roles, req.dream_role), item["github_context"], llm, role=roles.get(req.dream_role),
+    )
+    response, _ = to_roadmap_response(result, req.dream_role)
+    item["roadmap"] = response.model_dump()
+    # Any failed LLM call means mock/default content — retry on resume
+    item["status"] = "degraded" if failures else "ok"
+
+
+# ── Pipeline ────────────────────────────────────────────────────
+
+async def _run_stage(name, fn, inbox, outbox, workers, stats: BatchStats, next_workers: int) -> None:
+    """Run `workers` consumers of `inbox`; errored items pass through untouched."""
+
+    async def worker():
+        while True:
+            item = await inbox.get()
+            if item is None:
+                return
+            if "error" not in item:
+                started = time.monotonic()
+                try:
+                    await fn(item)
+                except Exception as e:
+                    item["error"] = f"{name}: {e}"
+                stats.record(name, time.monotonic() - started)
+            await outbox.put(item)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    for _ in range(next_workers):
+        await outbox.put(None)
+
+
+async def run_batch(
+    rows: list[dict],
+    output_path: Path,
+    roles: dict,
+    workers: dict | None = None,
+    batch_id: str = "cli",
+    allow_pdf_paths: bool = True,
+    stats: BatchStats | None = None,
+    limiter: RateLimiter | None = None,
+    client_id: str | None = None,
+) -> dict:
+    """
+    Run all rows not yet checkpointed in `output_path`; returns the stats report.
+    With a `limiter`, rows are admitted and charged against `client_id`.
+    """
+    workers = {**DEFAULT_WORKERS, **(workers or {})}
+    done = completed_ids(output_path)
+    pending = [row for row in rows if row["id"] not in done]
+
+    stats = stats or BatchStats()
+    stats.total = len(rows)
+    stats.skipped = len(rows) - len(pending)
+    logger.info("%d row(s) to process, %d already done", len(pending), stats.skipped)
+
+    queues = {stage: asyncio.Queue(maxsize=QUEUE_SIZE) for stage in STAGES}
+    results: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    async def reader():
+        for row in pending:
+            await queues["pdf"].put({"row": row})
+        for _ in range(workers["pdf"]):
+            await queues["pdf"].put(None)
+
+    async def writer():
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "a", encoding="utf-8") as out:
+            while True:
+                item = await results.get()
+                if item is None:
+                    return
+                record = {"id": item["row"]["id"], "dream_role": item["row"].get("dream_role", "")}
+                if "error" in item:
+                    record.update(status="error", error=item["error"])
+                    stats.failed += 1
+                else:
+                    record.update(status=item["status"], roadmap=item["roadmap"])
+                    if item["status"] == "ok":
+                        stats.ok += 1
+                    else:
+                        stats.degraded += 1
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+
+    tasks = [asyncio.ensure_future(stage) for stage in (
+        reader(),
+        _run_stage("pdf", lambda it: _stage_pdf(it, allow_pdf_paths),
+                   queues["pdf"], queues["github"], workers["pdf"], stats, workers["github"]),
+        _run_stage("github", _stage_github,
+                   queues["github"], queues["llm"], workers["github"], stats, workers["llm"]),
+        _run_stage("llm", lambda it: _stage_llm(it, roles, batch_id, limiter, client_id),
+                   queues["llm"], results, workers["llm"], stats, 1),
+        writer(),
+    )]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException as e:
+        # One stage died: the others would block on its queue forever
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        stats.error = f"{type(e).__name__}: {e}" if isinstance(e, Exception) else "cancelled"
+        logger.error("Batch %s failed: %s", batch_id, stats.error)
+        raise
+    finally:
+        stats.finished = time.monotonic()
+    return stats.report()
+
+
+# ── CLI ─────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate roadmaps for a cohort from JSONL/CSV.")
+    parser.add_argument("input", type=Path, help="cohort file (.jsonl or .csv)")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="results JSONL (also the checkpoint)")
+    parser.add_argument("--pdf-workers", type=int, default=DEFAULT_WORKERS["pdf"])
+    parser.add_argument("--github-workers", type=int, default=DEFAULT_WORKERS["github"])
+    parser.add_argument("--llm-workers", type=int, default=DEFAULT_WORKERS["llm"])
+    args = parser.parse_args()
+    setup_logging()
+
+    # The LLM stage can only be as wide as the scheduler lets it be
+    scheduler.concurrency = max(scheduler.concurrency, args.llm_workers)
+    workers = {"pdf": args.pdf_workers, "github": args.github_workers, "llm": args.llm_workers}
+    report = asyncio.run(run_batch(read_rows(args.input), args.output, load_roles(), workers))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
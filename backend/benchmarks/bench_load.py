@@ -0,0 +1,261 @@
+"""
+Offline load benchmark for the HTTP API.
+
+Starts fake Ollama/GitHub servers (fake_services.py) and the app under
+uvicorn, drives /upload-resume, /generate-roadmap and /adapt-roadmap at a
+fixed concurrency, and writes a JSON report comparable across commits:
+p50/p95/p99 latency and error rate per endpoint, overall throughput, and
+LLM fallback rates scraped from /metrics.
+
+Usage (from backend/):
+    python benchmarks/bench_load.py -c 8 -n 100 -o report.json
+    python benchmarks/bench_load.py --mix generate=1 --tokens-per-sec 40 --malformed-rate 0.1
+    python benchmarks/bench_load.py --env ROADMAP_MODE=chunked --env LLM_CONCURRENCY=4
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fake_services import FakeOllama, FakeGitHub
+
+BACKEND = Path(__file__).parent.parent
+SAMPLE_RESUME = BACKEND / "data" / "sample_resume.txt"
+ROLE = "ML Engineer"
+DEFAULT_MIX = "generate=6,adapt=3,upload=1"
+_CALLS_RE = re.compile(r'^llm_calls_total\{call_type="([^"]+)",outcome="([^"]+)"\} (\S+)$', re.M)
+
+
+# ── Payloads ────────────────────────────────────────────────────
+
+def make_pdf(text: str) -> bytes:
+    """Minimal one-page text PDF (no PDF writer dependency)."""
+    lines = [l.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for l in text.splitlines()[:60]]
+    ops = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(f"({l}) '" for l in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(ops)} >>\nstream\n{ops}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out, offsets = b"%PDF-1.4\n", []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode("latin-1", "replace")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def parse_mix(spec: str) -> dict[str, int]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight or 1)
+    unknown = set(mix) - {"generate", "adapt", "upload"}
+    if unknown:
+        raise SystemExit(f"Unknown endpoint(s) in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+# ── Stats ───────────────────────────────────────────────────────
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of `values` (0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+def summarize(samples: list[tuple[str, float, int]], elapsed: float) -> dict:
+    endpoints = {}
+    for name in sorted({s[0] for s in samples}):
+        latencies = [s[1] * 1000 for s in samples if s[0] == name]
+        errors = sum(1 for s in samples if s[0] == name and not 200 <= s[2] < 300)
+        endpoints[name] = {
+            "count": len(latencies),
+            "errors": errors,
+            "error_rate": round(errors / len(latencies), 4),
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+            "p99_ms": round(percentile(latencies, 99), 1),
+            "mean_ms": round(sum(latencies) / len(latencies), 1),
+        }
+    return {
+        "requests": len(samples),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(samples) / elapsed, 3) if elapsed > 0 else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def llm_outcomes(metrics_text: str) -> dict[str, dict[str, float]]:
+    out: dict[str, dict[str, float]] = {}
+    for call_type, outcome, value in _CALLS_RE.findall(metrics_text):
+        out.setdefault(call_type, {})[outcome] = float(value)
+    return out
+
+
+def outcome_delta(before: dict, after: dict) -> dict:
+    delta = {}
+    for call_type, outcomes in after.items():
+        for outcome, value in outcomes.items():
+            n = int(value - before.get(call_type, {}).get(outcome, 0))
+            if n:
+                delta.setdefault(call_type, {})[outcome] = n
+    return delta
+
+
+# ── Server ──────────────────────────────────────────────────────
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(port: int, env: dict) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND, env={**os.environ, **env},
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("App did not become healthy within 30s")
+
+
+# ── Driver ──────────────────────────────────────────────────────
+
+async def drive(base: str, mix: dict[str, int], total: int, concurrency: int, seed: int) -> tuple[list, float]:
+    resume = SAMPLE_RESUME.read_text(encoding="utf-8") if SAMPLE_RESUME.exists() else "Python developer"
+    pdf = make_pdf(resume)
+    rng = random.Random(seed)
+    plan = rng.choices(list(mix), weights=list(mix.values()), k=total)
+    samples: list[tuple[str, float, int]] = []
+
+    async with httpx.AsyncClient(base_url=base, timeout=600) as client:
+        # /adapt-roadmap needs a generated roadmap to adapt
+        await client.post("/generate-roadmap", json={"resume_text": resume, "dream_role": ROLE})
+
+        async def request(name: str, i: int) -> int:
+            if name == "generate":
+                r = await client.post("/generate-roadmap", json={
+                    "resume_text": resume, "dream_role": ROLE, "github_username": f"bench-user-{i % 5}"})
+            elif name == "adapt":
+                r = await client.post("/adapt-roadmap", json={
+                    "days_completed": 7 + i % 10, "days_missed": i % 4, "reason": "busy week", "confidence": 6})
+            else:
+                r = await client.post("/upload-resume", files={"file": ("resume.pdf", pdf, "application/pdf")})
+            return r.status_code
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(plan):
+            queue.put_nowait(item)
+
+        async def worker():
+            while not queue.empty():
+                i, name = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    status = await request(name, i)
+                except httpx.HTTPError:
+                    status = 0
+                samples.append((name, time.perf_counter() - started, status))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return samples, time.perf_counter() - started
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline load benchmark against fake Ollama/GitHub.")
+    parser.add_argument("-c", "--concurrency", type=int, default=4)
+    parser.add_argument("-n", "--requests", type=int, default=40)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--ttft", type=float, default=0.2, help="fake Ollama seconds before first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=500.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--replay", type=Path, help="JSONL of recorded LLM responses")
+    parser.add_argument("--github-latency", type=float, default=0.1)
+    parser.add_argument("--env", action="append", default=[], help="KEY=VALUE for the app process")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("-o", "--output", type=Path, help="write the JSON report here")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    ollama = FakeOllama(0, args.ttft, args.tokens_per_sec, args.malformed_rate, args.replay, args.seed).start()
+    github = FakeGitHub(0, args.github_latency).start()
+    port = _free_port()
+    app_env = dict(e.split("=", 1) for e in args.env)
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            "OLLAMA_HOST": ollama.url, "GITHUB_API_URL": github.url,
+            "JOBS_DB": str(Path(tmp) / "jobs.db"), "LOG_LEVEL": "warning", "TRACE_LOG": "false",
+            **app_env,
+        }
+        proc = start_app(port, env)
+        base = f"http://127.0.0.1:{port}"
+        try:
+            before = llm_outcomes(httpx.get(f"{base}/metrics").text)
+            samples, elapsed = asyncio.run(drive(base, mix, args.requests, args.concurrency, args.seed))
+            after = llm_outcomes(httpx.get(f"{base}/metrics").text)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+            ollama.stop()
+            github.stop()
+
+    calls = outcome_delta(before, after)
+    total_calls = sum(sum(o.values()) for o in calls.values())
+    failed_calls = sum(n for o in calls.values() for outcome, n in o.items() if outcome != "ok")
+    report = {
+        "commit": _git_commit(),
+        "config": {
+            "concurrency": args.concurrency, "requests": args.requests, "mix": mix,
+            "ttft": args.ttft, "tokens_per_sec": args.tokens_per_sec,
+            "malformed_rate": args.malformed_rate, "replay": str(args.replay) if args.replay else None,
+            "github_latency": args.github_latency, "env": app_env,
+        },
+        **summarize(samples, elapsed),
+        "llm_calls": calls,
+        "llm_fallback_rate": round(failed_calls / total_calls, 4) if total_calls else 0.0,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
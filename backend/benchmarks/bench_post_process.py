@@ -0,0 +1,99 @@
+"""
+Benchmark post_process_roadmap on malformed LLM outputs of various sizes.
+
+Usage (from backend/):
+    python benchmarks/bench_post_process.py
+    python benchmarks/bench_post_process.py --impl some_module:post_process_roadmap
+
+Reports µs per call for the first pass (malformed input) and the second
+pass (already-normalized input, as after Call 2 merges).
+"""
+import argparse
+import copy
+import importlib
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+ROLE = "ML Engineer"
+
+
+def _day(n: int) -> dict:
+    return {"day": n, "objective": f"Objective {n}", "resource": "Docs", "task": "Build", "hours": 2}
+
+
+def make_cases(seed: int = 7) -> dict[str, dict]:
+    """Representative shapes seen from local models."""
+    rng = random.Random(seed)
+    noisy_days = [_day(rng.randint(0, 40)) for _ in range(90)] + ["junk", None, {"day": "12"}]
+    rng.shuffle(noisy_days)
+    return {
+        "empty": {},
+        "aliased_keys": {
+            "skills": {"skills": [{"name": "Python"}]},
+            "gaps": {"critical": [{"skill": "SQL"}]},
+            "roadmap": {"days": [_day(n) for n in range(1, 11)]},
+            "project": {"name": "Recommender", "technologies": ["PyTorch"], "features": [{"week": 1}]},
+        },
+        "truncated": {
+            "reasoning": "ok",
+            "roadmap": {
+                "days": [_day(n) for n in range(1, 13)],
+                "weekly_milestones": [{"week": 1, "milestone": "m"}, {"week": 2, "milestone": "m"}],
+            },
+            "flagship_project": {"title": "X"},
+        },
+        "complete_unsorted": {
+            "reasoning": "ok",
+            "roadmap": {
+                "days": [_day(n) for n in range(30, 0, -1)],
+                "weekly_milestones": [{"week": w, "milestone": "m"} for w in range(4, 0, -1)],
+            },
+            "flagship_project": {"title": "X", "weekly_features": [{"week": w} for w in range(1, 5)]},
+        },
+        "noisy_large": {"reasoning": "ok", "roadmap": {"days": noisy_days}},
+    }
+
+
+def bench(fn, case: dict, iterations: int) -> tuple[float, float]:
+    inputs = [copy.deepcopy(case) for _ in range(iterations)]
+
+    start = time.perf_counter()
+    outputs = [fn(data, ROLE) for data in inputs]
+    first = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for data in outputs:
+        fn(data, ROLE)
+    second = (time.perf_counter() - start) / iterations
+    return first * 1e6, second * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--impl", default="normalizer:post_process_roadmap")
+    parser.add_argument("-n", "--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    module, func = args.impl.split(":")
+    fn = getattr(importlib.import_module(module), func)
+
+    report = {}
+    for name, case in make_cases().items():
+        try:
+            first, second = bench(fn, case, args.iterations)
+        except Exception as e:  # older implementations crash on some shapes
+            report[name] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+        report[name] = {"first_pass_us": round(first, 1), "second_pass_us": round(second, 1)}
+    print(json.dumps({"impl": args.impl, "iterations": args.iterations, "cases": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
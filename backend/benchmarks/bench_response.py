@@ -0,0 +1,124 @@
+"""
+CPU cost of the response path for /generate-roadmap and /adapt-roadmap.
+
+  - End to end: the LLM pipeline is stubbed out (it returns the normalized
+    mock roadmap instantly), so what's measured is validation +
+    serialization + compression + middleware/ASGI overhead, in-process
+    via httpx's ASGI transport
+  - Serialization only: FastAPI's response_model path (model construction,
+    re-validation, jsonable_encoder, json.dumps) vs responses.py
+    (one validation, pydantic-core dump_json) and the cost of gzip on top
+
+Usage (from backend/):
+    python benchmarks/bench_response.py -n 500
+    python benchmarks/bench_response.py --encoding identity
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("TRACE_LOG", "false")
+
+import gzip
+
+from fastapi.routing import serialize_response
+
+import main
+import responses
+from models import RoadmapResponse
+from mock_data import MOCK_ROADMAP_RESPONSE, MOCK_ADAPT_RESPONSE
+from normalizer import post_process_roadmap
+
+ROLE = "ML Engineer"
+
+
+async def _bench(n: int, encoding: str) -> dict:
+    roadmap = post_process_roadmap(copy.deepcopy(MOCK_ROADMAP_RESPONSE), ROLE)
+
+    async def fake_pipeline(*args, **kwargs):
+        return copy.deepcopy(roadmap)
+
+    def fake_llm(*args, **kwargs):
+        async def llm(prompt, schema=None):
+            return copy.deepcopy(MOCK_ADAPT_RESPONSE)
+        return llm
+
+    headers = {"Accept-Encoding": encoding}
+    body = {"resume_text": "Python developer", "dream_role": ROLE}
+    adapt = {"days_completed": 10, "days_missed": 2, "reason": "busy", "confidence": 6}
+    report = {}
+    transport = httpx.ASGITransport(app=main.app)
+    with patch.object(main, "run_roadmap_pipeline", fake_pipeline), patch.object(main, "_scheduled_llm", fake_llm):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, path, payload in (("generate", "/generate-roadmap", body), ("adapt", "/adapt-roadmap", adapt)):
+                r = await client.post(path, json=payload, headers=headers)  # warm-up
+                wire = len(r.content) if r.headers.get("content-encoding") is None else None
+                cpu, wall = time.process_time(), time.perf_counter()
+                for _ in range(n):
+                    r = await client.post(path, json=payload, headers=headers)
+                cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+                report[name] = {
+                    "cpu_us_per_response": round(cpu / n * 1e6, 1),
+                    "wall_us_per_response": round(wall / n * 1e6, 1),
+                    "content_encoding": r.headers.get("content-encoding", "identity"),
+                    "wire_bytes": int(r.headers.get("content-length", 0)) or wire,
+                    "json_bytes": len(r.content),
+                }
+    return report
+
+
+async def _bench_serialization(n: int) -> dict:
+    roadmap = post_process_roadmap(copy.deepcopy(MOCK_ROADMAP_RESPONSE), ROLE)
+    route = next(r for r in main.app.routes if getattr(r, "path", "") == "/generate-roadmap")
+
+    async def response_model_path() -> bytes:
+        content = await serialize_response(
+            field=route.response_field, response_content=RoadmapResponse(**roadmap), is_coroutine=True,
+        )
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+    def fast_path() -> bytes:
+        model = responses.validate(RoadmapResponse, roadmap)
+        return responses.adapter(RoadmapResponse).dump_json(model)
+
+    report = {}
+    cpu = time.process_time()
+    for _ in range(n):
+        await response_model_path()
+    report["response_model_us"] = round((time.process_time() - cpu) / n * 1e6, 1)
+    cpu = time.process_time()
+    for _ in range(n):
+        body = fast_path()
+    report["validate_once_us"] = round((time.process_time() - cpu) / n * 1e6, 1)
+    cpu = time.process_time()
+    for _ in range(n):
+        gzip.compress(body, compresslevel=responses.GZIP_LEVEL, mtime=0)
+    report["gzip_us"] = round((time.process_time() - cpu) / n * 1e6, 1)
+    return report
+
+
+async def _run(n: int, encoding: str) -> dict:
+    report = await _bench(n, encoding)
+    report["serialization"] = await _bench_serialization(n * 4)
+    return report
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description="Response path CPU benchmark.")
+    parser.add_argument("-n", type=int, default=300)
+    parser.add_argument("--encoding", default="gzip, br", help="Accept-Encoding sent by the client")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(_run(args.n, args.encoding)), indent=2))
+
+
+if __name__ == "__main__":
+    cli()
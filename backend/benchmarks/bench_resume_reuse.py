@@ -0,0 +1,189 @@
+"""
+Near-duplicate resume reuse on a replayed workload.
+
+Replays cohort rows (batch JSONL/CSV format: resume_text, dream_role,
+github_username) through run_roadmap_pipeline with a fake LLM, once with
+the resume index and once without, and reports:
+
+  - hit rate (Call 1 skipped) and wrong reuses (matched a resume from a
+    different template family — synthetic workload only)
+  - LLM latency saved, modelled from per-call latencies (--call1-s/--call2-s,
+    defaults roughly a local 7B model) since the fake LLM answers instantly
+  - fingerprint + lookup overhead per request
+
+Without --workload, a synthetic cohort is generated: students edit a few
+shared template resumes (name, contact, GPA, a bullet added/dropped/moved)
+and ~20% write their own.
+
+Usage (from backend/):
+    python benchmarks/bench_resume_reuse.py
+    python benchmarks/bench_resume_reuse.py --rows 1000 --threshold 0.8
+    python benchmarks/bench_resume_reuse.py --workload cohort.jsonl
+"""
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("TRACE_LOG", "false")
+
+import pipeline
+import resume_index
+from batch import read_rows
+from llm_schemas import call_type
+from mock_data import MOCK_ROADMAP_RESPONSE
+from models import RoadmapRequest
+
+SAMPLE = Path(__file__).parent.parent / "data" / "sample_resume.txt"
+ROLES = ["ML Engineer", "Data Analyst", "Backend Developer", "Frontend Developer"]
+FIRST = ["Ana", "Ben", "Chen", "Dana", "Eli", "Fatima", "Gus", "Hana", "Ivan", "Jo", "Kemal", "Lea"]
+LAST = ["Ng", "Ortiz", "Patel", "Quinn", "Rossi", "Sato", "Tran", "Usman", "Vega", "Wong"]
+SKILL_POOL = [
+    "Python", "Java", "C++", "Go", "TypeScript", "SQL", "Docker", "Kubernetes", "AWS", "PyTorch",
+    "TensorFlow", "pandas", "Tableau", "Excel", "React", "Vue", "Node.js", "Django", "FastAPI", "Spark",
+]
+BULLETS = [
+    "Built a REST API serving {n} requests per day", "Trained a classifier reaching {n}% accuracy",
+    "Automated a weekly report saving {n} hours", "Led a team of {n} students in a hackathon",
+    "Wrote unit tests raising coverage to {n}%", "Migrated a legacy app to {s}",
+    "Designed a dashboard in {s} for {n} users", "Optimized SQL queries cutting latency by {n}%",
+]
+
+
+# ── Synthetic workload ──────────────────────────────────────────
+def _bullet(rng: random.Random) -> str:
+    return "- " + rng.choice(BULLETS).format(n=rng.randint(2, 99), s=rng.choice(SKILL_POOL))
+
+
+def _template(rng: random.Random) -> list[str]:
+    """A resume as lines: the sample's structure with its own skills and projects."""
+    lines = SAMPLE.read_text(encoding="utf-8").splitlines()
+    out = []
+    for line in lines:
+        if line.startswith(("Languages:", "Tools:", "Libraries:")):
+            line = line.split(":")[0] + ": " + ", ".join(rng.sample(SKILL_POOL, 5))
+        elif line.startswith("- "):
+            line = _bullet(rng)
+        out.append(line)
+    return out
+
+
+def _student_edit(lines: list[str], rng: random.Random) -> str:
+    lines = list(lines)
+    name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+    lines[0] = name
+    lines[1] = f"Email: {name.lower().replace(' ', '.')}@university.edu | GitHub: github.com/{name.split()[0].lower()}"
+    bullets = [i for i, line in enumerate(lines) if line.startswith("- ")]
+    for _ in range(rng.randint(1, 3)):
+        edit = rng.choice(("gpa", "add", "drop", "move"))
+        if edit == "gpa":
+            lines = [f"GPA: {rng.uniform(2.8, 4.0):.1f}/4.0" if line.startswith("GPA:") else line for line in lines]
+        elif edit == "add":
+            lines.insert(rng.choice(bullets), _bullet(rng))
+        elif edit == "drop" and len(bullets) > 1:
+            lines.pop(rng.choice(bullets))
+        elif edit == "move":
+            i, j = rng.sample(bullets, 2)
+            lines[i], lines[j] = lines[j], lines[i]
+        bullets = [i for i, line in enumerate(lines) if line.startswith("- ")]
+    return "\n".join(lines)
+
+
+def synthetic_rows(n: int, templates: int, unique_share: float, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    families = [(_template(rng), ROLES[i % len(ROLES)]) for i in range(templates)]
+    rows = []
+    for i in range(n):
+        if rng.random() < unique_share:
+            family, lines, role = f"own-{i}", _template(rng), rng.choice(ROLES)
+        else:
+            k = min(int(rng.paretovariate(1.2)) - 1, templates - 1)   # a few popular templates
+            family, (lines, role) = f"template-{k}", families[k]
+        rows.append({"id": f"row-{i}", "resume_text": _student_edit(lines, rng), "dream_role": role, "family": family})
+    return rows
+
+
+# ── Replay ──────────────────────────────────────────────────────
+async def replay(rows: list[dict], reuse: bool, call_seconds: dict) -> dict:
+    resume_index.resume_index.invalidate()
+    family = {"current": None}
+    calls = {"roadmap": 0, "project": 0}
+
+    async def fake_llm(prompt: str, schema: dict | None = None) -> dict | None:
+        kind = call_type(schema)
+        calls[kind] = calls.get(kind, 0) + 1
+        if kind == "project":
+            return None     # default project — Call 2 content doesn't matter here
+        result = copy.deepcopy(MOCK_ROADMAP_RESPONSE)
+        result["reasoning"] = family["current"]   # lets us check what a hit reused
+        return result
+
+    hits = wrong = 0
+    pipeline.RESUME_REUSE = reuse
+    for row in rows:
+        family["current"] = row.get("family", row["id"])
+        req = RoadmapRequest(resume_text=row["resume_text"], dream_role=row["dream_role"])
+        before = calls["roadmap"]
+        result = await pipeline.run_roadmap_pipeline(req, "", "", fake_llm)
+        if calls["roadmap"] == before:
+            hits += 1
+            if "family" in row and result["reasoning"] != row["family"]:
+                wrong += 1
+    modelled = sum(calls.get(kind, 0) * s for kind, s in call_seconds.items())
+
+    # Per-request cost of the reuse check against the filled index
+    started = time.perf_counter()
+    for row in rows:
+        resume_index.resume_index.lookup(row["dream_role"], resume_index.fingerprint(row["resume_text"]))
+    overhead = (time.perf_counter() - started) / len(rows)
+    return {
+        "requests": len(rows),
+        "call1": calls["roadmap"],
+        "hits": hits,
+        "hit_rate": round(hits / len(rows), 3),
+        "wrong_reuse": wrong,
+        "llm_seconds_modelled": round(modelled, 1),
+        "mean_latency_s_modelled": round(modelled / len(rows), 2),
+        "reuse_check_us": round(overhead * 1e6, 1),
+        "indexed_entries": len(resume_index.resume_index),
+    }
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description="Near-duplicate resume reuse benchmark.")
+    parser.add_argument("--workload", type=Path, help="cohort JSONL/CSV (default: synthetic)")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--templates", type=int, default=12)
+    parser.add_argument("--unique", type=float, default=0.2, help="share of students with their own resume")
+    parser.add_argument("--threshold", type=float, default=resume_index.RESUME_SIMILARITY)
+    parser.add_argument("--call1-s", type=float, default=45.0)
+    parser.add_argument("--call2-s", type=float, default=8.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rows = read_rows(args.workload) if args.workload else synthetic_rows(args.rows, args.templates, args.unique, args.seed)
+    resume_index.resume_index.threshold = args.threshold
+    seconds = {"roadmap": args.call1_s, "project": args.call2_s}
+    baseline = asyncio.run(replay(rows, False, seconds))
+    reuse = asyncio.run(replay(rows, True, seconds))
+    saved = baseline["llm_seconds_modelled"] - reuse["llm_seconds_modelled"]
+    print(json.dumps({
+        "threshold": args.threshold,
+        "without_reuse": baseline,
+        "with_reuse": reuse,
+        "llm_seconds_saved": round(saved, 1),
+        "mean_latency_saved_s": round(saved / len(rows), 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    cli()
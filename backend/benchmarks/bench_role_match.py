@@ -0,0 +1,115 @@
+"""
+Role catalog at scale: import, startup and fuzzy-match latency.
+
+Builds a synthetic catalog (the real roles.json plus generated titles such
+as "Kotlin Platform Engineer" with aliases) and reports:
+
+  - roles.json → SQLite import time (once per catalog change)
+  - registry open time (index only — entries load lazily)
+  - resolve() latency and accuracy for exact, abbreviated ("Sr. Go Dev")
+    and misspelled titles (one character dropped)
+  - first vs cached entry load
+
+Usage (from backend/):
+    python benchmarks/bench_role_match.py
+    python benchmarks/bench_role_match.py --roles 500
+
+The synthetic titles are a full grid of prefix × domain × kind (at most
+2360 roles), so every word is shared by hundreds of titles — a harder
+case for matching than a real catalog.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from role_registry import RoleRegistry, import_catalog
+
+DATA = Path(__file__).parent.parent / "data"
+
+PREFIXES = [
+    "Kotlin", "Rust", "Go", "Java", "Python", "Ruby", "Scala", "Elixir", "Swift", "C++", "Unity", "Salesforce",
+    "SAP", "Embedded", "Firmware", "Robotics", "Quant", "Game", "Mobile", "Android", "iOS", "Cloud", "Data",
+    "Analytics", "Growth", "Payments", "Search", "Ranking", "Vision", "Speech", "Compiler", "Kernel", "Network",
+    "Storage", "Database", "Identity", "Privacy", "Trust", "Risk", "Fraud", "Marketing", "Supply Chain",
+]
+DOMAINS = ["Platform", "Product", "Infrastructure", "Systems", "Applications", "Research", "Reliability", "Tools"]
+KINDS = ["Engineer", "Developer", "Analyst", "Scientist", "Architect", "Specialist", "Consultant"]
+
+
+def synthetic_catalog(count: int) -> dict:
+    roles = json.loads((DATA / "roles.json").read_text(encoding="utf-8"))
+    template = next(iter(roles.values()))
+    for prefix, domain, kind in itertools.islice(itertools.product(PREFIXES, DOMAINS, KINDS), count - len(roles)):
+        name = f"{prefix} {domain} {kind}"
+        roles[name] = {**template, "aliases": [f"{prefix} {kind}", f"{domain} {kind} ({prefix})"]}
+    return roles
+
+
+def _typo(title: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(title) - 1)
+    return title[:i] + title[i + 1:]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--roles", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    roles = synthetic_catalog(args.roles)
+    rng = random.Random(7)
+    names = list(roles)
+    # (title, expected catalog name — None when any close role will do)
+    picks = [rng.choice(names) for _ in range(args.queries)]
+    queries = {
+        "exact": [(name, name) for name in picks],
+        "abbreviated": [(f"Sr. {rng.choice(PREFIXES)} Dev", None) for _ in range(args.queries)],
+        "misspelled": [(_typo(name, rng), name) for name in picks],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path, db_path = Path(tmp) / "roles.json", os.path.join(tmp, "roles.db")
+        json_path.write_text(json.dumps(roles), encoding="utf-8")
+
+        started = time.perf_counter()
+        import_catalog(json_path, db_path, "bench")
+        print(f"catalog: {len(roles)} roles, {json_path.stat().st_size / 1e6:.1f} MB JSON")
+        print(f"import:  {(time.perf_counter() - started) * 1e3:.0f} ms (only when roles.json changes)")
+
+        started = time.perf_counter()
+        registry = RoleRegistry(db_path)
+        print(f"open:    {(time.perf_counter() - started) * 1e3:.0f} ms (index only)")
+
+        for kind, batch in queries.items():
+            latencies, hits, correct = [], 0, 0
+            for title, expected in batch:
+                t = time.perf_counter()
+                found = registry.resolve(title)
+                latencies.append((time.perf_counter() - t) * 1e6)
+                hits += found is not None
+                correct += found is not None and expected in (None, found)
+            latencies.sort()
+            print(f"resolve {kind:<12} median {statistics.median(latencies):6.1f} µs  "
+                  f"p99 {latencies[int(len(latencies) * 0.99)]:6.1f} µs  "
+                  f"matched {hits / len(batch):.0%}  correct {correct / len(batch):.0%}")
+
+        name = names[-1]
+        t = time.perf_counter()
+        registry[name]
+        first = (time.perf_counter() - t) * 1e6
+        t = time.perf_counter()
+        registry[name]
+        print(f"entry:   first {first:.0f} µs, cached {(time.perf_counter() - t) * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Cold-start and per-call overhead benchmark.
+
+  - Import time of `main` (python -X importtime, median of N fresh
+    interpreters) with the slowest modules by cumulative time
+  - call_llm overhead against benchmarks/fake_services.py's Ollama with
+    zero latency, i.e. client + streaming + parsing cost per call
+
+Usage (from backend/):
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --module batch -n 7 --calls 200
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+BACKEND = os.path.join(os.path.dirname(__file__), "..")
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_profile(module: str) -> tuple[float, dict[str, float]]:
+    """Total import time of `module` (ms) and cumulative ms of each of its direct imports."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    total = 0.0
+    for self_us, cum_us, indent, name in _LINE_RE.findall(proc.stderr):
+        if name == module and len(indent) == 1:
+            total = int(cum_us) / 1000
+        elif len(indent) == 3:  # imported directly by `module`
+            cumulative[name] = int(cum_us) / 1000
+    return total, cumulative
+
+
+def _loaded(module: str, name: str) -> bool:
+    code = f"import sys, {module}; print({name!r} in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND, capture_output=True, text=True, check=True)
+    return out.stdout.strip().endswith("True")
+
+
+def bench_imports(module: str, runs: int, top: int) -> dict:
+    totals, profiles = [], []
+    for _ in range(runs):
+        total, cumulative = import_profile(module)
+        totals.append(total)
+        profiles.append(cumulative)
+    names = set().union(*profiles)
+    median_profile = {name: statistics.median(p.get(name, 0.0) for p in profiles) for name in names}
+    slowest = sorted(median_profile.items(), key=lambda kv: kv[1], reverse=True)
+    return {
+        "module": module,
+        "runs": runs,
+        "import_ms_median": round(statistics.median(totals), 1),
+        "import_ms_min": round(min(totals), 1),
+        "slowest_direct_imports": {name: round(ms, 1) for name, ms in slowest[:top]},
+        "loaded": {name: _loaded(module, name) for name in ("PyPDF2", "ollama", "httpx", "urllib.request")},
+    }
+
+
+def bench_calls(calls: int) -> dict:
+    from fake_services import FakeOllama
+
+    fake = FakeOllama(ttft=0.0, tokens_per_sec=1e9).start()
+    os.environ["OLLAMA_HOST"] = fake.url
+    from llm_service import call_llm
+    from llm_schemas import PROJECT_SCHEMA
+
+    call_llm("warmup", schema=PROJECT_SCHEMA)
+    timings = []
+    for i in range(calls):
+        started = time.perf_counter()
+        call_llm(f"prompt {i}", schema=PROJECT_SCHEMA)
+        timings.append((time.perf_counter() - started) * 1000)
+    fake.stop()
+    return {
+        "calls": calls,
+        "per_call_ms_median": round(statistics.median(timings), 2),
+        "per_call_ms_p95": round(sorted(timings)[int(len(timings) * 0.95)], 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time and call_llm overhead benchmark.")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--calls", type=int, default=100)
+    args = parser.parse_args()
+
+    report = {"startup": bench_imports(args.module, args.runs, args.top)}
+    if args.calls:
+        report["call_llm"] = bench_calls(args.calls)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Pass-rate / latency benchmark: format="json" vs schema-constrained decoding.
+
+Needs a running Ollama with OLLAMA_MODEL pulled. For each call type, runs
+N generations per mode and checks whether the raw output is usable
+*without* post-processing (valid JSON, expected keys, exact cardinalities).
+
+Usage (from backend/):
+    python benchmarks/bench_structured_output.py -n 5
+    python benchmarks/bench_structured_output.py --calls project adapt
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from llm_service import OLLAMA_MODEL
+from llm_schemas import ROADMAP_SCHEMA, PROJECT_SCHEMA, ADAPT_SCHEMA
+from mock_data import MOCK_ROADMAP_RESPONSE
+from models import RoadmapResponse, FlagshipProject, AdaptResponse
+from prompts import build_roadmap_prompt, build_project_prompt, build_adapt_prompt
+from role_registry import RoleRegistry
+
+DATA = Path(__file__).parent.parent / "data"
+ROLE = "ML Engineer"
+
+
+def _check_roadmap(out: dict) -> bool:
+    roadmap = out.get("roadmap", {})
+    days = [d.get("day") for d in roadmap.get("days", [])]
+    weeks = [m.get("week") for m in roadmap.get("weekly_milestones", [])]
+    RoadmapResponse(**out)
+    return days == list(range(1, 31)) and weeks == [1, 2, 3, 4] and "skill_map" in out and "gap_analysis" in out
+
+
+def _check_project(out: dict) -> bool:
+    fp = out.get("flagship_project")
+    FlagshipProject(**fp)
+    return bool(fp.get("title")) and [f.get("week") for f in fp.get("weekly_features", [])] == [1, 2, 3, 4]
+
+
+def _check_adapt(out: dict) -> bool:
+    AdaptResponse(**out)
+    return bool(out.get("adapted_roadmap", {}).get("days")) and bool(out.get("adaptation_reasoning"))
+
+
+def make_calls() -> dict:
+    resume = (DATA / "sample_resume.txt").read_text(encoding="utf-8")
+    roles = RoleRegistry.from_dict(json.loads((DATA / "roles.json").read_text(encoding="utf-8")))
+    role_skills = json.dumps(roles[ROLE], indent=2)
+    return {
+        "roadmap": (build_roadmap_prompt(resume, ROLE, role_skills), ROADMAP_SCHEMA, _check_roadmap),
+        "project": (build_project_prompt(ROLE, ["Python", "Git"], ["PyTorch", "MLOps"]), PROJECT_SCHEMA, _check_project),
+        "adapt": (
+            build_adapt_prompt(json.dumps(MOCK_ROADMAP_RESPONSE), 7, 7, "exams", 5),
+            ADAPT_SCHEMA, _check_adapt,
+        ),
+    }
+
+
+def run_one(client, prompt: str, fmt, check) -> tuple[bool, float]:
+    start = time.perf_counter()
+    response = client.chat(
+        model=OLLAMA_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        format=fmt,
+        options={"temperature": 0.4, "num_predict": 16384},
+    )
+    elapsed = time.perf_counter() - start
+    try:
+        return bool(check(json.loads(response.message.content))), elapsed
+    except Exception:
+        return False, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--trials", type=int, default=3)
+    parser.add_argument("--calls", nargs="+", default=["roadmap", "project", "adapt"])
+    args = parser.parse_args()
+
+    from ollama import Client
+    client = Client()
+    calls = make_calls()
+
+    report = {"model": OLLAMA_MODEL, "trials": args.trials, "calls": {}}
+    for name in args.calls:
+        prompt, schema, check = calls[name]
+        report["calls"][name] = {}
+        for mode, fmt in (("json", "json"), ("schema", schema)):
+            runs = [run_one(client, prompt, fmt, check) for _ in range(args.trials)]
+            latencies = [t for _, t in runs]
+            report["calls"][name][mode] = {
+                "pass_rate": round(sum(ok for ok, _ in runs) / len(runs), 2),
+                "latency_p50_s": round(statistics.median(latencies), 2),
+                "latency_max_s": round(max(latencies), 2),
+            }
+            print(f"{name:8s} {mode:6s} {report['calls'][name][mode]}", file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Local stand-ins for Ollama and the GitHub API, for offline benchmarks.
+
+FakeOllama serves POST /api/chat as a streamed NDJSON response:
+  - Content per call type (roadmap, analysis, week, project, adapt), from
+    mock_data or replayed from a recorded JSONL archive
+  - Configurable time-to-first-token and tokens/sec (~4 chars per token)
+  - A malformed-output rate (truncated or corrupted JSON)
+  - A final chunk with Ollama's token counts and durations
+
+FakeGitHub serves /users/{name} and /users/{name}/repos with canned data.
+
+Usage (from backend/):
+    python benchmarks/fake_services.py --ollama-port 11500 --github-port 11501
+    OLLAMA_HOST=http://127.0.0.1:11500 GITHUB_API_URL=http://127.0.0.1:11501 uvicorn main:app
+"""
+import argparse
+import copy
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mock_data import MOCK_ROADMAP_RESPONSE, MOCK_ADAPT_RESPONSE
+
+CHARS_PER_TOKEN = 4
+TOKENS_PER_CHUNK = 8
+
+
+# ── Canned LLM content ──────────────────────────────────────────
+
+def detect_call_type(fmt) -> str:
+    """Which pipeline call a request is, from the JSON Schema it sent as `format`."""
+    if not isinstance(fmt, dict):
+        return "roadmap"
+    props = fmt.get("properties", {})
+    if list(props) == ["days"]:
+        return "week"
+    if list(props) == ["flagship_project"]:
+        return "project"
+    if "adapted_roadmap" in props:
+        return "adapt"
+    if "days" not in props.get("roadmap", {}).get("properties", {"days": None}):
+        return "analysis"
+    return "roadmap"
+
+
+def canned_responses() -> dict[str, list[str]]:
+    roadmap = {k: v for k, v in MOCK_ROADMAP_RESPONSE.items() if k != "flagship_project"}
+    analysis = copy.deepcopy(roadmap)
+    analysis["roadmap"].pop("days", None)
+    week = {"days": MOCK_ROADMAP_RESPONSE["roadmap"]["days"][:7]}
+    project = {"flagship_project": MOCK_ROADMAP_RESPONSE["flagship_project"]}
+    return {
+        "roadmap": [json.dumps(roadmap)],
+        "analysis": [json.dumps(analysis)],
+        "week": [json.dumps(week)],
+        "project": [json.dumps(project)],
+        "adapt": [json.dumps(MOCK_ADAPT_RESPONSE)],
+    }
+
+
+def load_replay(path: Path) -> dict[str, list[str]]:
+    """Recorded responses: JSONL lines with "call_type" and raw "content"."""
+    out: dict[str, list[str]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                out.setdefault(entry.get("call_type", "roadmap"), []).append(entry["content"])
+    return out
+
+
+def malform(content: str, rng: random.Random) -> str:
+    """Typical local-model failures: cut off mid-object, or a stray trailing comma."""
+    if rng.random() < 0.5:
+        return content[: rng.randint(1, max(1, len(content) - 1))]
+    return content[:-1] + ",}"
+
+
+# ── Fake Ollama ─────────────────────────────────────────────────
+
+class FakeOllama:
+    def __init__(
+        self,
+        port: int = 0,
+        ttft: float = 0.2,
+        tokens_per_sec: float = 500.0,
+        malformed_rate: float = 0.0,
+        replay: Path | None = None,
+        seed: int = 7,
+    ):
+        self.ttft = ttft
+        self.tokens_per_sec = tokens_per_sec
+        self.malformed_rate = malformed_rate
+        self.responses = canned_responses()
+        if replay:
+            self.responses.update(load_replay(replay))
+        self._cycles = {k: itertools.cycle(v) for k, v in self.responses.items()}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls: dict[str, int] = {}
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def next_content(self, call_type: str) -> str:
+        with self._lock:
+            self.calls[call_type] = self.calls.get(call_type, 0) + 1
+            content = next(self._cycles.get(call_type) or self._cycles["roadmap"])
+            if self._rng.random() < self.malformed_rate:
+                content = malform(content, self._rng)
+        return content
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                # /api/tags, /api/version — enough for health checks
+                _send_json(self, 200, {"models": [], "version": "0.0.0-fake"})
+
+            def do_POST(self):
+                if self.path != "/api/chat":
+                    return _send_json(self, 404, {"error": "not found"})
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                prompt = "".join(m.get("content", "") for m in body.get("messages", []))
+                content = fake.next_content(detect_call_type(body.get("format")))
+                fake.stream(self, body.get("model", ""), prompt, content)
+
+        return Handler
+
+    def stream(self, handler: BaseHTTPRequestHandler, model: str, prompt: str, content: str) -> None:
+        started = time.monotonic()
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/x-ndjson")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        prompt_tokens = max(1, len(prompt) // CHARS_PER_TOKEN)
+        step = CHARS_PER_TOKEN * TOKENS_PER_CHUNK
+        time.sleep(self.ttft)
+        prefill_done = time.monotonic()
+        try:
+            for i in range(0, len(content), step):
+                _write_chunk(handler, {"model": model, "message": {"role": "assistant", "content": content[i:i + step]},
+                                       "done": False})
+                time.sleep(TOKENS_PER_CHUNK / self.tokens_per_sec)
+            now = time.monotonic()
+            _write_chunk(handler, {
+                "model": model, "message": {"role": "assistant", "content": ""}, "done": True,
+                "done_reason": "stop",
+                "total_duration": int((now - started) * 1e9),
+                "load_duration": 0,
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int((prefill_done - started) * 1e9),
+                "eval_count": max(1, len(content) // CHARS_PER_TOKEN),
+                "eval_duration": int((now - prefill_done) * 1e9),
+            })
+            handler.wfile.write(b"0\r\n\r\n")
+            handler.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client stopped early (JSON object complete, or cancelled)
+        handler.close_connection = True
+
+    def start(self) -> "FakeOllama":
+        threading.Thread(target=self.server.serve_forever, daemon=True, name="fake-ollama").start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ── Fake GitHub ─────────────────────────────────────────────────
+
+FAKE_USER = {"login": "bench-user", "public_repos": 12, "followers": 25, "created_at": "2019-01-01T00:00:00Z"}
+FAKE_REPOS = [
+    {"name": f"project-{i}", "language": lang, "stargazers_count": 30 - i * 3, "fork": i % 4 == 3,
+     "description": f"Sample {lang} project number {i}", "topics": ["ml"] if lang == "Python" else []}
+    for i, lang in enumerate(["Python", "TypeScript", "Python", "Go", "Jupyter Notebook", "Rust", "Python", "SQL"])
+]
+
+
+class FakeGitHub:
+    def __init__(self, port: int = 0, latency: float = 0.1):
+        self.latency = latency
+        self.requests = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake.requests += 1
+                time.sleep(fake.latency)
+                parts = self.path.split("?")[0].strip("/").split("/")
+                if parts[:1] != ["users"] or len(parts) not in (2, 3):
+                    return _send_json(self, 404, {"message": "Not Found"})
+                if len(parts) == 3:
+                    return _send_json(self, 200, FAKE_REPOS)
+                return _send_json(self, 200, {**FAKE_USER, "login": parts[1]})
+
+        return Handler
+
+    def start(self) -> "FakeGitHub":
+        threading.Thread(target=self.server.serve_forever, daemon=True, name="fake-github").start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ── HTTP helpers ────────────────────────────────────────────────
+
+def _send_json(handler: BaseHTTPRequestHandler, status: int, payload) -> None:
+    data = json.dumps(payload).encode()
+    handler.send_response(status)
+    handler.send_header("Content-Type", "application/json")
+    handler.send_header("Content-Length", str(len(data)))
+    handler.end_headers()
+    handler.wfile.write(data)
+
+
+def _write_chunk(handler: BaseHTTPRequestHandler, payload: dict) -> None:
+    data = json.dumps(payload).encode() + b"\n"
+    handler.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+    handler.wfile.flush()
+
+
+# ── CLI ─────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run fake Ollama and GitHub servers.")
+    parser.add_argument("--ollama-port", type=int, default=11500)
+    parser.add_argument("--github-port", type=int, default=11501)
+    parser.add_argument("--ttft", type=float, default=0.2, help="seconds before the first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=500.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--replay", type=Path, help="JSONL of recorded responses")
+    parser.add_argument("--github-latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    ollama = FakeOllama(args.ollama_port, args.ttft, args.tokens_per_sec, args.malformed_rate, args.replay).start()
+    github = FakeGitHub(args.github_port, args.github_latency).start()
+    print(f"Fake Ollama: {ollama.url}\nFake GitHub: {github.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+Configuration — backend/.env is loaded exactly once, here.
+
+Modules read settings through env() instead of calling load_dotenv()
+themselves, so every setting sees .env no matter which module is
+imported first (server, batch CLI, benchmarks or tests).
+"""
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ENV_FILE = Path(__file__).parent / ".env"
+
+load_dotenv(ENV_FILE)
+
+
+def env(name: str, default: str = "") -> str:
+    """Setting from the process environment (.env already applied)."""
+    return os.environ.get(name, default)
@@ -6,26 +6,30 @@ Features:
   - 10-minute in-memory cache to avoid rate limits
   - Text sanitization (strip URLs, markdown, truncate)
   - Compact LLM-friendly summary dict
+  - Optional deadline: each API call's timeout is capped by the time left;
+    once it's spent, remaining calls are skipped (partial profiles aren't cached)
   - Never crashes the app — returns None on any failure
 """
-import os
 import re
 import json
 import time
-from urllib.request import urlopen, Request
-from urllib.error import HTTPError, URLError
-from dotenv import load_dotenv
 
-load_dotenv()
+from config import env
+from tracing import traced, current_span
+from log_config import get_logger
+
+logger = get_logger("github")
 
 # ── Constants ───────────────────────────────────────────────────
 
-GITHUB_API = "https://api.github.com"
+GITHUB_API = env("GITHUB_API_URL", "https://api.github.com").rstrip("/")
 USERNAME_RE = re.compile(r"^[a-zA-Z0-9\-]{1,39}$")
 SANITIZE_URL_RE = re.compile(r"https?://\S+")
 SANITIZE_MD_RE = re.compile(r"[#*`\[\]()>~_]")
 CACHE_TTL = 600  # 10 minutes
 MAX_TEXT_LEN = 500
+REQUEST_TIMEOUT = 10  # seconds per API call
+MIN_CALL_TIME = 0.2   # don't start a call with less time left than this
 
 # ── In-memory cache ─────────────────────────────────────────────
 
@@ -34,10 +38,13 @@ _cache: dict[str, tuple[float, dict]] = {}
 
 # ── Public API ──────────────────────────────────────────────────
 
-def fetch_github_profile(username: str) -> dict | None:
+@traced("fetch_github_profile")
+def fetch_github_profile(username: str, deadline: float | None = None) -> dict | None:
     """
     Fetch a GitHub user's profile and top repos.
     Returns a compact summary dict for LLM consumption, or None on any error.
+    `deadline` is a time.monotonic() timestamp: without time for the profile
+    call it returns None; without time for the repos call, a profile without repos.
 
     Return shape:
         {
@@ -51,7 +58,7 @@ def fetch_github_profile(username: str) -> dict | None:
     """
     # Validate username
     if not username or not USERNAME_RE.match(username):
-        print(f"[GitHub] Invalid username: {username!r}")
+        logger.info("Invalid username: %r", username)
         return None
 
     username = username.lower()
@@ -60,19 +67,31 @@ def fetch_github_profile(username: str) -> dict | None:
     if username in _cache:
         ts, data = _cache[username]
         if time.time() - ts < CACHE_TTL:
-            print(f"[GitHub] Cache hit: {username}")
+            logger.debug("Cache hit: %s", username)
+            current_span().set(cache="hit")
             return data
 
+    current_span().set(cache="miss")
     try:
         headers = _build_headers()
 
         # Fetch user profile
-        user = _get(f"/users/{username}", headers)
+        timeout = _timeout(deadline)
+        if timeout is None:
+            logger.info("No time left for GitHub, skipping %s", username)
+            current_span().set(skipped="deadline")
+            return None
+        user = _get(f"/users/{username}", headers, timeout)
         if user is None:
             return None
 
         # Fetch repos (top 30 by recent update)
-        repos = _get(f"/users/{username}/repos?sort=updated&per_page=30", headers)
+        timeout = _timeout(deadline)
+        if timeout is None:
+            logger.info("No time left for %s's repos, using the profile only", username)
+            current_span().set(partial="deadline")
+            return _build_summary(user, [])
+        repos = _get(f"/users/{username}/repos?sort=updated&per_page=30", headers, timeout)
         if repos is None:
             repos = []
 
@@ -80,11 +99,11 @@ def fetch_github_profile(username: str) -> dict | None:
 
         # Cache result
         _cache[username] = (time.time(), summary)
-        print(f"[GitHub] Profile fetched: {username} — signal={summary['experience_signal']}")
+        logger.info("Profile fetched: %s", username, extra={"signal": summary["experience_signal"]})
         return summary
 
     except Exception as e:
-        print(f"[GitHub] Unexpected error for {username}: {e}")
+        logger.exception("Unexpected error for %s: %s", username, e)
         return None
 
 
@@ -112,30 +131,42 @@ def format_github_context(summary: dict) -> str:
 # ── Internal helpers ────────────────────────────────────────────
 
 def _build_headers() -> dict:
-    token = os.getenv("GITHUB_TOKEN", "")
+    token = env("GITHUB_TOKEN", "")
     headers = {"Accept": "application/vnd.github.v3+json"}
     if token:
         headers["Authorization"] = f"token {token}"
     return headers
 
 
-def _get(path: str, headers: dict) -> dict | list | None:
+def _timeout(deadline: float | None) -> float | None:
+    """Timeout for the next API call, or None if the deadline leaves no time for one."""
+    if deadline is None:
+        return REQUEST_TIMEOUT
+    left = deadline - time.monotonic()
+    return min(REQUEST_TIMEOUT, left) if left >= MIN_CALL_TIME else None
+
+
+def _get(path: str, headers: dict, timeout: float = REQUEST_TIMEOUT) -> dict | list | None:
     """GET request to GitHub API with timeout."""
+    # urllib.request pulls in http.client/ssl/email — only load it on a cache miss
+    from urllib.request import urlopen, Request
+    from urllib.error import HTTPError, URLError
+
     url = GITHUB_API + path
     req = Request(url, headers=headers)
     try:
-        with urlopen(req, timeout=10) as resp:
+        with urlopen(req, timeout=timeout) as resp:
             return json.loads(resp.read().decode("utf-8"))
     except HTTPError as e:
         if e.code == 404:
-            print(f"[GitHub] Not found: {path}")
+            logger.info("Not found: %s", path)
         elif e.code == 403:
-            print(f"[GitHub] Rate limited — add GITHUB_TOKEN to .env")
+            logger.warning("Rate limited — add GITHUB_TOKEN to .env")
         else:
-            print(f"[GitHub] API error {e.code}: {e.reason}")
+            logger.warning("API error %s: %s", e.code, e.reason)
         return None
     except (URLError, TimeoutError) as e:
-        print(f"[GitHub] Connection error: {e}")
+        logger.warning("Connection error: %s", e)
         return None
 
 
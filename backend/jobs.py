@@ -0,0 +1,276 @@
+"""
+Background job queue for long-running roadmap generations.
+
+Features:
+  - Jobs persisted in a local SQLite file (JOBS_DB) — survive restarts
+  - Fixed pool of asyncio workers (JOB_WORKERS) running the pipeline
+  - Partial sections saved as they are generated, for polling clients
+  - Jobs interrupted by a restart are re-queued on startup
+  - Cohort batch metadata (POST /batch/roadmaps) kept in the same file, so
+    batch status outlives the process; batches cut off by a restart are
+    marked interrupted
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from config import env
+from scheduler import QueueFullError
+from log_config import get_logger
+
+
+# ── Constants ───────────────────────────────────────────────────
+
+JOBS_DB = env("JOBS_DB", str(Path(__file__).parent / "data" / "jobs.db"))
+JOB_WORKERS = int(env("JOB_WORKERS", "2"))
+IDLE_POLL = 2.0  # seconds between queue checks when idle
+
+logger = get_logger("jobs")
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_INTERRUPTED = "interrupted"
+
+JobRunner = Callable[[dict, Callable[[str, object], None]], Awaitable[dict]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    kind        TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    priority    INTEGER NOT NULL,
+    client_id   TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    sections    TEXT NOT NULL DEFAULT '{}',
+    result      TEXT,
+    error       TEXT,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority, created_at);
+CREATE TABLE IF NOT EXISTS batches (
+    id          TEXT PRIMARY KEY,
+    client_id   TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    report      TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+"""
+
+
+# ── Store ───────────────────────────────────────────────────────
+
+class JobStore:
+    """SQLite-backed job table. All methods are synchronous and short."""
+
+    def __init__(self, path: str = JOBS_DB):
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def create(self, kind: str, payload: dict, priority: int, client_id: str) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, priority, client_id, payload, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, STATUS_QUEUED, priority, client_id, json.dumps(payload), now, now),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def claim_next(self) -> dict | None:
+        """Atomically move the highest-priority queued job to running."""
+        with self._lock:
+            while True:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY priority, created_at LIMIT 1",
+                    (STATUS_QUEUED,),
+                ).fetchone()
+                if row is None:
+                    return None
+                cur = self._conn.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                    (STATUS_RUNNING, time.time(), row["id"], STATUS_QUEUED),
+                )
+                if cur.rowcount == 1:  # another process may have claimed it first
+                    job = _row_to_job(row)
+                    job["status"] = STATUS_RUNNING
+                    return job
+
+    def set_section(self, job_id: str, name: str, data) -> None:
+        with self._lock:
+            row = self._conn.execute("SELECT sections FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            sections = json.loads(row["sections"])
+            sections[name] = data
+            self._conn.execute(
+                "UPDATE jobs SET sections = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(sections), time.time(), job_id),
+            )
+
+    def finish(self, job_id: str, result: dict | None = None, error: str | None = None) -> None:
+        status = STATUS_FAILED if error else STATUS_DONE
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+            )
+
+    def requeue(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                (STATUS_QUEUED, time.time(), job_id),
+            )
+
+    def requeue_interrupted(self) -> int:
+        """Jobs left 'running' by a previous process go back to the queue."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (STATUS_QUEUED, time.time(), STATUS_RUNNING),
+            )
+        return cur.rowcount
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    # ── Batches ─────────────────────────────────────────────────
+
+    def save_batch(self, batch_id: str, client_id: str, report: dict) -> None:
+        """Insert or update a batch with its latest stats report (status included)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO batches (id, client_id, status, report, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET status = excluded.status, report = excluded.report,"
+                " updated_at = excluded.updated_at",
+                (batch_id, client_id, report["status"], json.dumps(report), now, now),
+            )
+
+    def get_batch(self, batch_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM batches WHERE id = ?", (batch_id,)).fetchone()
+        if row is None:
+            return None
+        return {**json.loads(row["report"]), "status": row["status"], "client_id": row["client_id"]}
+
+    def interrupt_batches(self) -> int:
+        """Batches left running by a previous process can't resume — mark them interrupted."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE batches SET status = ?, updated_at = ? WHERE status = ?",
+                (STATUS_INTERRUPTED, time.time(), STATUS_RUNNING),
+            )
+        return cur.rowcount
+
+
+def _row_to_job(row: sqlite3.Row) -> dict:
+    return {
+        "id": row["id"],
+        "kind": row["kind"],
+        "status": row["status"],
+        "priority": row["priority"],
+        "client_id": row["client_id"],
+        "payload": json.loads(row["payload"]),
+        "sections": json.loads(row["sections"]),
+        "result": json.loads(row["result"]) if row["result"] else None,
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+
+
+# ── Worker pool ─────────────────────────────────────────────────
+
+class JobManager:
+    """Runs queued jobs with a fixed number of asyncio workers."""
+
+    def __init__(self, store: JobStore, runner: JobRunner, workers: int = JOB_WORKERS):
+        self.store = store
+        self.runner = runner
+        self.workers = max(1, workers)
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        requeued = self.store.requeue_interrupted()
+        if requeued:
+            logger.info("Re-queued %d interrupted job(s)", requeued)
+        interrupted = self.store.interrupt_batches()
+        if interrupted:
+            logger.info("Marked %d batch(es) cut off by the restart as interrupted", interrupted)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, kind: str, payload: dict, priority: int, client_id: str) -> str:
+        job_id = self.store.create(kind, payload, priority, client_id)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        logger.info("Queued %s job %s", kind, job_id)
+        return job_id
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = self.store.claim_next()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), IDLE_POLL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job: dict) -> None:
+        job_id = job["id"]
+        logger.info("Running job %s", job_id)
+
+        def on_section(name: str, data) -> None:
+            self.store.set_section(job_id, name, data)
+
+        try:
+            result = await self.runner(job, on_section)
+        except QueueFullError as e:
+            # LLM queue is saturated — put the job back and back off
+            self.store.requeue(job_id)
+            await asyncio.sleep(e.retry_after)
+            return
+        except asyncio.CancelledError:
+            # Shutdown mid-job: leave it for the next start to re-queue
+            raise
+        except Exception as e:
+            logger.exception("Job %s failed: %s", job_id, e)
+            self.store.finish(job_id, error=str(e))
+            return
+        self.store.finish(job_id, result=result)
+        logger.info("Job %s done", job_id)
@@ -0,0 +1,106 @@
+"""
+Record / replay archive of raw LLM responses.
+
+LLM_ARCHIVE_MODE:
+  off     — default, every call goes to Ollama
+  record  — calls go to Ollama; each raw response is appended to the archive
+            with Ollama's timing fields (malformed outputs included)
+  replay  — calls are served from the archive; misses return None (mock fallback)
+
+Entries are JSONL keyed by a hash of the prompt and the JSON Schema:
+  {"key", "call_type", "model", "content", "timing": {prompt_eval_count, ...}, "recorded_at"}
+The same file can be fed to benchmarks/fake_services.py --replay.
+
+Replayed responses are streamed through call_llm's normal path (scanner,
+telemetry, parsing). LLM_REPLAY_TIMING=true sleeps for the recorded
+load/prefill/decode durations, scaled by 1/LLM_REPLAY_SPEED.
+"""
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from config import env
+
+
+ARCHIVE_MODE = env("LLM_ARCHIVE_MODE", "off").lower()
+ARCHIVE_PATH = Path(env("LLM_ARCHIVE", str(Path(__file__).parent / "data" / "llm_archive.jsonl")))
+REPLAY_TIMING = env("LLM_REPLAY_TIMING", "false").lower() == "true"
+REPLAY_SPEED = float(env("LLM_REPLAY_SPEED", "1.0"))
+REPLAY_CHUNK_CHARS = 32
+TIMING_FIELDS = ("prompt_eval_count", "eval_count", "load_duration", "prompt_eval_duration", "eval_duration")
+
+
+def archive_key(prompt: str, schema: dict | None) -> str:
+    """Stable hash of what determines a response: the prompt and the output schema."""
+    h = hashlib.sha256(prompt.encode("utf-8"))
+    h.update(b"\0" + json.dumps(schema, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+class LLMArchive:
+    """Append-only JSONL archive; entries for a key are replayed round-robin."""
+
+    def __init__(self, path: Path = ARCHIVE_PATH):
+        self.path = Path(path)
+        self._entries: dict[str, list[dict]] | None = None
+        self._served: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, call_type: str, model: str, content: str, timing: dict) -> None:
+        entry = {
+            "key": key, "call_type": call_type, "model": model, "content": content,
+            "timing": {f: timing.get(f) for f in TIMING_FIELDS}, "recorded_at": time.time(),
+        }
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            if self._entries is not None:
+                self._entries.setdefault(key, []).append(entry)
+
+    def lookup(self, key: str) -> dict | None:
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            n = self._served.get(key, 0)
+            self._served[key] = n + 1
+            return entries[n % len(entries)]
+
+    def _load(self) -> dict[str, list[dict]]:
+        entries: dict[str, list[dict]] = {}
+        if not self.path.exists():
+            return entries
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # partial line from an interrupted write
+                entries.setdefault(entry["key"], []).append(entry)
+        return entries
+
+
+def replay_stream(entry: dict, simulate_timing: bool = REPLAY_TIMING, speed: float = REPLAY_SPEED):
+    """Yield chunks shaped like ollama.chat(stream=True) parts for a recorded entry."""
+    content = entry["content"]
+    timing = entry.get("timing") or {}
+    pieces = [content[i:i + REPLAY_CHUNK_CHARS] for i in range(0, len(content), REPLAY_CHUNK_CHARS)]
+    scale = 1e-9 / speed if simulate_timing and speed > 0 else 0.0
+    if scale:
+        time.sleep(((timing.get("load_duration") or 0) + (timing.get("prompt_eval_duration") or 0)) * scale)
+    per_piece = (timing.get("eval_duration") or 0) * scale / max(1, len(pieces))
+    for piece in pieces:
+        if per_piece:
+            time.sleep(per_piece)
+        yield SimpleNamespace(message=SimpleNamespace(content=piece), done=False, prompt_eval_count=None)
+    yield SimpleNamespace(message=SimpleNamespace(content=""), done=True,
+                          **{f: timing.get(f) for f in TIMING_FIELDS})
+
+
+archive = LLMArchive()
@@ -0,0 +1,120 @@
+"""
+JSON Schemas for Ollama structured outputs, derived from the Pydantic models.
+
+Passing a schema as `format` constrains decoding to the exact response shape,
+so the model can't rename keys or stop after 12 of 30 days. Schemas are
+built once at import:
+
+  - $refs are inlined and every property is required
+  - Title/default annotations are stripped (they only cost prompt tokens);
+    fields named "title" are kept
+  - Fixed cardinalities are pinned with minItems/maxItems (capped for adaptation)
+"""
+import copy
+
+from models import RoadmapResponse, FlagshipProject, AdaptResponse
+
+
+# ── Schema helpers ──────────────────────────────────────────────
+
+def _inline(node, defs: dict):
+    """Resolve $refs, drop title/default annotations and require every property."""
+    if isinstance(node, list):
+        return [_inline(n, defs) for n in node]
+    if not isinstance(node, dict):
+        return node
+    if "$ref" in node:
+        return _inline(defs[node["$ref"].split("/")[-1]], defs)
+    out = {k: _inline(v, defs) for k, v in node.items() if k not in ("title", "default", "$defs", "properties")}
+    if "properties" in node:
+        # Keys here are field names, not annotations — a field may be called "title"
+        out["properties"] = {name: _inline(prop, defs) for name, prop in node["properties"].items()}
+    if "properties" in out:
+        out["required"] = list(out["properties"])
+    return out
+
+
+def model_schema(model) -> dict:
+    """Flat, fully-required JSON Schema for a Pydantic model."""
+    raw = model.model_json_schema()
+    return _inline(raw, raw.get("$defs", {}))
+
+
+def _cap_length(schema: dict, path: tuple, count: int) -> dict:
+    """Set maxItems = count on the array at `path` (length may vary below it)."""
+    node = schema
+    for key in path:
+        node = node["properties"][key]
+    node["maxItems"] = count
+    return node
+
+
+def _pin_length(schema: dict, path: tuple, count: int) -> None:
+    """Set minItems = maxItems = count on the array at `path`."""
+    _cap_length(schema, path, count)["minItems"] = count
+
+
+def _without(schema: dict, *keys: str) -> dict:
+    out = copy.deepcopy(schema)
+    for key in keys:
+        out["properties"].pop(key, None)
+    out["required"] = list(out["properties"])
+    return out
+
+
+# ── Per-call schemas ────────────────────────────────────────────
+
+_ROADMAP_FULL = model_schema(RoadmapResponse)
+_pin_length(_ROADMAP_FULL, ("roadmap", "days"), 30)
+_pin_length(_ROADMAP_FULL, ("roadmap", "weekly_milestones"), 4)
+_pin_length(_ROADMAP_FULL, ("flagship_project", "weekly_features"), 4)
+
+# Call 1 (single mode): everything except the project
+ROADMAP_SCHEMA = _without(_ROADMAP_FULL, "flagship_project")
+
+# Chunked Call 1a: analysis + milestones, no days
+ANALYSIS_SCHEMA = copy.deepcopy(ROADMAP_SCHEMA)
+ANALYSIS_SCHEMA["properties"]["roadmap"] = _without(ANALYSIS_SCHEMA["properties"]["roadmap"], "days")
+
+# Call 2: {"flagship_project": {...}}
+_PROJECT = model_schema(FlagshipProject)
+_pin_length(_PROJECT, ("weekly_features",), 4)
+PROJECT_SCHEMA = {"type": "object", "properties": {"flagship_project": _PROJECT}, "required": ["flagship_project"]}
+
+# Adaptation: only the remaining days/weeks are returned, so lengths are capped, not pinned
+ADAPT_SCHEMA = model_schema(AdaptResponse)
+_cap_length(ADAPT_SCHEMA, ("adapted_roadmap", "days"), 30)
+_cap_length(ADAPT_SCHEMA, ("adapted_roadmap", "weekly_milestones"), 4)
+_cap_length(ADAPT_SCHEMA, ("adapted_project", "weekly_features"), 4)
+
+_DAY_ITEM = _ROADMAP_FULL["properties"]["roadmap"]["properties"]["days"]["items"]
+
+
+def week_schema(day_count: int) -> dict:
+    """Chunked Call 1b: {"days": [...]} with exactly `day_count` days."""
+    return {
+        "type": "object",
+        "properties": {
+            "days": {"type": "array", "items": _DAY_ITEM, "minItems": day_count, "maxItems": day_count},
+        },
+        "required": ["days"],
+    }
+
+
+# ── Call types (metrics labels) ─────────────────────────────────
+
+_CALL_TYPES = {
+    id(ROADMAP_SCHEMA): "roadmap",
+    id(ANALYSIS_SCHEMA): "analysis",
+    id(PROJECT_SCHEMA): "project",
+    id(ADAPT_SCHEMA): "adapt",
+}
+
+
+def call_type(schema: dict | None) -> str:
+    """Metrics label for a call made with `schema` (week schemas are built per call)."""
+    if schema is None:
+        return "json"
+    if id(schema) in _CALL_TYPES:
+        return _CALL_TYPES[id(schema)]
+    return "week" if list(schema.get("properties", {})) == ["days"] else "json"
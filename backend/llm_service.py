@@ -1,57 +1,350 @@
-"""LLM integration — Ollama (local) with mock data fallback."""
+"""LLM integration — Ollama (local) with mock data fallback.
+
+Responses are streamed so generation can stop soon after the top-level
+JSON object closes (instead of burning tokens on trailing whitespace up
+to num_predict), or as soon as the caller signals cancellation. After the
+closing brace up to DRAIN_CHUNKS more chunks are read, waiting for
+Ollama's done chunk — normally the very next one — which carries the
+real token counts and durations.
+Closing the stream closes the HTTP connection, which makes Ollama abort
+the generation and free the model slot.
+
+Every call records telemetry (metrics.py) labelled by call type: token
+counts and load/prefill/decode durations from Ollama's final chunk, or
+client-side estimates when generation was stopped before that chunk.
+
+Raw responses can be recorded to and replayed from a local archive
+(LLM_ARCHIVE_MODE, see llm_archive.py) for deterministic load tests.
+
+One long-lived ollama.Client (keep-alive connection pool) is shared by
+all calls. It is created in the app's lifespan hook (or on first use) —
+ollama/httpx are only imported then, not at module import.
+"""
 import json
-import os
-from dotenv import load_dotenv
+import logging
+import re
+import threading
+import time
+from typing import Callable
+
+from config import env
+import metrics
+from llm_schemas import call_type
+from llm_archive import ARCHIVE_MODE, archive, archive_key, replay_stream
+from tracing import span, current_span
+from token_budget import size_options, observe_prompt_tokens, estimate_tokens
+from log_config import get_logger
 
-load_dotenv()
 
-OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral:7b")
+OLLAMA_MODEL = env("OLLAMA_MODEL", "mistral:7b")
+OLLAMA_MAX_CONNECTIONS = int(env("OLLAMA_MAX_CONNECTIONS", "8"))
+OLLAMA_READ_TIMEOUT = float(env("OLLAMA_READ_TIMEOUT", "300"))  # max silence between chunks
+# Ollama >= 0.5 accepts a JSON Schema as `format`; set false for older servers
+STRUCTURED_OUTPUT = env("LLM_STRUCTURED_OUTPUT", "true").lower() == "true"
+DRAIN_CHUNKS = 8  # chunks read after the JSON object closes, waiting for the done chunk
 
+logger = get_logger("llm")
 
-def call_llm(prompt: str, max_retries: int = 1) -> dict:
+_JSON_SIGNIFICANT = re.compile(r'[{}\[\]"\\]')
+
+
+class JsonObjectScanner:
+    """
+    Incrementally tracks brace depth over streamed text (string- and
+    escape-aware) to find where the first top-level JSON object ends.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> int | None:
+        """Return the index just past the closing brace if it is in `text`, else None."""
+        pos = 0
+        if self.escaped and text:
+            # Escape started at the end of the previous chunk
+            self.escaped = False
+            pos = 1
+        while True:
+            match = _JSON_SIGNIFICANT.search(text, pos)
+            if match is None:
+                return None
+            ch, pos = match.group(), match.end()
+            if self.in_string:
+                if ch == "\\":
+                    if pos >= len(text):
+                        self.escaped = True
+                        return None
+                    pos += 1  # skip the escaped character
+                elif ch == '"':
+                    self.in_string = False
+            elif not self.started:
+                if ch == "{":
+                    self.started = True
+                    self.depth = 1
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    return pos
+
+
+# ── Ollama client ───────────────────────────────────────────────
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_ollama_client():
+    """The shared ollama.Client, created on first use. Raises ImportError without ollama."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import httpx
+                from ollama import Client
+
+                _client = Client(
+                    host=env("OLLAMA_HOST") or None,  # None → localhost:11434
+                    timeout=httpx.Timeout(OLLAMA_READ_TIMEOUT, connect=5.0),
+                    limits=httpx.Limits(max_connections=OLLAMA_MAX_CONNECTIONS,
+                                        max_keepalive_connections=OLLAMA_MAX_CONNECTIONS),
+                )
+    return _client
+
+
+def close_ollama_client() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+# ── Telemetry ───────────────────────────────────────────────────
+
+NS = 1e9  # Ollama durations are in nanoseconds
+
+
+class CallTelemetry:
+    """Timings for one streamed call; recorded into metrics.py once it ends."""
+
+    def __init__(self, kind: str, prompt: str):
+        self.kind = kind
+        self.prompt = prompt
+        self.started = time.monotonic()
+        self.first_token_at: float | None = None
+        self.last_token_at: float | None = None
+        self.chunks = 0
+        self.final = None  # Ollama's done chunk, when it was received
+
+    def on_chunk(self, chunk) -> None:
+        now = time.monotonic()
+        if self.first_token_at is None:
+            self.first_token_at = now
+        self.last_token_at = now
+        self.chunks += 1
+        if chunk.done:
+            self.final = chunk
+
+    def summary(self) -> dict:
+        """Token counts and durations (seconds) — Ollama's numbers when available."""
+        final = self.final
+        if final is not None and getattr(final, "eval_count", None):
+            return {
+                "prompt_tokens": final.prompt_eval_count or 0,
+                "output_tokens": final.eval_count,
+                "load_s": (final.load_duration or 0) / NS,
+                "prefill_s": (final.prompt_eval_duration or 0) / NS,
+                "decode_s": (final.eval_duration or 0) / NS,
+                "source": "ollama",
+            }
+        # Stopped early: time-to-first-token ≈ load + prefill, one token per chunk
+        first = self.first_token_at or time.monotonic()
+        return {
+            "prompt_tokens": estimate_tokens(self.prompt),
+            "output_tokens": self.chunks,
+            "load_s": None,
+            "prefill_s": first - self.started,
+            "decode_s": (self.last_token_at or first) - first,
+            "source": "client",
+        }
+
+    def ollama_timing(self) -> dict:
+        """Summary in Ollama's field names and units (nanoseconds), for the archive."""
+        s = self.summary()
+        return {
+            "prompt_eval_count": s["prompt_tokens"],
+            "eval_count": s["output_tokens"],
+            "load_duration": int((s["load_s"] or 0) * NS),
+            "prompt_eval_duration": int(s["prefill_s"] * NS),
+            "eval_duration": int(s["decode_s"] * NS),
+        }
+
+    def record(self, outcome: str) -> dict:
+        labels = {"call_type": self.kind}
+        metrics.LLM_CALLS.inc(call_type=self.kind, outcome=outcome)
+        metrics.LLM_CALL_SECONDS.observe(time.monotonic() - self.started, **labels)
+        current_span().set(outcome=outcome)
+        if not self.chunks:
+            return {}
+        s = self.summary()
+        current_span().set(prompt_tokens=s["prompt_tokens"], output_tokens=s["output_tokens"])
+        metrics.LLM_PROMPT_TOKENS.inc(s["prompt_tokens"], **labels)
+        metrics.LLM_OUTPUT_TOKENS.inc(s["output_tokens"], **labels)
+        metrics.LLM_PROMPT_SIZE.observe(s["prompt_tokens"], **labels)
+        metrics.LLM_OUTPUT_SIZE.observe(s["output_tokens"], **labels)
+        if s["load_s"] is not None:
+            metrics.LLM_LOAD_SECONDS.observe(s["load_s"], **labels)
+        metrics.LLM_PREFILL_SECONDS.observe(s["prefill_s"], **labels)
+        metrics.LLM_DECODE_SECONDS.observe(s["decode_s"], **labels)
+        if s["prefill_s"] > 0:
+            metrics.LLM_PREFILL_RATE.observe(s["prompt_tokens"] / s["prefill_s"], **labels)
+        if s["decode_s"] > 0:
+            metrics.LLM_DECODE_RATE.observe(s["output_tokens"] / s["decode_s"], **labels)
+        return s
+
+
+# ── LLM call ────────────────────────────────────────────────────
+
+def call_llm(
+    prompt: str,
+    max_retries: int = 1,
+    schema: dict | None = None,
+    cancel_event: threading.Event | None = None,
+    on_usage: Callable[[dict], None] | None = None,
+    deadline: float | None = None,
+) -> dict:
     """
     Call LLM and return parsed JSON.
 
+    If `schema` is given (see llm_schemas.py), decoding is constrained to it;
+    otherwise only syntactically valid JSON is guaranteed.
+    If `cancel_event` is set mid-generation, the stream is closed and None returned.
+    `on_usage` receives the call's token counts and durations once it ends
+    (used for per-client token quotas).
+    Past `deadline` (a time.monotonic() timestamp) generation is stopped and
+    None returned, like a cancellation.
+
     Priority:
     1. Ollama (local) — if running
     2. None — caller falls back to mock data
     """
+    with span(f"llm.{call_type(schema)}"):
+        return _call_llm(prompt, schema, cancel_event, on_usage, deadline)
+
+
+def _call_llm(
+    prompt: str, schema: dict | None, cancel_event: threading.Event | None,
+    on_usage: Callable[[dict], None] | None = None, deadline: float | None = None,
+) -> dict | None:
+    telemetry = CallTelemetry(call_type(schema), prompt)
+    outcome = "error"
+    key = archive_key(prompt, schema) if ARCHIVE_MODE != "off" else None
     try:
-        from ollama import chat
-
-        print(f"[Career Brain] Calling Ollama ({OLLAMA_MODEL})...")
-
-        response = chat(
-            model=OLLAMA_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            format="json",
-            options={
-                "temperature": 0.4,
-                "num_predict": 16384,
-            },
-        )
-
-        text = response.message.content.strip()
-        print(f"[Career Brain] Raw response length: {len(text)} chars")
-        result = json.loads(text)
+        if ARCHIVE_MODE == "replay":
+            entry = archive.lookup(key)
+            if entry is None:
+                logger.warning("No recorded response for this prompt", extra={"call_type": telemetry.kind})
+                outcome = "replay_miss"
+                return None
+            stream = replay_stream(entry)
+        else:
+            client = get_ollama_client()
+
+            sizing = size_options(prompt, schema)
+            logger.info("Calling Ollama (%s)", OLLAMA_MODEL,
+                        extra={"call_type": telemetry.kind, **sizing})
 
-        # Log which top-level keys are present
-        keys = list(result.keys()) if isinstance(result, dict) else []
-        print(f"[Career Brain] Response keys: {keys}")
+            stream = client.chat(
+                model=OLLAMA_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                format=schema if schema and STRUCTURED_OUTPUT else "json",
+                options={
+                    "temperature": 0.4,
+                    **sizing,
+                },
+                stream=True,
+            )
 
-        # Log roadmap day count
-        days = result.get("roadmap", {}).get("days", [])
-        print(f"[Career Brain] Roadmap days: {len(days)}")
+        scanner = JsonObjectScanner()
+        parts = []
+        drained = None  # chunks read since the object closed
+        try:
+            for chunk in stream:
+                stop = None
+                if cancel_event is not None and cancel_event.is_set():
+                    stop = "cancelled"
+                elif deadline is not None and time.monotonic() >= deadline:
+                    stop = "deadline"
+                if stop is not None and drained is not None:
+                    break           # the object is complete; only its telemetry is lost
+                if stop == "cancelled":
+                    logger.info("Generation cancelled — client disconnected")
+                    outcome = "cancelled"
+                    return None
+                if stop == "deadline":
+                    logger.info("Generation stopped — request deadline reached",
+                                extra={"call_type": telemetry.kind, "chunks": telemetry.chunks})
+                    outcome = "deadline"
+                    return None
+                telemetry.on_chunk(chunk)
+                if chunk.done and chunk.prompt_eval_count:
+                    observe_prompt_tokens(prompt, chunk.prompt_eval_count)
+                if drained is not None:
+                    # Trailing EOS/whitespace: read on only until the done chunk
+                    drained += 1
+                    if chunk.done:
+                        break
+                    if drained >= DRAIN_CHUNKS:
+                        logger.debug("No done chunk after the JSON object — stopping generation early")
+                        break
+                    continue
+                piece = chunk.message.content or ""
+                end = scanner.feed(piece)
+                if end is not None:
+                    parts.append(piece[:end])
+                    if chunk.done:
+                        break
+                    drained = 0
+                    continue
+                parts.append(piece)
+        finally:
+            stream.close()
+
+        text = "".join(parts).strip()
+        if ARCHIVE_MODE == "record":
+            # Before parsing, so malformed outputs are kept too
+            archive.record(key, telemetry.kind, OLLAMA_MODEL, text, telemetry.ollama_timing())
+        result = json.loads(text)
 
-        print("[Career Brain] Ollama response parsed successfully")
+        if logger.isEnabledFor(logging.DEBUG):
+            keys = list(result.keys()) if isinstance(result, dict) else []
+            days = result.get("roadmap", {}).get("days", []) if isinstance(result, dict) else []
+            logger.debug("Ollama response parsed", extra={"chars": len(text), "keys": keys, "days": len(days)})
+        outcome = "ok"
         return result
 
     except ImportError:
-        print("[Career Brain] ollama package not installed")
+        logger.error("ollama package not installed")
+        outcome = "unavailable"
         return None
     except json.JSONDecodeError as e:
-        print(f"[Career Brain] Ollama JSON parse error: {e}")
+        logger.warning("Ollama JSON parse error: %s", e, extra={"call_type": telemetry.kind})
+        outcome = "parse_error"
         return None
     except Exception as e:
-        print(f"[Career Brain] Ollama error: {e}")
+        logger.warning("Ollama error: %s", e, extra={"call_type": telemetry.kind})
         return None
+    finally:
+        usage = telemetry.record(outcome)
+        if on_usage is not None and usage:
+            try:
+                on_usage(usage)
+            except Exception as e:
+                logger.warning("Usage callback failed: %s", e)
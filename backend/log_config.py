@@ -0,0 +1,165 @@
+"""
+Structured, non-blocking logging for the backend.
+
+Features:
+  - Request threads only enqueue records (QueueHandler); a background
+    QueueListener thread formats and writes them
+  - JSON lines by default (LOG_FORMAT=text for local reading)
+  - Per-subsystem levels: LOG_LEVELS="llm=debug,github=warning"
+  - Sampling of noisy DEBUG lines (LOG_DEBUG_SAMPLE=0.1 keeps 1 in 10 per message)
+  - request_id from the current trace attached to every record
+
+Subsystem loggers are children of "career_brain": api, pipeline, llm,
+github, pdf, jobs, batch, tokens, normalizer, scheduler, trace.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+
+from config import env
+from tracing import current_request_id
+
+
+ROOT = "career_brain"
+QUEUE_SIZE = 10_000
+
+# Attributes every LogRecord has; anything else came in via `extra=`
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+
+# ── Filters ─────────────────────────────────────────────────────
+
+class RequestIdFilter(logging.Filter):
+    """Stamp the caller's request ID (contextvars are per task/thread)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = current_request_id()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep 1 in every N DEBUG records per (logger, message template)."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counts: dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        if self.every == 0:
+            return False
+        key = (record.name, record.msg)
+        with self._lock:
+            n = self._counts.get(key, 0)
+            self._counts[key] = n + 1
+        return n % self.every == 0
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks or raises on a full queue — the record is dropped and counted."""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DroppingQueueHandler.dropped += 1
+
+
+# ── Formatters ──────────────────────────────────────────────────
+
+def _extras(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in _STANDARD_ATTRS}
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            out["request_id"] = record.request_id
+        out.update(_extras(record))
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str)
+
+
+class TextFormatter(logging.Formatter):
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s [%(name)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = _extras(record)
+        if getattr(record, "request_id", None):
+            extras = {"request_id": record.request_id, **extras}
+        return f"{line} {json.dumps(extras, default=str)}" if extras else line
+
+
+# ── Setup ───────────────────────────────────────────────────────
+
+def _parse_levels(spec: str) -> dict[str, str]:
+    levels = {}
+    for part in spec.split(","):
+        name, sep, level = part.partition("=")
+        if sep and name.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(stream=None) -> None:
+    """
+    Route career_brain.* logs through a queue to a background writer. Idempotent.
+    Reads LOG_LEVEL, LOG_LEVELS, LOG_FORMAT and LOG_DEBUG_SAMPLE (after .env is loaded).
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(stream)
+    text = env("LOG_FORMAT", "json").lower() == "text"
+    output.setFormatter(TextFormatter() if text else JsonFormatter())
+
+    records: queue.Queue = queue.Queue(QUEUE_SIZE)
+    enqueue = _DroppingQueueHandler(records)
+    enqueue.addFilter(SamplingFilter(float(env("LOG_DEBUG_SAMPLE", "1.0"))))
+    enqueue.addFilter(RequestIdFilter())
+
+    root = logging.getLogger(ROOT)
+    root.handlers[:] = [enqueue]
+    root.setLevel(env("LOG_LEVEL", "info").upper())
+    root.propagate = False
+    for subsystem, level in _parse_levels(env("LOG_LEVELS", "")).items():
+        get_logger(subsystem).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
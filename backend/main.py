@@ -2,42 +2,143 @@
 The Personal Career Navigator — FastAPI Backend
 Single "Career Brain" agent with 2 endpoints.
 """
+import asyncio
+import functools
 import json
-import os
+import threading
+import time
+import uuid
 from pathlib import Path
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, FileResponse
 
-from models import RoadmapRequest, AdaptRequest, RoadmapResponse, AdaptResponse
-from llm_service import call_llm
-from prompts import build_roadmap_prompt, build_project_prompt, build_adapt_prompt
-from mock_data import MOCK_ROADMAP_RESPONSE, MOCK_ADAPT_RESPONSE
-from github_service import fetch_github_profile, format_github_context
+from config import env
+from models import (
+    RoadmapRequest, AdaptRequest, RoadmapResponse, AdaptResponse, AdaptDelta, RoadmapSnapshot,
+    JobCreated, JobStatus, ProgressEvent,
+)
+from llm_service import call_llm, get_ollama_client, close_ollama_client
+from mock_data import MOCK_ADAPT_RESPONSE
 from pdf_service import extract_text_from_pdf
+from pipeline import (
+    load_roles, resolve_role, build_role_context, build_github_context, run_roadmap_pipeline, to_roadmap_response,
+    stage_deadline, GITHUB_BUDGET,
+)
+from llm_schemas import ADAPT_SCHEMA
+import metrics
+from tracing import start_trace
+from log_config import setup_logging, get_logger
+from responses import validate, model_response, cached_response, BodyCache, FileBody
+from jobs import JobStore, JobManager, JOB_WORKERS
+from progress import ProgressStore, AdaptationBatcher, progress_prompt
+from rate_limit import RateLimiter, RateLimitedError
+from role_registry import RoleRegistry, CatalogWatcher, ROLES_PAGE_MAX
+from resume_index import resume_index
+from roadmap_delta import merge_adaptation, make_patch
+from baselines import discard_baselines
+from batch import BatchStats, parse_rows, run_batch, results_counts
+from scheduler import (
+    scheduler, QueueFullError, RequestDroppedError, DeadlinePassedError,
+    PRIORITY_ADAPT, PRIORITY_INTERACTIVE, PRIORITY_BATCH,
+)
+
+logger = get_logger("api")
 
 
 # ── In-memory state ─────────────────────────────────────────────
-# Stores the last generated roadmap so /adapt can reference it
+# Stores the last generated roadmap so /adapt can reference it.
+# Adaptations are merged into it; every change gets a new version.
 state = {
     "last_roadmap": None,
     "last_request": None,
-    "roles": {},
+    "roadmap_version": 0,
+    "roles": RoleRegistry.from_dict({}),
 }
 
 
+def _store_roadmap(roadmap: dict, last_request: dict | None = None) -> int:
+    """Replace the authoritative roadmap and return its new version."""
+    state["last_roadmap"] = roadmap
+    if last_request is not None:
+        state["last_request"] = last_request
+    state["roadmap_version"] += 1
+    return state["roadmap_version"]
+
+
+# ── Background jobs ─────────────────────────────────────────────
+async def _run_roadmap_job(job: dict, on_section) -> dict:
+    """Job runner: the same pipeline as /generate-roadmap, without an open connection."""
+    roles = state["roles"]    # one catalog snapshot for the whole job, even across a reload
+    req = resolve_role(roles, RoadmapRequest(**job["payload"]))
+    llm = _scheduled_llm(None, job["priority"], client_id=job["client_id"])
+    with start_trace("job.roadmap", request_id=job["id"]):
+        role_context = build_role_context(roles, req.dream_role)
+        github_context = await asyncio.to_thread(build_github_context, req.github_username)
+
+        result = await run_roadmap_pipeline(
+            req, role_context, github_context, llm, on_section, role=roles.get(req.dream_role),
+        )
+        response, stored = to_roadmap_response(result, req.dream_role)
+
+    _store_roadmap(stored, {"resume_text": req.resume_text, "dream_role": req.dream_role})
+    progress_store.reset(job["client_id"])    # progress on the previous roadmap no longer applies
+    return response.model_dump()
+
+
+job_store = JobStore()
+job_manager = JobManager(job_store, _run_roadmap_job, workers=JOB_WORKERS)
+
+
+# ── Role catalog ────────────────────────────────────────────────
+SAMPLE_RESUME_PATH = Path(__file__).parent / "data" / "sample_resume.txt"
+
+# Precomputed /roles pages (per catalog snapshot) and /sample-resume body
+roles_pages = BodyCache()
+sample_resume = FileBody(SAMPLE_RESUME_PATH, lambda text: {"resume_text": text or ""})
+
+
+def _roles_page(roles: RoleRegistry, q: str = "", category: str = "", offset: int = 0, limit: int = ROLES_PAGE_MAX):
+    def build() -> dict:
+        names, total = roles.search(q, category, offset, limit)
+        return {
+            "roles": names, "total": total, "offset": offset, "limit": limit,
+            "categories": roles.categories(), "version": roles.version,
+        }
+    return roles_pages.get((q, category, offset, limit), build, scope=roles)
+
+
+def _on_roles_reload(roles: RoleRegistry, changed: set[str]) -> None:
+    """Publish a reloaded catalog; drop cached results built from role entries that changed."""
+    _roles_page(roles)        # the default listing is ready before anyone asks
+    state["roles"] = roles
+    for name in changed:
+        resume_index.invalidate(name)
+    discard_baselines(changed)
+    metrics.ROLE_CATALOG_VERSION.set(roles.version)
+
+
 # ── Load roles on startup ──────────────────────────────────────
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    roles_path = Path(__file__).parent / "data" / "roles.json"
-    if roles_path.exists():
-        with open(roles_path, "r", encoding="utf-8") as f:
-            state["roles"] = json.load(f)
-        print(f"[Career Brain] Loaded {len(state['roles'])} roles")
-    else:
-        print("[Career Brain] WARNING: roles.json not found")
+    setup_logging()
+    _on_roles_reload(load_roles(), set())
+    sample_resume.get()
+    watcher = CatalogWatcher(state["roles"], on_reload=_on_roles_reload)
+    watcher.start()
+    try:
+        get_ollama_client()
+    except ImportError:
+        logger.error("ollama package not installed — LLM calls will use mock data")
+    await job_manager.start()
+    adaptation_batcher.start()
     yield
+    await adaptation_batcher.stop()
+    await job_manager.stop()
+    await watcher.stop()
+    close_ollama_client()
 
 
 # ── App setup ───────────────────────────────────────────────────
@@ -54,280 +155,508 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID", "X-Roadmap-Version"],
 )
 
 
+# ── Tracing ─────────────────────────────────────────────────────
+UNTRACED_PATHS = {"/health", "/metrics", "/llm-queue"}
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """One trace per request: JSON log line, X-Request-ID and a Server-Timing breakdown."""
+    if request.url.path in UNTRACED_PATHS:
+        return await call_next(request)
+    request_id = request.headers.get("x-request-id", "").strip()[:64] or None
+    with start_trace(f"{request.method} {request.url.path}", request_id=request_id) as trace:
+        response = await call_next(request)
+        trace.root.set(status=response.status_code)
+    response.headers["X-Request-ID"] = trace.request_id
+    response.headers["Server-Timing"] = trace.server_timing()
+    response.headers["Timing-Allow-Origin"] = "*"
+    return response
+
+
+# ── Admission control ───────────────────────────────────────────
+# Longer expected (or actual) queue waits get the rule-based roadmap instead
+OVERLOAD_MAX_WAIT = float(env("OVERLOAD_MAX_WAIT", "60"))  # seconds
+
+# Per-client request rate and LLM-token quota for the LLM-backed endpoints
+rate_limiter = RateLimiter()
+
+# Time budget for one request; a client can ask for less (or more, up to the max)
+# with an X-Request-Timeout header in seconds
+REQUEST_DEADLINE = float(env("REQUEST_DEADLINE", "120"))          # seconds, 0 = no deadline
+REQUEST_DEADLINE_MAX = float(env("REQUEST_DEADLINE_MAX", "300"))
+
+
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Career Brain is busy. Please retry shortly."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(RateLimitedError)
+async def rate_limited_handler(request: Request, exc: RateLimitedError):
+    detail = {
+        "requests": "Too many roadmap requests from this client.",
+        "llm_tokens": "This client's LLM token quota is used up.",
+    }[exc.limit]
+    return JSONResponse(
+        status_code=429,
+        content={"detail": f"{detail} Retry in {exc.retry_after}s.", "limit": exc.limit},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(RequestDroppedError)
+async def request_dropped_handler(request: Request, exc: RequestDroppedError):
+    # Client is gone (or out of time) — nobody is listening for a body
+    return Response(status_code=499)
+
+
+def _client_id(request: Request) -> str:
+    """Fairness key: API key if sent, else the caller's IP."""
+    api_key = request.headers.get("x-api-key", "").strip()
+    if api_key:
+        return f"key:{api_key}"
+    return request.client.host if request.client else "anonymous"
+
+
+def _request_deadline(request: Request) -> float | None:
+    """time.monotonic() by which the request should answer, or None for no deadline."""
+    seconds = REQUEST_DEADLINE
+    header = request.headers.get("x-request-timeout", "").strip()
+    if header:
+        try:
+            seconds = min(float(header), REQUEST_DEADLINE_MAX)
+        except ValueError:
+            logger.debug("Ignoring invalid X-Request-Timeout: %r", header)
+    if not seconds > 0:     # also rejects nan
+        return None
+    return time.monotonic() + seconds
+
+
+def _overloaded() -> bool:
+    """Interactive LLM calls would queue longer than OVERLOAD_MAX_WAIT — degrade instead."""
+    return scheduler.estimated_wait(PRIORITY_INTERACTIVE) > OVERLOAD_MAX_WAIT
+
+
+def _scheduled_llm(
+    request: Request | None, priority: int, client_id: str | None = None, max_wait: float | None = None,
+    quota: bool = True, deadline: float | None = None,
+):
+    """
+    Bind an LLM caller that queues through the scheduler.
+    If the client disconnects, a queued call is dropped and a running
+    generation is cancelled. Without a request (background jobs) there
+    is no disconnect check. A call still queued after `max_wait` seconds
+    returns None, so the pipeline falls back instead of waiting on.
+    A request `deadline` (time.monotonic()) also bounds the queue wait, and
+    a generation still streaming at the deadline stops and returns None.
+    With `quota`, the tokens each call uses are charged to the client.
+    """
+    client_id = client_id or _client_id(request)
+    is_disconnected = request.is_disconnected if request is not None else None
+    on_usage = None
+    if quota:
+        def on_usage(usage: dict) -> None:
+            rate_limiter.charge(client_id, usage["prompt_tokens"] + usage["output_tokens"])
+
+    async def llm(prompt: str, schema: dict | None = None) -> dict | None:
+        cancel_event = threading.Event()
+        queued_until = min(
+            (t for t in (time.monotonic() + max_wait if max_wait is not None else None, deadline) if t is not None),
+            default=None,
+        )
+        try:
+            return await scheduler.run(
+                functools.partial(
+                    call_llm, prompt, schema=schema, cancel_event=cancel_event, on_usage=on_usage, deadline=deadline,
+                ),
+                priority=priority,
+                client_id=client_id,
+                deadline=queued_until,
+                is_disconnected=is_disconnected,
+                cancel_event=cancel_event,
+            )
+        except DeadlinePassedError:
+            logger.warning("LLM call still queued at its deadline, degrading")
+            return None
+    return llm
+
+
 # ── Endpoint: Upload PDF Resume ────────────────────────────────
 @app.post("/upload-resume")
-async def upload_resume(file: UploadFile = File(...)):
-    """Accept a PDF upload, extract text, return it."""
+async def upload_resume(request: Request, file: UploadFile = File(...)):
+    """Accept a PDF upload, extract text, return it. Past the request deadline, stops after the current page."""
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
 
     try:
         contents = await file.read()
-        text = extract_text_from_pdf(contents)
+        text = extract_text_from_pdf(contents, deadline=_request_deadline(request))
         return {"resume_text": text}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"[Career Brain] PDF upload error: {e}")
+        logger.exception("PDF upload error: %s", e)
         raise HTTPException(status_code=500, detail="Failed to process PDF file.")
 
 
-# ── Post-process LLM output ────────────────────────────────────
-def post_process_roadmap(data: dict, dream_role: str) -> dict:
-    """Fill in missing/empty fields so the frontend always gets complete data."""
-    if not isinstance(data, dict):
-        return data
-
-    # Fix common key mismatches from LLM
-    key_aliases = {
-        "project": "flagship_project",
-        "skills": "skill_map",
-        "gaps": "gap_analysis",
-        "requirements": "role_requirements",
-    }
-    for wrong_key, correct_key in key_aliases.items():
-        if wrong_key in data and correct_key not in data:
-            data[correct_key] = data.pop(wrong_key)
-            print(f"[Career Brain] Fixed key: '{wrong_key}' → '{correct_key}'")
-
-    # Ensure reasoning exists
-    if not data.get("reasoning"):
-        data["reasoning"] = f"Career analysis generated for {dream_role} role based on the provided resume."
-
-    # Ensure skill_map
-    if "skill_map" not in data:
-        data["skill_map"] = {"skills": [], "strengths": [], "weaknesses": []}
-
-    # Ensure role_requirements
-    if "role_requirements" not in data:
-        data["role_requirements"] = {
-            "core_technical": [], "supporting_skills": [], "theory_math": [],
-            "tools": [], "soft_skills": [], "portfolio_expectations": []
-        }
-
-    # Ensure gap_analysis
-    if "gap_analysis" not in data:
-        data["gap_analysis"] = {"critical": [], "important": [], "nice_to_have": []}
-
-    # Ensure roadmap with 30 days
-    if "roadmap" not in data:
-        data["roadmap"] = {"days": [], "weekly_milestones": []}
-
-    days = data["roadmap"].get("days", [])
-    existing_day_nums = {d.get("day", 0) for d in days}
-    for d in range(1, 31):
-        if d not in existing_day_nums:
-            days.append({
-                "day": d,
-                "objective": f"Self-study: {dream_role} skills (Day {d})",
-                "resource": "Online tutorials & documentation",
-                "task": "Practice and build portfolio",
-                "hours": 2,
-            })
-    data["roadmap"]["days"] = sorted(days, key=lambda x: x.get("day", 0))
-
-    # Ensure 4 weekly milestones
-    milestones = data["roadmap"].get("weekly_milestones", [])
-    existing_weeks = {m.get("week", 0) for m in milestones}
-    for w in range(1, 5):
-        if w not in existing_weeks:
-            milestones.append({
-                "week": w,
-                "milestone": f"Week {w} progress checkpoint",
-                "skills_gained": [f"{dream_role} foundations"],
-            })
-    data["roadmap"]["weekly_milestones"] = sorted(milestones, key=lambda x: x.get("week", 0))[:4]
-
-    # Ensure flagship_project
-    if "flagship_project" not in data:
-        data["flagship_project"] = {
-            "title": f"{dream_role} Portfolio Project",
-            "problem_statement": f"Build a project demonstrating {dream_role} skills",
-            "tech_stack": [],
-            "weekly_features": [],
-            "portfolio_quality": "Demonstrates core competencies",
-        }
-
-    fp = data["flagship_project"]
-    print(f"[Career Brain] Project sub-keys: {list(fp.keys())}")
-
-    # Normalize project sub-keys (LLM often uses short names)
-    proj_aliases = {
-        "name": "title",
-        "project_name": "title",
-        "stack": "tech_stack",
-        "technologies": "tech_stack",
-        "technology": "tech_stack",
-        "features": "weekly_features",
-        "problem": "problem_statement",
-        "description": "problem_statement",
-        "quality": "portfolio_quality",
-    }
-    for wrong, correct in proj_aliases.items():
-        if wrong in fp and correct not in fp:
-            fp[correct] = fp.pop(wrong)
-            print(f"[Career Brain] Fixed project key: '{wrong}' → '{correct}'")
-
-    # Ensure required fields have values
-    if not fp.get("title"):
-        fp["title"] = f"{dream_role} Portfolio Project"
-    if not fp.get("problem_statement"):
-        fp["problem_statement"] = f"Build a project demonstrating {dream_role} skills"
-    if not fp.get("tech_stack"):
-        fp["tech_stack"] = []
-    if not fp.get("portfolio_quality"):
-        fp["portfolio_quality"] = "Demonstrates core competencies"
-
-    # Ensure 4 weekly_features
-    features = data["flagship_project"].get("weekly_features", [])
-    existing_fw = {f.get("week", 0) for f in features}
-    feature_defaults = ["Core setup & architecture", "Feature development", "Integration & testing", "Polish & deployment"]
-    for w in range(1, 5):
-        if w not in existing_fw:
-            features.append({
-                "week": w,
-                "feature": feature_defaults[w - 1],
-                "description": f"Week {w}: {feature_defaults[w - 1]}",
-            })
-        else:
-            # Fill empty feature/description
-            for f in features:
-                if f.get("week") == w:
-                    if not f.get("feature"):
-                        f["feature"] = feature_defaults[w - 1]
-                    if not f.get("description"):
-                        f["description"] = f"Week {w}: {feature_defaults[w - 1]}"
-    data["flagship_project"]["weekly_features"] = sorted(features, key=lambda x: x.get("week", 0))[:4]
-
-    return data
-
-
 # ── Endpoint 1: Generate Roadmap ────────────────────────────────
 @app.post("/generate-roadmap", response_model=RoadmapResponse)
-async def generate_roadmap(req: RoadmapRequest):
+async def generate_roadmap(req: RoadmapRequest, request: Request):
     """
     Two sequential LLM calls.
     Takes resume text + dream role → returns full analysis + 30-day plan.
     Falls back to mock data if LLM fails.
+    In chunked mode, Call 1 is split into analysis + 4 parallel weekly calls.
+    LLM calls queue through the scheduler; a full queue returns 429, as
+    does a client over its request rate or LLM-token quota.
+    Under load (or if a call queues past OVERLOAD_MAX_WAIT), a rule-based
+    roadmap is served instead (template_engine.py).
+    Runs against a request deadline (REQUEST_DEADLINE or X-Request-Timeout):
+    stages that run out of budget degrade (see pipeline.py) rather than fail.
     """
-    # Look up role context from local JSON
-    role_skills = state["roles"].get(req.dream_role)
-    if role_skills:
-        role_context = json.dumps(role_skills, indent=2)
-    else:
-        role_context = f"General skills for a {req.dream_role} role."
-
-    # Fetch GitHub profile if username provided
-    github_context = ""
-    if req.github_username.strip():
-        print(f"[Career Brain] Fetching GitHub profile: {req.github_username}")
-        gh_summary = fetch_github_profile(req.github_username.strip())
-        if gh_summary:
-            github_context = format_github_context(gh_summary)
-        else:
-            print("[Career Brain] GitHub fetch failed, continuing without it")
-
-    # Build prompt for Call 1: skills, gaps, roadmap
-    prompt = build_roadmap_prompt(req.resume_text, req.dream_role, role_context, github_context)
-
-    # Call 1: LLM for roadmap
-    print("[Career Brain] === Call 1: Skills/Gaps/Roadmap ===")
-    result = call_llm(prompt)
-
-    # Fallback to mock data if LLM fails
-    if result is None:
-        print("[Career Brain] Using mock data fallback")
-        result = MOCK_ROADMAP_RESPONSE
-
-    # Post-process Call 1 result
-    result = post_process_roadmap(result, req.dream_role)
-
-    # Call 2: Flagship project (using gap data from Call 1)
-    print("[Career Brain] === Call 2: Flagship Project ===")
-    skills_list = [s.get("name", "") for s in result.get("skill_map", {}).get("skills", [])]
-    gaps_list = [g.get("skill", "") for g in result.get("gap_analysis", {}).get("critical", [])]
-    gaps_list += [g.get("skill", "") for g in result.get("gap_analysis", {}).get("important", [])]
-
-    project_prompt = build_project_prompt(req.dream_role, skills_list, gaps_list)
-    project_result = call_llm(project_prompt)
-
-    if project_result and isinstance(project_result, dict):
-        # Extract flagship_project from response (may be nested or at top level)
-        fp = project_result.get("flagship_project") or project_result.get("project") or project_result
-        if isinstance(fp, dict) and "title" in fp or "name" in fp:
-            result["flagship_project"] = fp
-            # Re-run project sub-key normalization
-            result = post_process_roadmap(result, req.dream_role)
-            print("[Career Brain] Project merged from Call 2")
-        else:
-            print("[Career Brain] Call 2 returned unexpected format, using defaults")
-    else:
-        print("[Career Brain] Call 2 failed, using default project")
+    rate_limiter.acquire(_client_id(request))
+    deadline = _request_deadline(request)
+    llm = _scheduled_llm(request, PRIORITY_INTERACTIVE, max_wait=OVERLOAD_MAX_WAIT, deadline=deadline)
+    roles = state["roles"]    # one catalog snapshot for the whole request, even across a reload
+    req = resolve_role(roles, req)
+    role_context = build_role_context(roles, req.dream_role)
+    github_context = await asyncio.to_thread(
+        build_github_context, req.github_username, stage_deadline(deadline, GITHUB_BUDGET),
+    )
+
+    result = await run_roadmap_pipeline(
+        req, role_context, github_context, llm, overloaded=_overloaded, role=roles.get(req.dream_role),
+        deadline=deadline,
+    )
+    response, stored = to_roadmap_response(result, req.dream_role)
 
     # Store in state for adaptation
-    state["last_roadmap"] = result
-    state["last_request"] = {"resume_text": req.resume_text, "dream_role": req.dream_role}
+    version = _store_roadmap(stored, {"resume_text": req.resume_text, "dream_role": req.dream_role})
+    progress_store.reset(_client_id(request))    # progress on the previous roadmap no longer applies
+    # Already validated — skip response_model re-validation
+    http_response = model_response(response, request)
+    http_response.headers["X-Roadmap-Version"] = str(version)
+    return http_response
+
+
+# ── Endpoint: Roadmap jobs ─────────────────────────────────────
+@app.post("/jobs/roadmap", response_model=JobCreated, status_code=202)
+async def create_roadmap_job(req: RoadmapRequest, request: Request):
+    """Queue a roadmap generation and return immediately. Poll GET /jobs/{job_id}."""
+    rate_limiter.acquire(_client_id(request))
+    job_id = job_manager.submit("roadmap", req.model_dump(), PRIORITY_INTERACTIVE, _client_id(request))
+    return JobCreated(job_id=job_id, status="queued")
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """Job status, sections generated so far, and the final RoadmapResponse when done."""
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return JobStatus(
+        job_id=job["id"],
+        status=job["status"],
+        sections=job["sections"],
+        result=job["result"],
+        error=job["error"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+    )
+
+
+# ── Endpoint: Cohort batches ───────────────────────────────────
+BATCH_DIR = Path(__file__).parent / "data" / "batches"
+batches: dict[str, BatchStats] = {}    # live stats of this process's batches; job_store keeps the rest
+_batch_tasks: set[asyncio.Task] = set()
+
+
+async def _run_batch_task(rows: list[dict], batch_id: str, client_id: str, stats: BatchStats) -> None:
+    """Run a batch and record its final report (done or failed) in the jobs DB."""
+    try:
+        await run_batch(
+            rows, BATCH_DIR / f"{batch_id}.jsonl", state["roles"],
+            batch_id=batch_id, allow_pdf_paths=False, stats=stats, limiter=rate_limiter, client_id=client_id,
+        )
+    except Exception:
+        logger.exception("Batch %s failed", batch_id)
+    finally:
+        job_store.save_batch(batch_id, client_id, stats.report())
 
+
+@app.post("/batch/roadmaps", status_code=202)
+async def create_batch(request: Request, file: UploadFile = File(...)):
+    """
+    Accept a JSONL or CSV cohort file and generate roadmaps in the background
+    at batch priority. Poll GET /batch/{batch_id}; fetch results as JSONL.
+    Each row counts against the submitting client's request rate and LLM-token
+    quota: rows wait for their admission, and a client already over its
+    limit gets 429 up front.
+    """
+    name = file.filename.lower()
+    if not name.endswith((".jsonl", ".csv")):
+        raise HTTPException(status_code=400, detail="Only .jsonl or .csv files are accepted.")
     try:
-        return RoadmapResponse(**result)
-    except Exception as e:
-        print(f"[Career Brain] Validation error: {e}, using mock")
-        state["last_roadmap"] = MOCK_ROADMAP_RESPONSE
-        return RoadmapResponse(**MOCK_ROADMAP_RESPONSE)
+        text = (await file.read()).decode("utf-8")
+        rows = parse_rows(text, "csv" if name.endswith(".csv") else "jsonl")
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse cohort file: {e}")
+
+    client_id = _client_id(request)
+    rate_limiter.acquire(client_id)
+    batch_id = uuid.uuid4().hex
+    stats = batches[batch_id] = BatchStats(len(rows))
+    job_store.save_batch(batch_id, client_id, stats.report())
+    task = asyncio.create_task(_run_batch_task(rows, batch_id, client_id, stats))
+    _batch_tasks.add(task)
+    task.add_done_callback(_batch_tasks.discard)
+    return {"batch_id": batch_id, "rows": len(rows)}
+
+
+@app.get("/batch/{batch_id}")
+async def get_batch(batch_id: str):
+    """
+    Progress, throughput (roadmaps/minute) and per-stage timing. Batches from
+    before a restart are served from the jobs DB, with counts rebuilt from
+    their results file.
+    """
+    stats = batches.get(batch_id)
+    if stats is not None:
+        return {"batch_id": batch_id, **stats.report()}
+    stored = job_store.get_batch(batch_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Batch not found.")
+    stored.pop("client_id", None)
+    stored.update(results_counts(BATCH_DIR / f"{batch_id}.jsonl"), done=stored["status"] != "running")
+    return {"batch_id": batch_id, **stored}
+
+
+@app.get("/batch/{batch_id}/results")
+async def get_batch_results(batch_id: str):
+    """Results written so far, one JSON object per line."""
+    path = BATCH_DIR / f"{batch_id}.jsonl"
+    known = batch_id in batches or job_store.get_batch(batch_id) is not None
+    if not known or not path.exists():
+        raise HTTPException(status_code=404, detail="Batch results not found.")
+    return FileResponse(path, media_type="application/x-ndjson")
 
 
 # ── Endpoint 2: Adapt Roadmap ──────────────────────────────────
+async def _adapt_stored_roadmap(
+    req: AdaptRequest, llm, progress: dict | None = None, fallback: bool = True,
+) -> tuple[AdaptResponse | None, dict, int | None, bool]:
+    """
+    Adapt the stored roadmap and merge the result in, unless another
+    generate/adapt replaced it meanwhile (its roadmap wins).
+    Returns (adaptation, the roadmap it adapted, new version or None if not
+    merged, whether the adaptation is the mock). If the LLM fails, the mock
+    adaptation is returned as a preview only — never merged into the stored
+    roadmap; without `fallback`, no adaptation is returned at all.
+    """
+    base, base_version = state["last_roadmap"], state["roadmap_version"]
+
+    # Send adaptation data directly
+    original_json = json.dumps(base, indent=2)
+    prompt = f"ORIGINAL ROADMAP:\n{original_json}\n\nPROGRESS: {req.days_completed} days completed, {req.days_missed} days missed.\nReason: {req.reason}\nConfidence: {req.confidence}/10"
+    if progress is not None:
+        prompt += "\n" + progress_prompt(progress)
+
+    # Call LLM
+    result = await llm(prompt, ADAPT_SCHEMA)
+
+    try:
+        if result is None:
+            raise ValueError("no LLM result")
+        response = validate(AdaptResponse, result)
+    except Exception as e:
+        if not fallback:
+            logger.warning("Adaptation failed: %s", e)
+            return None, base, None, False
+        # Fallback to mock data if LLM fails — shown, but not stored as the user's plan
+        logger.warning("Adaptation failed: %s, returning mock preview", e)
+        return validate(AdaptResponse, MOCK_ADAPT_RESPONSE), base, None, True
+
+    if state["roadmap_version"] != base_version:
+        logger.warning("Roadmap changed during adaptation, not merging")
+        return response, base, None, False
+    return response, base, _store_roadmap(merge_adaptation(base, response.model_dump())), False
+
+
 @app.post("/adapt-roadmap", response_model=AdaptResponse)
-async def adapt_roadmap(req: AdaptRequest):
+async def adapt_roadmap(req: AdaptRequest, request: Request):
     """
     The SECOND Gemini call.
     Takes progress update → returns adapted remaining roadmap.
-    Falls back to mock data if Gemini fails.
+    Falls back to mock data if Gemini fails; the mock is not merged into the
+    stored roadmap (and a delta request gets 503 instead of a patch).
+    The adaptation is merged into the stored roadmap (GET /roadmap). With
+    `delta: true` the response is an AdaptDelta: a JSON Patch from the
+    client's `base_version` to the merged roadmap instead of every day.
+    Days reported through POST /progress are added to the prompt.
     """
     if state["last_roadmap"] is None:
         raise HTTPException(
             status_code=400,
             detail="No roadmap generated yet. Call /generate-roadmap first.",
         )
+    base_version = state["roadmap_version"]
+    if req.delta and req.base_version not in (None, base_version):
+        return JSONResponse(
+            status_code=409,
+            content={"detail": "Roadmap changed since that version. Fetch GET /roadmap.", "version": base_version},
+        )
 
-    # Send adaptation data directly
-    original_json = json.dumps(state["last_roadmap"], indent=2)
-    prompt = f"ORIGINAL ROADMAP:\n{original_json}\n\nPROGRESS: {req.days_completed} days completed, {req.days_missed} days missed.\nReason: {req.reason}\nConfidence: {req.confidence}/10"
+    client_id = _client_id(request)
+    rate_limiter.acquire(client_id)
+    progress = progress_store.summary(client_id)
+    response, base, version, mocked = await _adapt_stored_roadmap(
+        req, _scheduled_llm(request, PRIORITY_ADAPT, client_id=client_id), progress,
+    )
+    if version is None:
+        if req.delta and mocked:
+            raise HTTPException(status_code=503, detail="Adaptation is unavailable right now. Please retry.")
+        if req.delta:
+            raise HTTPException(status_code=409, detail="Roadmap changed during adaptation. Fetch GET /roadmap.")
+        return model_response(response, request)
+    if progress is not None:
+        progress_store.mark_adapted(client_id, progress["drift_total"])
+
+    if req.delta:
+        response = AdaptDelta(
+            version=version,
+            base_version=base_version,
+            adaptation_reasoning=response.adaptation_reasoning,
+            project_changes=response.adapted_project.changes,
+            motivation=response.motivation,
+            # Diff what the client holds: the validated RoadmapResponse, not the raw stored dict
+            patch=make_patch(*(validate(RoadmapResponse, r).model_dump(mode="json") for r in (base, state["last_roadmap"]))),
+        )
+    http_response = model_response(response, request)
+    http_response.headers["X-Roadmap-Version"] = str(version)
+    return http_response
 
-    # Call LLM
-    result = call_llm(prompt)
 
-    # Fallback to mock data if LLM fails
-    if result is None:
-        print("[Career Brain] Using mock adaptation fallback")
-        result = MOCK_ADAPT_RESPONSE
+@app.get("/roadmap", response_model=RoadmapSnapshot)
+async def get_roadmap(request: Request):
+    """The authoritative roadmap with every adaptation merged in, and its version."""
+    if state["last_roadmap"] is None:
+        raise HTTPException(status_code=404, detail="No roadmap generated yet.")
+    version = state["roadmap_version"]
+    snapshot = RoadmapSnapshot(version=version, roadmap=validate(RoadmapResponse, state["last_roadmap"]))
+    http_response = model_response(snapshot, request)
+    http_response.headers["X-Roadmap-Version"] = str(version)
+    return http_response
 
-    try:
-        return AdaptResponse(**result)
-    except Exception as e:
-        print(f"[Career Brain] Validation error: {e}, using mock")
-        return AdaptResponse(**MOCK_ADAPT_RESPONSE)
+
+# ── Endpoint: Progress tracking ────────────────────────────────
+progress_store = ProgressStore()
+
+
+def _off_peak() -> bool:
+    """Spare LLM capacity: a batch-priority call would start right away."""
+    return scheduler.estimated_wait(PRIORITY_BATCH) == 0
+
+
+async def _auto_adapt(summary: dict) -> bool | None:
+    """
+    Background re-plan for a user whose progress drifted: True once merged,
+    False if the LLM failed, None if the roadmap was replaced meanwhile.
+    """
+    if state["last_roadmap"] is None:
+        return False
+    req = AdaptRequest(
+        days_completed=min(summary["days_completed"], 30),
+        days_missed=min(summary["days_missed"], 30),
+        reason="Automatic re-plan: progress drifted from the plan",
+    )
+    # Server-initiated: not charged to the user's quota
+    llm = _scheduled_llm(None, PRIORITY_BATCH, client_id=summary["user_id"], quota=False)
+    response, _, version, mocked = await _adapt_stored_roadmap(req, llm, summary, fallback=False)
+    if response is None or mocked:
+        return False
+    return True if version is not None else None
+
+
+adaptation_batcher = AdaptationBatcher(progress_store, _auto_adapt, _off_peak)
+
+
+@app.post("/progress")
+async def record_progress(event: ProgressEvent, request: Request):
+    """
+    Report one roadmap day (completed / skipped, hours spent). Returns the
+    caller's progress aggregates; once drift reaches ADAPT_DRIFT_THRESHOLD
+    days, the roadmap is re-planned in the background when the LLM is idle.
+    """
+    roadmap = state["last_roadmap"]
+    if roadmap is None:
+        raise HTTPException(status_code=400, detail="No roadmap generated yet. Call /generate-roadmap first.")
+    planned = next(
+        (float(d.get("hours") or 0) for d in roadmap["roadmap"]["days"] if d.get("day") == event.day), 0.0,
+    )
+    return progress_store.record(
+        _client_id(request), state["roadmap_version"], event.day, event.status, event.hours, planned,
+    )
+
+
+@app.get("/progress")
+async def get_progress(request: Request):
+    """The caller's progress aggregates and current drift."""
+    summary = progress_store.summary(_client_id(request))
+    if summary is None:
+        raise HTTPException(status_code=404, detail="No progress reported yet.")
+    return summary
 
 
 # ── Utility endpoints ──────────────────────────────────────────
 @app.get("/roles")
-async def get_roles():
-    """Return available dream roles for the frontend dropdown."""
-    return {"roles": list(state["roles"].keys())}
+async def get_roles(
+    request: Request,
+    q: str = "",
+    category: str = "",
+    offset: int = Query(0, ge=0),
+    limit: int = Query(ROLES_PAGE_MAX, ge=1, le=ROLES_PAGE_MAX),
+):
+    """
+    Dream roles for the frontend dropdown, paged. `q` ranks roles by fuzzy
+    title match ("ml eng"), `category` filters ("Data & AI").
+    Served from precomputed bytes with an ETag; revalidation gets a 304.
+    """
+    return cached_response(_roles_page(state["roles"], q, category, offset, limit), request)
 
 
 @app.get("/sample-resume")
-async def get_sample_resume():
+async def get_sample_resume(request: Request):
     """Return sample resume text for demo convenience."""
-    resume_path = Path(__file__).parent / "data" / "sample_resume.txt"
-    if resume_path.exists():
-        return {"resume_text": resume_path.read_text(encoding="utf-8")}
-    return {"resume_text": ""}
+    return cached_response(sample_resume.get(), request)
 
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "agent": "Career Brain", "version": "1.0.0"}
+    return {
+        "status": "ok", "agent": "Career Brain", "version": "1.0.0",
+        "llm_queue": scheduler.stats(), "jobs": job_store.counts(), "progress": progress_store.counts(),
+    }
+
+
+@app.get("/llm-queue")
+async def llm_queue():
+    """Scheduler queue depth, running slots and recent wait times."""
+    return scheduler.stats()
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """LLM telemetry and queue gauges in Prometheus text format."""
+    stats = scheduler.stats()
+    metrics.LLM_QUEUE_DEPTH.set(stats["queue_depth"])
+    metrics.LLM_RUNNING.set(stats["running"])
+    return Response(metrics.render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,156 @@
+"""
+Minimal Prometheus metrics (counters, gauges, histograms) without extra deps.
+
+All metrics register themselves in REGISTRY and are rendered in the
+Prometheus text exposition format by render_metrics() for GET /metrics.
+Updates are thread-safe — LLM calls record from worker threads.
+"""
+import bisect
+import threading
+
+
+REGISTRY: list["_Metric"] = []
+
+# Bucket presets
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 200, 500, 1000, 2500)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+
+def _fmt_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        super().__init__(name, help_text, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_fmt_labels(self.labels, key)} {_fmt_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = SECONDS_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key → [bucket counts..., +Inf count], sum
+        self._counts: dict[tuple, list[int]] = {}
+        self._sums: dict[tuple, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            counts[index] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(self._key(labels), []))
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key in sorted(self._counts):
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), self._counts[key]):
+                    cumulative += n
+                    le = f'le="{_fmt_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_fmt_labels(self.labels, key)} {_fmt_value(self._sums[key])}")
+                lines.append(f"{self.name}_count{_fmt_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+def render_metrics() -> str:
+    """All registered metrics in Prometheus text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ── LLM metrics ─────────────────────────────────────────────────
+# call_type: roadmap | analysis | week | project | adapt | json
+
+LLM_CALLS = Counter("llm_calls_total", "LLM calls by outcome", ("call_type", "outcome"))
+LLM_PROMPT_TOKENS = Counter("llm_prompt_tokens_total", "Prompt tokens evaluated", ("call_type",))
+LLM_OUTPUT_TOKENS = Counter("llm_output_tokens_total", "Tokens generated", ("call_type",))
+LLM_PREFILL_RATE = Histogram(
+    "llm_prefill_tokens_per_second", "Prompt evaluation throughput", ("call_type",), RATE_BUCKETS)
+LLM_DECODE_RATE = Histogram(
+    "llm_decode_tokens_per_second", "Generation throughput", ("call_type",), RATE_BUCKETS)
+LLM_LOAD_SECONDS = Histogram("llm_load_seconds", "Model load time reported by Ollama", ("call_type",))
+LLM_PREFILL_SECONDS = Histogram("llm_prefill_seconds", "Prompt evaluation time", ("call_type",))
+LLM_DECODE_SECONDS = Histogram("llm_decode_seconds", "Generation time", ("call_type",))
+LLM_CALL_SECONDS = Histogram("llm_call_seconds", "Wall-clock time per LLM call", ("call_type",))
+LLM_PROMPT_SIZE = Histogram("llm_prompt_tokens", "Prompt tokens per call", ("call_type",), TOKEN_BUCKETS)
+LLM_OUTPUT_SIZE = Histogram("llm_output_tokens", "Generated tokens per call", ("call_type",), TOKEN_BUCKETS)
+
+LLM_QUEUE_WAIT = Histogram("llm_queue_wait_seconds", "Time queued before an LLM slot", ("priority",))
+LLM_QUEUE_DEPTH = Gauge("llm_queue_depth", "LLM calls waiting for a slot")
+LLM_RUNNING = Gauge("llm_running", "LLM calls in progress")
+
+# ── Pipeline metrics ────────────────────────────────────────────
+RESUME_REUSE = Counter("resume_reuse_total", "Near-duplicate resume lookups", ("outcome",))
+DEGRADED_ROADMAPS = Counter(
+    "degraded_roadmaps_total", "Roadmaps served without the LLM", ("tier", "reason"))
+ROLE_CATALOG_VERSION = Gauge("role_catalog_version", "Role catalog version being served")
+RATE_LIMITED = Counter("rate_limited_total", "LLM-backed requests refused with 429", ("limit",))
+AUTO_ADAPTATIONS = Counter(
+    "auto_adaptations_total", "Background adaptations triggered by progress drift", ("outcome",))
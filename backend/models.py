@@ -1,6 +1,8 @@
 """Pydantic models for The Personal Career Navigator.
 Made flexible to handle variations in LLM output (local Ollama).
 """
+from typing import Any, Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -17,6 +19,14 @@ class AdaptRequest(BaseModel):
     days_missed: int = Field(..., ge=0, le=30)
     reason: str = Field(default="busy with other commitments")
     confidence: int = Field(default=5, ge=1, le=10)
+    delta: bool = Field(default=False, description="Return a JSON Patch against the stored roadmap instead of the full adaptation")
+    base_version: int | None = Field(default=None, description="Roadmap version the client holds (X-Roadmap-Version); 409 if stale")
+
+
+class ProgressEvent(BaseModel):
+    day: int = Field(..., ge=1, le=30)
+    status: Literal["completed", "skipped"]
+    hours: float | None = Field(default=None, ge=0, le=24, description="Hours spent; defaults to the day's plan if completed")
 
 
 # ── Response Sub-Models (flexible for local LLMs) ──────────────
@@ -108,3 +118,40 @@ class AdaptResponse(BaseModel):
     adapted_roadmap: Roadmap = Roadmap()
     adapted_project: AdaptedProject = AdaptedProject()
     motivation: str = ""
+
+
+class PatchOp(BaseModel):
+    op: str = Field(..., description="add | remove | replace")
+    path: str = Field(..., description="JSON Pointer into the stored RoadmapResponse")
+    value: Any = None
+
+
+class AdaptDelta(BaseModel):
+    version: int
+    base_version: int
+    adaptation_reasoning: str = ""
+    project_changes: str = ""
+    motivation: str = ""
+    patch: list[PatchOp] = []
+
+
+class RoadmapSnapshot(BaseModel):
+    version: int
+    roadmap: RoadmapResponse
+
+
+# ── Background Job Models ───────────────────────────────────────
+
+class JobCreated(BaseModel):
+    job_id: str
+    status: str = "queued"
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str = Field(..., description="queued | running | done | failed")
+    sections: dict = Field(default_factory=dict, description="Roadmap sections generated so far")
+    result: RoadmapResponse | None = None
+    error: str | None = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
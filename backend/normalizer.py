@@ -0,0 +1,242 @@
+"""
+Post-processing of LLM output — fills missing/empty fields so the frontend
+always gets complete data.
+
+Driven by a declarative schema table (aliases, defaults, cardinalities)
+compiled once at import. Each response is normalized in a single pass per
+section, and the normalizer is idempotent: running it on its own output
+changes nothing and allocates nothing new.
+"""
+from log_config import get_logger
+
+
+logger = get_logger("normalizer")
+
+
+# ── Schema table ────────────────────────────────────────────────
+# Top-level sections: canonical key → aliases + default factory.
+# `fill_empty`: also replace present-but-empty values (not just missing keys).
+
+ROADMAP_SECTIONS = {
+    "reasoning": {
+        "aliases": (),
+        "default": lambda role: f"Career analysis generated for {role} role based on the provided resume.",
+        "fill_empty": True,
+    },
+    "skill_map": {
+        "aliases": ("skills",),
+        "default": lambda role: {"skills": [], "strengths": [], "weaknesses": []},
+    },
+    "role_requirements": {
+        "aliases": ("requirements",),
+        "default": lambda role: {
+            "core_technical": [], "supporting_skills": [], "theory_math": [],
+            "tools": [], "soft_skills": [], "portfolio_expectations": [],
+        },
+    },
+    "gap_analysis": {
+        "aliases": ("gaps",),
+        "default": lambda role: {"critical": [], "important": [], "nice_to_have": []},
+    },
+    "roadmap": {
+        "aliases": (),
+        "default": lambda role: {"days": [], "weekly_milestones": []},
+    },
+    "flagship_project": {
+        "aliases": ("project",),
+        "default": lambda role: {},
+    },
+}
+
+# Flagship project fields (LLM often uses short names)
+PROJECT_FIELDS = {
+    "title": {
+        "aliases": ("name", "project_name"),
+        "default": lambda role: f"{role} Portfolio Project",
+    },
+    "problem_statement": {
+        "aliases": ("problem", "description"),
+        "default": lambda role: f"Build a project demonstrating {role} skills",
+    },
+    "tech_stack": {
+        "aliases": ("stack", "technologies", "technology"),
+        "default": lambda role: [],
+    },
+    "weekly_features": {
+        "aliases": ("features",),
+        "default": lambda role: [],
+    },
+    "portfolio_quality": {
+        "aliases": ("quality",),
+        "default": lambda role: "Demonstrates core competencies",
+    },
+}
+
+FEATURE_DEFAULTS = ["Core setup & architecture", "Feature development", "Integration & testing", "Polish & deployment"]
+
+# Numbered sequences: exactly `count` items keyed 1..count, sorted, deduplicated.
+# `fill` lists fields that get a default when empty on an existing item.
+SEQUENCES = {
+    "days": {
+        "key": "day",
+        "count": 30,
+        "default": lambda n, role: {
+            "day": n,
+            "objective": f"Self-study: {role} skills (Day {n})",
+            "resource": "Online tutorials & documentation",
+            "task": "Practice and build portfolio",
+            "hours": 2,
+        },
+        "fill": {},
+    },
+    "weekly_milestones": {
+        "key": "week",
+        "count": 4,
+        "default": lambda n, role: {
+            "week": n,
+            "milestone": f"Week {n} progress checkpoint",
+            "skills_gained": [f"{role} foundations"],
+        },
+        "fill": {},
+    },
+    "weekly_features": {
+        "key": "week",
+        "count": 4,
+        "default": lambda n, role: {
+            "week": n,
+            "feature": FEATURE_DEFAULTS[n - 1],
+            "description": f"Week {n}: {FEATURE_DEFAULTS[n - 1]}",
+        },
+        "fill": {
+            "feature": lambda n: FEATURE_DEFAULTS[n - 1],
+            "description": lambda n: f"Week {n}: {FEATURE_DEFAULTS[n - 1]}",
+        },
+    },
+}
+
+
+def _compile_aliases(table: dict) -> dict[str, str]:
+    """alias → canonical key lookup for one table."""
+    return {alias: key for key, spec in table.items() for alias in spec["aliases"]}
+
+
+for _spec in SEQUENCES.values():
+    _spec["numbers"] = list(range(1, _spec["count"] + 1))
+
+_SECTION_ALIASES = _compile_aliases(ROADMAP_SECTIONS)
+_PROJECT_ALIASES = _compile_aliases(PROJECT_FIELDS)
+_FILL_EMPTY_SECTIONS = tuple(k for k, spec in ROADMAP_SECTIONS.items() if spec.get("fill_empty"))
+
+
+# ── Normalizers ─────────────────────────────────────────────────
+
+def _apply_aliases(data: dict, aliases: dict[str, str], label: str) -> None:
+    """Rename alias keys to canonical ones (only when the canonical key is absent)."""
+    if not aliases.keys() & data.keys():
+        return
+    for wrong in [k for k in data if k in aliases]:
+        correct = aliases[wrong]
+        if correct not in data:
+            data[correct] = data.pop(wrong)
+            logger.debug("Fixed %s key: %r → %r", label, wrong, correct)
+
+
+def _as_int(value) -> int | None:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _normalize_sequence(items, name: str, dream_role: str) -> list:
+    """
+    One pass over `items`: index by number, drop junk/duplicates/out-of-range,
+    fill empty fields. Returns `items` itself when it is already normalized.
+    """
+    spec = SEQUENCES[name]
+    key, count, fill = spec["key"], spec["count"], spec["fill"]
+    if not isinstance(items, list):
+        items = []
+
+    # Fast path: already exactly 1..count in order (e.g. the second run)
+    if len(items) == count:
+        try:
+            in_order = [item.get(key) for item in items] == spec["numbers"]
+        except AttributeError:  # non-dict item
+            in_order = False
+        if in_order and (not fill or all(item.get(f) for item in items for f in fill)):
+            return items
+
+    by_num: dict[int, dict] = {}
+    changed = len(items) != count
+    prev = 0
+    for item in items:
+        if not isinstance(item, dict):
+            changed = True
+            continue
+        n = item.get(key)
+        if type(n) is not int:
+            n = _as_int(n)
+        if n is None or not 1 <= n <= count or n in by_num:
+            changed = True
+            continue
+        if n != item[key]:
+            item[key] = n
+        if n < prev:
+            changed = True
+        prev = n
+        for field, default in fill.items():
+            if not item.get(field):
+                item[field] = default(n)
+        by_num[n] = item
+
+    if not changed:
+        return items
+
+    default = spec["default"]
+    missing = count - len(by_num)
+    if missing:
+        logger.debug("Padded %d missing %s", missing, name)
+    return [by_num[n] if n in by_num else default(n, dream_role) for n in range(1, count + 1)]
+
+
+def normalize_project(fp, dream_role: str) -> dict:
+    """Normalize a flagship project dict in place (or build one if invalid)."""
+    if not isinstance(fp, dict):
+        fp = {}
+    _apply_aliases(fp, _PROJECT_ALIASES, "project")
+
+    for field, spec in PROJECT_FIELDS.items():
+        if not fp.get(field):
+            fp[field] = spec["default"](dream_role)
+
+    fp["weekly_features"] = _normalize_sequence(fp["weekly_features"], "weekly_features", dream_role)
+    return fp
+
+
+def post_process_roadmap(data: dict, dream_role: str) -> dict:
+    """Fill in missing/empty fields so the frontend always gets complete data."""
+    if not isinstance(data, dict):
+        return data
+
+    _apply_aliases(data, _SECTION_ALIASES, "section")
+
+    for key, spec in ROADMAP_SECTIONS.items():
+        if key not in data:
+            data[key] = spec["default"](dream_role)
+    for key in _FILL_EMPTY_SECTIONS:
+        if not data[key]:
+            data[key] = ROADMAP_SECTIONS[key]["default"](dream_role)
+
+    roadmap = data["roadmap"]
+    if not isinstance(roadmap, dict):
+        roadmap = data["roadmap"] = ROADMAP_SECTIONS["roadmap"]["default"](dream_role)
+    roadmap["days"] = _normalize_sequence(roadmap.get("days"), "days", dream_role)
+    roadmap["weekly_milestones"] = _normalize_sequence(
+        roadmap.get("weekly_milestones"), "weekly_milestones", dream_role
+    )
+
+    data["flagship_project"] = normalize_project(data["flagship_project"], dream_role)
+    return data
@@ -1,17 +1,25 @@
 """PDF text extraction for resume uploads."""
 import io
-from PyPDF2 import PdfReader
+import time
+
+from tracing import traced, current_span
+from log_config import get_logger
 
 
 MAX_PDF_SIZE = 10 * 1024 * 1024  # 10 MB
 
+logger = get_logger("pdf")
+
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
+@traced("extract_text_from_pdf")
+def extract_text_from_pdf(file_bytes: bytes, deadline: float | None = None) -> str:
     """
     Extract text from PDF file bytes.
 
     Args:
         file_bytes: Raw bytes of the uploaded PDF file.
+        deadline: Optional time.monotonic() timestamp. Once it passes (and
+            some text was found), the text of the pages read so far is returned.
 
     Returns:
         Extracted text as a single string.
@@ -19,6 +27,8 @@ def extract_text_from_pdf(file_bytes: bytes) -> str:
     Raises:
         ValueError: If the file is too large or not a valid PDF.
     """
+    from PyPDF2 import PdfReader  # ~50 ms to import; only needed for uploads
+
     if len(file_bytes) > MAX_PDF_SIZE:
         raise ValueError(f"PDF too large ({len(file_bytes)} bytes). Max: {MAX_PDF_SIZE} bytes.")
 
@@ -31,7 +41,11 @@ def extract_text_from_pdf(file_bytes: bytes) -> str:
         raise ValueError("PDF has no pages.")
 
     text_parts = []
-    for page in reader.pages:
+    for i, page in enumerate(reader.pages):
+        if deadline is not None and text_parts and time.monotonic() >= deadline:
+            logger.warning("Deadline reached: returning text of %d of %d page(s)", i, len(reader.pages))
+            current_span().set(pages_read=i, partial=True)
+            break
         page_text = page.extract_text()
         if page_text:
             text_parts.append(page_text.strip())
@@ -41,5 +55,5 @@ def extract_text_from_pdf(file_bytes: bytes) -> str:
     if not full_text.strip():
         raise ValueError("Could not extract any text from the PDF. It may be image-based.")
 
-    print(f"[PDF] Extracted {len(full_text)} chars from {len(reader.pages)} page(s)")
+    logger.info("Extracted %d chars from %d page(s)", len(full_text), len(reader.pages))
     return full_text
@@ -0,0 +1,458 @@
+"""
+Career Brain pipeline — shared by the HTTP endpoints, background jobs and batch runs.
+
+Stages:
+  1. Role context + GitHub enrichment
+  2. Call 1: skills, gaps, 30-day roadmap (single, chunked or baseline mode),
+     reused from a near-duplicate resume for the same role when possible
+  3. Call 2: flagship project from the gap analysis
+  4. Post-processing so the frontend always gets complete data
+
+With a request deadline, each stage gets a time budget and degrades when
+it is spent: GitHub enrichment is skipped, Call 1 falls back to the
+rule-based roadmap (or keeps the weeks that finished), and Call 2 is
+replaced by a template project.
+"""
+import asyncio
+import functools
+import json
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from config import env
+from models import RoadmapRequest, RoadmapResponse, DayPlan
+from llm_service import call_llm
+from prompts import (
+    build_roadmap_prompt, build_project_prompt,
+    build_analysis_prompt, build_week_prompt, build_personalize_prompt,
+)
+from github_service import fetch_github_profile, format_github_context
+from normalizer import post_process_roadmap, normalize_project
+from llm_schemas import ROADMAP_SCHEMA, ANALYSIS_SCHEMA, PROJECT_SCHEMA, week_schema
+from token_budget import condense_resume, resume_token_budget
+from tracing import span
+from log_config import get_logger
+from responses import validate
+from resume_index import RESUME_REUSE, resume_index, fingerprint
+from baselines import get_baseline, fallback_roadmap, select_days, known_skills
+from template_engine import degraded_roadmap, fill_missing_days, template_project
+from role_registry import ROLES_PATH, ROLES_DB, RoleRegistry
+
+
+# ── Generation mode ─────────────────────────────────────────────
+# "single":  Call 1 emits all 30 days in one generation.
+# "chunked": Call 1 emits analysis + 4 milestones, then each week's days are
+#            generated concurrently (one smaller call per week).
+# "baseline": Call 1 emits analysis only; the role's pre-generated baseline
+#            (baselines.py) supplies the days and one small call rewrites the
+#            days touching this student's gaps. Roles without one use "single".
+ROADMAP_MODE = env("ROADMAP_MODE", "single").lower()
+WEEK_DAY_RANGES = [(1, 7), (8, 14), (15, 21), (22, 30)]
+
+# ── Stage budgets ───────────────────────────────────────────────
+# Only apply with a request deadline (a time.monotonic() timestamp).
+GITHUB_BUDGET = float(env("GITHUB_BUDGET", "4"))                # seconds for GitHub enrichment
+PROJECT_BUDGET = float(env("PROJECT_BUDGET", "20"))             # seconds Call 1 leaves for Call 2
+PROJECT_MIN_BUDGET = float(env("PROJECT_MIN_BUDGET", "5"))      # less left → template project, no Call 2
+
+logger = get_logger("pipeline")
+
+LLMCaller = Callable[[str, dict | None], Awaitable[dict | None]]
+SectionCallback = Callable[[str, dict], None]
+
+
+def stage_deadline(deadline: float | None, budget: float | None = None, reserve: float = 0.0) -> float | None:
+    """A stage's deadline: at most `budget` seconds from now, and `reserve` seconds before the request's."""
+    if deadline is None:
+        return None
+    end = deadline - reserve
+    if budget is not None:
+        end = min(end, time.monotonic() + budget)
+    return end
+
+
+def time_left(deadline: float | None) -> float:
+    return float("inf") if deadline is None else deadline - time.monotonic()
+
+
+def bounded_llm(llm: LLMCaller, deadline: float | None) -> LLMCaller:
+    """
+    `llm` that returns None once `deadline` passes. The pending call is
+    cancelled, which stops a running generation (scheduler.run sets its
+    cancel_event); its LLM slot stays taken until the generation stops.
+    """
+    if deadline is None:
+        return llm
+
+    async def call(prompt: str, schema: dict | None = None) -> dict | None:
+        timeout = time_left(deadline)
+        if timeout <= 0:
+            return None
+        try:
+            return await asyncio.wait_for(llm(prompt, schema), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("LLM call cut off by its stage budget")
+            return None
+    return call
+
+
+async def direct_llm(prompt: str, schema: dict | None = None) -> dict | None:
+    """Unscheduled LLM call in a worker thread."""
+    return await asyncio.to_thread(functools.partial(call_llm, prompt, schema=schema))
+
+
+# ── Chunked generation helpers ──────────────────────────────────
+def _gap_skills(result: dict) -> list[str]:
+    """Critical + important gap skill names from a Call 1 result."""
+    gaps = result.get("gap_analysis", {})
+    return [g.get("skill", "") for g in gaps.get("critical", []) + gaps.get("important", [])]
+
+
+def _merge_week_days(raw_days, first_day: int, last_day: int) -> list[dict]:
+    """
+    Keep only valid days belonging to [first_day, last_day].
+    Models sometimes number a week 1..7 instead of 8..14 — if no day falls in
+    the range, the week is re-numbered sequentially.
+    """
+    if not isinstance(raw_days, list):
+        return []
+    candidates = [d for d in raw_days if isinstance(d, dict)]
+    absolute = any(isinstance(d.get("day"), int) and first_day <= d["day"] <= last_day for d in candidates)
+
+    days, seen = [], set()
+    for i, d in enumerate(candidates):
+        day_num = d.get("day") if absolute else first_day + i
+        if day_num in seen or not isinstance(day_num, int) or not first_day <= day_num <= last_day:
+            continue
+        try:
+            plan = DayPlan(**{**d, "day": day_num})
+        except Exception:
+            continue
+        seen.add(day_num)
+        days.append(plan.model_dump())
+    return days
+
+
+async def _generate_week(req: RoadmapRequest, week: int, milestone: dict, gaps: list[str], llm: LLMCaller = direct_llm) -> list[dict]:
+    """Generate one week's days; retry once if the model stops early."""
+    first_day, last_day = WEEK_DAY_RANGES[week - 1]
+    prompt = build_week_prompt(
+        req.dream_role, week, milestone.get("milestone", ""),
+        milestone.get("skills_gained", []), gaps, first_day, last_day,
+    )
+    schema = week_schema(last_day - first_day + 1)
+    best: list[dict] = []
+    for attempt in range(2):
+        result = await llm(prompt, schema)
+        if isinstance(result, dict):
+            raw = result.get("days") or result.get("roadmap", {}).get("days", [])
+            days = _merge_week_days(raw, first_day, last_day)
+            if len(days) > len(best):
+                best = days
+        if len(best) == last_day - first_day + 1:
+            break
+        logger.info("Week %d returned %d days (attempt %d)", week, len(best), attempt + 1)
+    return best
+
+
+async def generate_roadmap_chunked(req: RoadmapRequest, role_context: str, github_context: str, llm: LLMCaller = direct_llm) -> dict | None:
+    """
+    Chunked Call 1: analysis + milestones, then the 4 weeks concurrently.
+    Returns None if the analysis call fails (caller falls back to mock data).
+    """
+    logger.info("Call 1a: skills/gaps/milestones")
+    prompt = build_analysis_prompt(req.resume_text, req.dream_role, role_context, github_context)
+    analysis = await llm(prompt, ANALYSIS_SCHEMA)
+    if not isinstance(analysis, dict):
+        return None
+
+    roadmap = analysis.get("roadmap") if isinstance(analysis.get("roadmap"), dict) else {}
+    raw_milestones = roadmap.get("weekly_milestones") or analysis.get("weekly_milestones") or []
+    by_week = {m.get("week"): m for m in raw_milestones if isinstance(m, dict)}
+    milestones = [by_week.get(w, {"week": w}) for w in range(1, 5)]
+
+    logger.info("Call 1b: days for weeks 1-4 (parallel)")
+    gaps = _gap_skills(analysis)
+    weeks = await asyncio.gather(*(
+        _generate_week(req, w, milestones[w - 1], gaps, llm) for w in range(1, 5)
+    ))
+
+    analysis["roadmap"] = {
+        "days": [d for week_days in weeks for d in week_days],
+        "weekly_milestones": [m for m in raw_milestones if isinstance(m, dict)],
+    }
+    analysis.pop("weekly_milestones", None)
+    logger.info("Chunked roadmap: %d days merged", len(analysis["roadmap"]["days"]))
+    return analysis
+
+
+# ── Baseline personalization ────────────────────────────────────
+def _merge_selected_days(raw_days, numbers: list[int]) -> dict[int, dict]:
+    """
+    Valid rewritten days keyed by day number, restricted to `numbers`.
+    If the model renumbered them (e.g. 1..n), they are mapped back in order.
+    """
+    if not isinstance(raw_days, list):
+        return {}
+    candidates = [d for d in raw_days if isinstance(d, dict)]
+    wanted = set(numbers)
+    absolute = all(d.get("day") in wanted for d in candidates)
+
+    days = {}
+    for i, d in enumerate(candidates):
+        day_num = d.get("day") if absolute else (numbers[i] if i < len(numbers) else None)
+        if day_num not in wanted or day_num in days:
+            continue
+        try:
+            days[day_num] = DayPlan(**{**d, "day": day_num}).model_dump()
+        except Exception:
+            continue
+    return days
+
+
+async def generate_roadmap_from_baseline(
+    req: RoadmapRequest, role_context: str, github_context: str, baseline: dict, llm: LLMCaller = direct_llm,
+) -> dict | None:
+    """
+    Baseline Call 1: the student's analysis, then only the baseline days that
+    touch their gaps (or repeat what they know) are rewritten.
+    Returns None if the analysis call fails (caller falls back to the baseline).
+    """
+    logger.info("Call 1a: skills/gaps")
+    prompt = build_analysis_prompt(req.resume_text, req.dream_role, role_context, github_context)
+    analysis = await llm(prompt, ANALYSIS_SCHEMA)
+    if not isinstance(analysis, dict):
+        return None
+    analysis = post_process_roadmap(analysis, req.dream_role)
+
+    days = baseline["roadmap"]["days"]
+    gaps = _gap_skills(analysis)
+    with span("select_days") as sp:
+        numbers = select_days(days, gaps, known_skills(analysis))
+        sp.set(days=len(numbers))
+
+    rewritten = {}
+    if numbers:
+        logger.info("Call 1b: personalizing %d baseline days", len(numbers))
+        selected = [d for d in days if d["day"] in numbers]
+        prompt = build_personalize_prompt(req.dream_role, selected, gaps, known_skills(analysis))
+        result = await llm(prompt, week_schema(len(numbers)))
+        if isinstance(result, dict):
+            rewritten = _merge_selected_days(result.get("days"), numbers)
+        logger.info("Personalized %d/%d baseline days", len(rewritten), len(numbers))
+
+    # Baseline days and milestones; the analysis' milestones describe a plan
+    # that was never generated, so they are dropped
+    analysis["roadmap"] = {
+        "days": [rewritten.get(d["day"], d) for d in days],
+        "weekly_milestones": baseline["roadmap"]["weekly_milestones"],
+    }
+    analysis["flagship_project"] = baseline.get("flagship_project", {})
+    return analysis
+
+
+# ── Context builders ────────────────────────────────────────────
+def load_roles(path: Path = ROLES_PATH, db_path: str = ROLES_DB) -> RoleRegistry:
+    """Open the role catalog (re-imported into SQLite if roles.json changed); empty if missing."""
+    roles = RoleRegistry.open(path, db_path)
+    logger.info("Loaded %d roles", len(roles))
+    return roles
+
+
+def resolve_role(roles, req: RoadmapRequest) -> RoadmapRequest:
+    """Map a free-text dream role ("Sr. Backend Dev") onto its catalog name; custom roles pass through."""
+    if not isinstance(roles, RoleRegistry) or req.dream_role in roles:
+        return req
+    with span("role_resolve", role=req.dream_role) as sp:
+        match = roles.match(req.dream_role)
+        sp.set(found=match is not None)
+        if match is None:
+            return req
+        logger.info("Role %r resolved to %r (similarity %.2f)", req.dream_role, match[0], match[1])
+        sp.set(match=match[0])
+        return req.model_copy(update={"dream_role": match[0]})
+
+
+def build_role_context(roles: dict, dream_role: str) -> str:
+    """Role requirements from roles.json, or a generic hint for custom roles."""
+    with span("role_lookup", role=dream_role) as sp:
+        role_skills = roles.get(dream_role)
+        sp.set(found=bool(role_skills))
+        if role_skills:
+            return json.dumps(role_skills, indent=2)
+        return f"General skills for a {dream_role} role."
+
+
+def build_github_context(username: str, deadline: float | None = None) -> str:
+    """Formatted GitHub summary for the prompt, or "" if unavailable (or out of time)."""
+    if not username.strip():
+        return ""
+    logger.debug("Fetching GitHub profile: %s", username)
+    gh_summary = fetch_github_profile(username.strip(), deadline)
+    if gh_summary:
+        return format_github_context(gh_summary)
+    logger.info("GitHub fetch failed, continuing without it")
+    return ""
+
+
+def fit_resume(req: RoadmapRequest, role_context: str, github_context: str) -> RoadmapRequest:
+    """
+    Condense the resume if Call 1's prompt plus its expected output would
+    overflow LLM_MAX_CTX (otherwise Ollama silently truncates the prompt).
+    """
+    if ROADMAP_MODE in ("chunked", "baseline"):
+        template = build_analysis_prompt("", req.dream_role, role_context, github_context)
+        schema = ANALYSIS_SCHEMA
+    else:
+        template = build_roadmap_prompt("", req.dream_role, role_context, github_context)
+        schema = ROADMAP_SCHEMA
+    budget = resume_token_budget(template, schema)
+    condensed = condense_resume(req.resume_text, budget)
+    if condensed is req.resume_text:
+        return req
+    return req.model_copy(update={"resume_text": condensed})
+
+
+# ── Pipeline ────────────────────────────────────────────────────
+async def run_roadmap_pipeline(
+    req: RoadmapRequest,
+    role_context: str,
+    github_context: str,
+    llm: LLMCaller = direct_llm,
+    on_section: SectionCallback | None = None,
+    overloaded: Callable[[], bool] | None = None,
+    role: dict | None = None,
+    deadline: float | None = None,
+) -> dict:
+    """
+    Call 1 + Call 2 with post-processing. Never returns None — if the LLM
+    fails, falls back to a rule-based roadmap built from `role` (the roles.json
+    entry), else the role's baseline, else mock data (template_engine.py).
+    `on_section(name, data)` is called as each section becomes available.
+    If `overloaded()` is true, the same fallback is served without any LLM call.
+    With a `deadline` (time.monotonic()), Call 1 must finish PROJECT_BUDGET
+    seconds before it; days it didn't produce come from the rule-based plan.
+    Call 2 runs only with PROJECT_MIN_BUDGET seconds left, else the project
+    is built from the gap analysis without the LLM.
+    """
+    # Near-duplicate resume for the same role: reuse its Call 1 sections
+    reused, fp = None, None
+    if RESUME_REUSE:
+        with span("resume_reuse") as sp:
+            fp = fingerprint(req.resume_text)
+            reused = resume_index.lookup(req.dream_role, fp, github_context)
+            sp.set(hit=reused is not None)
+            if reused is not None:
+                sp.set(similarity=round(reused[1], 3))
+
+    baseline = get_baseline(req.dream_role) if reused is None else None
+    under_load = (
+        reused is None and (role is not None or baseline is not None)
+        and overloaded is not None and overloaded()
+    )
+
+    if reused is not None:
+        logger.info("Call 1 skipped: near-duplicate resume (similarity %.2f)", reused[1])
+        result = reused[0]
+    elif under_load:
+        logger.info("LLM overloaded: serving a rule-based %s roadmap", req.dream_role)
+        with span("degraded", under_load=True):
+            result = post_process_roadmap(
+                degraded_roadmap(req.dream_role, req.resume_text, role, reason="overload"), req.dream_role,
+            )
+    else:
+        resume_text = req.resume_text     # the fallback reads the full resume, not the condensed one
+        req = fit_resume(req, role_context, github_context)
+        call1_llm = bounded_llm(llm, stage_deadline(deadline, reserve=PROJECT_BUDGET))
+        if ROADMAP_MODE == "baseline" and baseline is not None:
+            result = await generate_roadmap_from_baseline(req, role_context, github_context, baseline, call1_llm)
+        elif ROADMAP_MODE == "chunked":
+            result = await generate_roadmap_chunked(req, role_context, github_context, call1_llm)
+        else:
+            # Build prompt for Call 1: skills, gaps, roadmap
+            with span("build_roadmap_prompt"):
+                prompt = build_roadmap_prompt(req.resume_text, req.dream_role, role_context, github_context)
+
+            # Call 1: LLM for roadmap
+            logger.info("Call 1: skills/gaps/roadmap")
+            result = await call1_llm(prompt, ROADMAP_SCHEMA)
+
+        # Fallback to a rule-based roadmap (or the baseline / mock data) if LLM fails
+        from_llm = result is not None
+        if not from_llm:
+            logger.warning("Using fallback roadmap for %s", req.dream_role)
+            with span("degraded", under_load=False):
+                result = degraded_roadmap(req.dream_role, resume_text, role)
+        elif role and deadline is not None:
+            # Weeks cut off by the budget: rule-based days instead of generic padding
+            filled = fill_missing_days(result, req.dream_role, resume_text, role)
+            if filled:
+                logger.warning("Call 1 partial: %d rule-based day(s) filled in", len(filled))
+                from_llm = False     # don't reuse a partial result for near-duplicate resumes
+
+        # Post-process Call 1 result
+        with span("post_process_roadmap"):
+            result = post_process_roadmap(result, req.dream_role)
+        if from_llm and fp is not None:
+            resume_index.add(req.dream_role, fp, result, github_context)
+    if on_section:
+        for name in ("reasoning", "skill_map", "role_requirements", "gap_analysis", "roadmap"):
+            on_section(name, result[name])
+
+    if under_load:
+        # The fallback's own project — no Call 2 either
+        if on_section:
+            on_section("flagship_project", result["flagship_project"])
+        return result
+
+    if time_left(deadline) < PROJECT_MIN_BUDGET:
+        logger.warning("%.1fs left: template project instead of Call 2", max(0.0, time_left(deadline)))
+        with span("degraded", stage="project"):
+            result["flagship_project"] = normalize_project(template_project(req.dream_role, role, result), req.dream_role)
+        if on_section:
+            on_section("flagship_project", result["flagship_project"])
+        return result
+
+    # Call 2: Flagship project (using gap data from Call 1)
+    logger.info("Call 2: flagship project")
+    skills_list = [s.get("name", "") for s in result.get("skill_map", {}).get("skills", [])]
+    gaps_list = _gap_skills(result)
+
+    project_prompt = build_project_prompt(req.dream_role, skills_list, gaps_list)
+    project_result = await bounded_llm(llm, deadline)(project_prompt, PROJECT_SCHEMA)
+
+    if project_result and isinstance(project_result, dict):
+        # Extract flagship_project from response (may be nested or at top level)
+        project = project_result.get("flagship_project") or project_result.get("project") or project_result
+        if isinstance(project, dict) and ("title" in project or "name" in project):
+            # Only the project changed — normalize just that section
+            result["flagship_project"] = normalize_project(project, req.dream_role)
+            logger.debug("Project merged from Call 2")
+        else:
+            logger.warning("Call 2 returned unexpected format, using defaults")
+    elif time_left(deadline) <= 0:
+        logger.warning("Call 2 ran out of time, using template project")
+        result["flagship_project"] = normalize_project(template_project(req.dream_role, role, result), req.dream_role)
+    else:
+        logger.warning("Call 2 failed, using default project")
+
+    if not result.get("flagship_project"):
+        # Reused sections carry no project of their own
+        result["flagship_project"] = normalize_project(template_project(req.dream_role, role, result), req.dream_role)
+
+    if on_section:
+        on_section("flagship_project", result["flagship_project"])
+    return result
+
+
+def to_roadmap_response(result: dict, dream_role: str = "") -> tuple[RoadmapResponse, dict]:
+    """Validate a pipeline result; falls back to the role's baseline (or mock data) if it doesn't fit the schema."""
+    with span("validate") as sp:
+        try:
+            return validate(RoadmapResponse, result), result
+        except Exception as e:
+            logger.warning("Validation error: %s, using fallback", e)
+            sp.set(fallback="baseline" if get_baseline(dream_role) else "mock")
+            fallback = fallback_roadmap(dream_role)
+            return validate(RoadmapResponse, fallback), fallback
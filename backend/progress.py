@@ -0,0 +1,310 @@
+"""
+Progress tracking and automatic adaptation triggers.
+
+Students report each day as they go (completed / skipped, hours spent);
+the server decides when the plan has drifted far enough to re-plan, and
+re-plans in the background when the LLM has spare capacity.
+
+Features:
+  - Append-only event log in a local SQLite file (PROGRESS_DB)
+  - Compact per-user aggregates: latest status per day (at most 30 rows)
+    plus one summary row, updated in the same transaction as the event
+  - Drift: skipped days, unreported days before the latest reported one,
+    and hour shortfalls as a fraction of the planned day; counted since
+    the last adaptation
+  - Trigger policy: a user is due once drift reaches ADAPT_DRIFT_THRESHOLD
+    days; every ADAPT_BATCH_INTERVAL seconds, while the LLM queue is idle,
+    AdaptationBatcher tries up to ADAPT_BATCH_SIZE due users in turn and
+    stops at the first re-plan (the stored roadmap is still shared by all
+    users, so a second re-plan in the same round would only redo it)
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from config import env
+from scheduler import QueueFullError
+from log_config import get_logger
+import metrics
+
+
+# ── Constants ───────────────────────────────────────────────────
+
+PROGRESS_DB = env("PROGRESS_DB", str(Path(__file__).parent / "data" / "progress.db"))
+ADAPT_DRIFT_THRESHOLD = float(env("ADAPT_DRIFT_THRESHOLD", "3"))    # days behind plan
+ADAPT_BATCH_INTERVAL = float(env("ADAPT_BATCH_INTERVAL", "60"))     # seconds (0 = no background adaptation)
+ADAPT_BATCH_SIZE = int(env("ADAPT_BATCH_SIZE", "4"))          # due users tried per round
+
+STATUS_COMPLETED = "completed"
+STATUS_SKIPPED = "skipped"
+
+logger = get_logger("progress")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS progress_events (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id         TEXT NOT NULL,
+    roadmap_version INTEGER NOT NULL,
+    day             INTEGER NOT NULL,
+    status          TEXT NOT NULL,
+    hours           REAL NOT NULL,
+    planned_hours   REAL NOT NULL,
+    created_at      REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS progress_days (
+    user_id         TEXT NOT NULL,
+    day             INTEGER NOT NULL,
+    status          TEXT NOT NULL,
+    hours           REAL NOT NULL,
+    planned_hours   REAL NOT NULL,
+    PRIMARY KEY (user_id, day)
+);
+CREATE TABLE IF NOT EXISTS progress (
+    user_id         TEXT PRIMARY KEY,
+    roadmap_version INTEGER NOT NULL,
+    days_completed  INTEGER NOT NULL,
+    days_skipped    INTEGER NOT NULL,
+    days_missed     INTEGER NOT NULL,
+    hours_spent     REAL NOT NULL,
+    hours_planned   REAL NOT NULL,
+    last_day        INTEGER NOT NULL,
+    drift_total     REAL NOT NULL,
+    drift_adapted   REAL NOT NULL DEFAULT 0,
+    due             INTEGER NOT NULL DEFAULT 0,
+    adapted_at      REAL,
+    updated_at      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS progress_due ON progress (due, updated_at);
+"""
+
+
+def shortfall(status: str, hours: float, planned_hours: float) -> float:
+    """Days of drift one reported day adds: 1 for a skip, the unmet fraction of a short day."""
+    if status == STATUS_SKIPPED:
+        return 1.0
+    if planned_hours <= 0:
+        return 0.0
+    return max(0.0, planned_hours - hours) / planned_hours
+
+
+# ── Store ───────────────────────────────────────────────────────
+
+class ProgressStore:
+    """SQLite-backed progress log and aggregates. All methods are synchronous and short."""
+
+    def __init__(self, path: str = PROGRESS_DB, threshold: float = ADAPT_DRIFT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def record(
+        self, user_id: str, roadmap_version: int, day: int, status: str,
+        hours: float | None = None, planned_hours: float = 0.0,
+    ) -> dict:
+        """Append one day report and refresh the user's aggregate. Returns the new summary."""
+        if hours is None:
+            hours = planned_hours if status == STATUS_COMPLETED else 0.0
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO progress_events (user_id, roadmap_version, day, status, hours, planned_hours, created_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (user_id, roadmap_version, day, status, hours, planned_hours, now),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO progress_days (user_id, day, status, hours, planned_hours)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (user_id, day, status, hours, planned_hours),
+                )
+                self._refresh(user_id, roadmap_version, now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._summary(user_id)
+
+    def _refresh(self, user_id: str, roadmap_version: int, now: float) -> None:
+        days = self._conn.execute(
+            "SELECT day, status, hours, planned_hours FROM progress_days WHERE user_id = ?", (user_id,),
+        ).fetchall()
+        last_day = max(row["day"] for row in days)
+        completed = sum(row["status"] == STATUS_COMPLETED for row in days)
+        skipped = len(days) - completed
+        unreported = last_day - len(days)
+        drift = unreported + sum(shortfall(row["status"], row["hours"], row["planned_hours"]) for row in days)
+        row = self._conn.execute("SELECT drift_adapted FROM progress WHERE user_id = ?", (user_id,)).fetchone()
+        drift_adapted = row["drift_adapted"] if row else 0.0
+        self._conn.execute(
+            "INSERT OR REPLACE INTO progress (user_id, roadmap_version, days_completed, days_skipped, days_missed,"
+            " hours_spent, hours_planned, last_day, drift_total, drift_adapted, due, adapted_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, (SELECT adapted_at FROM progress WHERE user_id = ?), ?)",
+            (
+                user_id, roadmap_version, completed, skipped, skipped + unreported,
+                sum(row["hours"] for row in days), sum(row["planned_hours"] for row in days), last_day,
+                drift, drift_adapted, int(drift - drift_adapted >= self.threshold), user_id, now,
+            ),
+        )
+
+    def summary(self, user_id: str) -> dict | None:
+        with self._lock:
+            return self._summary(user_id)
+
+    def _summary(self, user_id: str) -> dict | None:
+        row = self._conn.execute("SELECT * FROM progress WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            return None
+        days = self._conn.execute(
+            "SELECT day, status FROM progress_days WHERE user_id = ? ORDER BY day", (user_id,),
+        ).fetchall()
+        return _row_to_summary(row, days)
+
+    def due(self, limit: int = ADAPT_BATCH_SIZE) -> list[dict]:
+        """Users whose drift crossed the threshold, longest-waiting first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id FROM progress WHERE due = 1 ORDER BY updated_at LIMIT ?", (limit,),
+            ).fetchall()
+            return [self._summary(row["user_id"]) for row in rows]
+
+    def mark_adapted(self, user_id: str, drift_total: float) -> None:
+        """Drift up to `drift_total` is now planned for; later reports count towards the next trigger."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE progress SET drift_adapted = ?, due = (drift_total - ? >= ?), adapted_at = ?"
+                " WHERE user_id = ?",
+                (drift_total, drift_total, self.threshold, time.time(), user_id),
+            )
+
+    def reset(self, user_id: str) -> None:
+        """A new roadmap: drop the aggregates. The event log is kept."""
+        with self._lock:
+            self._conn.execute("DELETE FROM progress_days WHERE user_id = ?", (user_id,))
+            self._conn.execute("DELETE FROM progress WHERE user_id = ?", (user_id,))
+
+    def events(self, user_id: str) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT roadmap_version, day, status, hours, planned_hours, created_at FROM progress_events"
+                " WHERE user_id = ? ORDER BY id", (user_id,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def counts(self) -> dict:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) AS users, COALESCE(SUM(due), 0) AS due FROM progress").fetchone()
+        return {"users": row["users"], "due": row["due"]}
+
+
+def _row_to_summary(row: sqlite3.Row, days: list[sqlite3.Row]) -> dict:
+    return {
+        "user_id": row["user_id"],
+        "roadmap_version": row["roadmap_version"],
+        "days_completed": row["days_completed"],
+        "days_skipped": row["days_skipped"],
+        "days_missed": row["days_missed"],
+        "hours_spent": round(row["hours_spent"], 2),
+        "hours_planned": round(row["hours_planned"], 2),
+        "last_day": row["last_day"],
+        "completed_days": [d["day"] for d in days if d["status"] == STATUS_COMPLETED],
+        "skipped_days": [d["day"] for d in days if d["status"] == STATUS_SKIPPED],
+        "drift_total": row["drift_total"],
+        "drift": round(row["drift_total"] - row["drift_adapted"], 2),
+        "adaptation_due": bool(row["due"]),
+        "adapted_at": row["adapted_at"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def progress_prompt(summary: dict) -> str:
+    """Per-day progress for the adaptation prompt, richer than the coarse counts."""
+    return (
+        f"PROGRESS LOG: completed days {summary['completed_days'] or 'none'}; "
+        f"skipped days {summary['skipped_days'] or 'none'}; "
+        f"{summary['days_missed']} day(s) skipped or unreported up to day {summary['last_day']}; "
+        f"{summary['hours_spent']:g} of {summary['hours_planned']:g} planned hours spent."
+    )
+
+
+# ── Background adaptation ───────────────────────────────────────
+
+Adapter = Callable[[dict], Awaitable[bool | None]]
+
+
+class AdaptationBatcher:
+    """
+    Re-plans due users when the LLM queue is idle, instead of on demand.
+    `adapt(summary)` returns True once the new plan is stored, False if it
+    failed, or None if the roadmap was replaced while it ran (not a
+    failure). Users not re-planned stay due and are retried next round.
+    Users are adapted one at a time and a round ends at the first re-plan:
+    with one roadmap shared by every user, concurrent adaptations would all
+    but one lose the version check.
+    """
+
+    def __init__(
+        self, store: ProgressStore, adapt: Adapter, off_peak: Callable[[], bool],
+        interval: float = ADAPT_BATCH_INTERVAL, batch_size: int = ADAPT_BATCH_SIZE,
+    ):
+        self.store = store
+        self.adapt = adapt
+        self.off_peak = off_peak
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self._task: asyncio.Task | None = None
+
+    async def run_once(self) -> int:
+        """One round; the number of users re-planned (0 or 1)."""
+        for summary in self.store.due(self.batch_size):
+            if not self.off_peak():
+                return 0
+            outcome = await self._adapt_one(summary)
+            if outcome == "adapted":
+                logger.info("Background adaptation: re-planned for %s", summary["user_id"])
+                return 1
+            if outcome == "deferred":
+                return 0
+        return 0
+
+    async def _adapt_one(self, summary: dict) -> str:
+        try:
+            adapted = await self.adapt(summary)
+        except QueueFullError:
+            metrics.AUTO_ADAPTATIONS.inc(outcome="deferred")
+            return "deferred"
+        except Exception as e:
+            logger.exception("Background adaptation for %s failed: %s", summary["user_id"], e)
+            adapted = False
+        if adapted:
+            self.store.mark_adapted(summary["user_id"], summary["drift_total"])
+        outcome = "superseded" if adapted is None else ("adapted" if adapted else "failed")
+        metrics.AUTO_ADAPTATIONS.inc(outcome=outcome)
+        return outcome
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Background adaptation round failed")
+
+    def start(self) -> None:
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
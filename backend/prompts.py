@@ -61,6 +61,125 @@ RULES:
 Generate all 30 days with real content based on the resume."""
 
 
+def build_analysis_prompt(resume_text: str, dream_role: str, role_skills: str, github_context: str = "") -> str:
+    """Chunked Call 1: skills, gaps and 4 weekly milestones (days are generated per week)."""
+    github_section = ""
+    if github_context.strip():
+        github_section = f"\nGITHUB PROFILE:\n{github_context}\n"
+
+    return f"""You are Career Brain. Analyze this student for the "{dream_role}" role.
+
+RESUME:
+{resume_text}
+
+ROLE SKILLS:
+{role_skills}
+{github_section}
+Return JSON with reasoning, skill analysis, gap analysis, and 4 weekly milestones for a 30-day plan.
+
+RULES:
+1. weekly_milestones must have EXACTLY 4 objects (week 1 to week 4).
+2. Milestones must build on each other and cover the critical gaps first.
+3. Every field must have real content. No empty strings.
+4. Return ONLY valid JSON.
+
+{{
+  "reasoning": "2-3 sentences about this student's situation and roadmap strategy.",
+  "skill_map": {{
+    "skills": [{{"name": "SKILL", "level": "beginner|intermediate|advanced", "category": "technical|soft|tool"}}],
+    "strengths": ["STRENGTH"],
+    "weaknesses": ["WEAKNESS"]
+  }},
+  "role_requirements": {{
+    "core_technical": ["SKILL"],
+    "supporting_skills": ["SKILL"],
+    "theory_math": ["TOPIC"],
+    "tools": ["TOOL"],
+    "soft_skills": ["SKILL"],
+    "portfolio_expectations": ["EXPECTATION"]
+  }},
+  "gap_analysis": {{
+    "critical": [{{"skill": "SKILL", "reason": "WHY"}}],
+    "important": [{{"skill": "SKILL", "reason": "WHY"}}],
+    "nice_to_have": [{{"skill": "SKILL", "reason": "WHY"}}]
+  }},
+  "roadmap": {{
+    "weekly_milestones": [
+      {{"week": 1, "milestone": "ACHIEVED", "skills_gained": ["SKILL"]}},
+      {{"week": 2, "milestone": "...", "skills_gained": ["..."]}},
+      {{"week": 3, "milestone": "...", "skills_gained": ["..."]}},
+      {{"week": 4, "milestone": "...", "skills_gained": ["..."]}}
+    ]
+  }}
+}}"""
+
+
+def build_week_prompt(
+    dream_role: str,
+    week: int,
+    milestone: str,
+    skills_gained: list,
+    gaps: list,
+    first_day: int,
+    last_day: int,
+) -> str:
+    """Chunked Call 1b: the daily plan for a single week, conditioned on its milestone."""
+    skills_text = ", ".join(skills_gained[:8]) if skills_gained else f"{dream_role} foundations"
+    gaps_text = ", ".join(gaps[:8]) if gaps else "core role skills"
+    count = last_day - first_day + 1
+
+    return f"""You are Career Brain. Plan week {week} of a 30-day roadmap for a student targeting the "{dream_role}" role.
+
+WEEK {week} MILESTONE: {milestone}
+SKILLS TO GAIN THIS WEEK: {skills_text}
+STUDENT'S KEY GAPS: {gaps_text}
+
+RULES:
+1. days must have EXACTLY {count} objects (day {first_day} to day {last_day}).
+2. Every day must move the student towards the week {week} milestone.
+3. Every field must have real content. No empty strings.
+4. Return ONLY valid JSON.
+
+{{
+  "days": [
+    {{"day": {first_day}, "objective": "WHAT", "resource": "WHERE", "task": "DO_WHAT", "hours": 2}},
+    {{"day": {last_day}, "objective": "...", "resource": "...", "task": "...", "hours": 2}}
+  ]
+}}"""
+
+
+def build_personalize_prompt(dream_role: str, days: list, gaps: list, known: list) -> str:
+    """Baseline mode: rewrite selected days of a role's standard plan for one student."""
+    gaps_text = ", ".join(gaps[:8]) if gaps else "core role skills"
+    known_text = ", ".join(known[:10]) if known else "none yet"
+    days_text = "\n".join(
+        f'- day {d["day"]}: {d.get("objective", "")} — {d.get("task", "")}' for d in days
+    )
+    count = len(days)
+
+    return f"""You are Career Brain. A student targeting the "{dream_role}" role is following a standard 30-day plan.
+Rewrite ONLY these {count} days for this student.
+
+DAYS TO REWRITE:
+{days_text}
+
+STUDENT'S KEY GAPS: {gaps_text}
+SKILLS THE STUDENT ALREADY HAS: {known_text}
+
+RULES:
+1. days must have EXACTLY {count} objects, with the same day numbers as above.
+2. Days on skills the student already has must be replaced with their key gaps.
+3. Days on the student's gaps stay on topic but match the student's level.
+4. Every field must have real content. No empty strings.
+5. Return ONLY valid JSON.
+
+{{
+  "days": [
+    {{"day": {days[0]["day"] if days else 1}, "objective": "WHAT", "resource": "WHERE", "task": "DO_WHAT", "hours": 2}}
+  ]
+}}"""
+
+
 def build_project_prompt(dream_role: str, skills: list, gaps: list) -> str:
     """Call 2: Flagship project based on the gap analysis from Call 1."""
     skills_text = ", ".join(skills[:10]) if skills else "general skills"
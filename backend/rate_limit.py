@@ -0,0 +1,165 @@
+"""
+Per-client rate limiting and LLM-token quotas for the LLM-backed endpoints.
+
+Features:
+  - Two token buckets per client (API key, else IP — the scheduler's
+    fairness key):
+      requests    RATE_LIMIT_BURST calls, refilled at RATE_LIMIT_PER_MIN
+      LLM tokens  LLM_TOKEN_QUOTA prompt + generated tokens, refilled over
+                  LLM_TOKEN_WINDOW seconds
+  - Requests are admitted while both buckets are positive; LLM calls are
+    charged afterwards with Ollama's actual prompt_eval_count + eval_count
+    (client-side estimates only for calls stopped before the done chunk),
+    so a long generation can leave the token bucket in debt
+  - Cohort batches are admitted row by row against the submitting client
+  - Buckets live in a local SQLite file (RATE_LIMIT_DB, WAL mode) and are
+    updated in one write transaction, so limits hold across workers
+  - Refused calls raise RateLimitedError → 429 with a Retry-After of the
+    time until the bucket refills
+"""
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from config import env
+from log_config import get_logger
+import metrics
+
+
+# ── Constants ───────────────────────────────────────────────────
+
+RATE_LIMIT_DB = env("RATE_LIMIT_DB", str(Path(__file__).parent / "data" / "ratelimit.db"))
+RATE_LIMIT_PER_MIN = float(env("RATE_LIMIT_PER_MIN", "6"))       # 0 = no request limit
+RATE_LIMIT_BURST = float(env("RATE_LIMIT_BURST", "10"))
+LLM_TOKEN_QUOTA = float(env("LLM_TOKEN_QUOTA", "300000"))        # 0 = no token quota
+LLM_TOKEN_WINDOW = float(env("LLM_TOKEN_WINDOW", "3600"))        # seconds to refill the full quota
+PRUNE_EVERY = 1000   # admissions between sweeps of idle (fully refilled) buckets
+
+logger = get_logger("ratelimit")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    client_id   TEXT PRIMARY KEY,
+    requests    REAL NOT NULL,
+    tokens      REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+"""
+
+
+# ── Errors ──────────────────────────────────────────────────────
+
+class RateLimitedError(Exception):
+    """Raised when a client is over its request rate or LLM-token quota. Carries a Retry-After hint."""
+
+    def __init__(self, retry_after: int, limit: str):
+        super().__init__(f"Rate limit ({limit}) exceeded, retry after {retry_after}s")
+        self.retry_after = retry_after
+        self.limit = limit
+
+
+# ── Limiter ─────────────────────────────────────────────────────
+
+class RateLimiter:
+    """SQLite-backed token buckets. All methods are synchronous and short."""
+
+    def __init__(
+        self,
+        path: str = RATE_LIMIT_DB,
+        per_minute: float = RATE_LIMIT_PER_MIN,
+        burst: float = RATE_LIMIT_BURST,
+        token_quota: float = LLM_TOKEN_QUOTA,
+        token_window: float = LLM_TOKEN_WINDOW,
+    ):
+        self.path = path
+        self.request_rate = per_minute / 60        # requests per second
+        self.burst = max(1.0, burst)
+        self.token_quota = token_quota
+        self.token_rate = token_quota / token_window if token_window > 0 else token_quota
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._admitted = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.request_rate > 0 or self.token_quota > 0
+
+    def _refilled(self, row: sqlite3.Row | None, now: float) -> tuple[float, float]:
+        if row is None:
+            return self.burst, self.token_quota
+        elapsed = max(0.0, now - row["updated_at"])
+        return (
+            min(self.burst, row["requests"] + elapsed * self.request_rate),
+            min(self.token_quota, row["tokens"] + elapsed * self.token_rate),
+        )
+
+    def _update(self, client_id: str, change) -> tuple[float, float]:
+        """Refill, apply change(requests, tokens) → new balances (or raise), and save — one transaction."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT * FROM buckets WHERE client_id = ?", (client_id,)).fetchone()
+                requests, tokens = change(*self._refilled(row, now))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (client_id, requests, tokens, updated_at) VALUES (?, ?, ?, ?)",
+                    (client_id, requests, tokens, now),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return requests, tokens
+
+    def acquire(self, client_id: str) -> dict:
+        """Admit one LLM-backed request, or raise RateLimitedError. Returns the balances left."""
+        if not self.enabled:
+            return {}
+
+        def take(requests: float, tokens: float) -> tuple[float, float]:
+            if self.token_quota > 0 and tokens <= 0:
+                raise RateLimitedError(math.ceil((1 - tokens) / self.token_rate), "llm_tokens")
+            if self.request_rate > 0:
+                if requests < 1:
+                    raise RateLimitedError(math.ceil((1 - requests) / self.request_rate), "requests")
+                requests -= 1
+            return requests, tokens
+
+        try:
+            requests, tokens = self._update(client_id, take)
+        except RateLimitedError as e:
+            metrics.RATE_LIMITED.inc(limit=e.limit)
+            logger.info("Rate limited %s (%s), retry after %ds", client_id, e.limit, e.retry_after)
+            raise
+        self._admitted += 1
+        if self._admitted % PRUNE_EVERY == 0:
+            self.prune()
+        return {"requests_left": math.floor(requests), "tokens_left": math.floor(tokens)}
+
+    def charge(self, client_id: str, tokens: int) -> None:
+        """Deduct the LLM tokens a call actually used (prompt + generated)."""
+        if self.token_quota > 0 and tokens > 0:
+            self._update(client_id, lambda requests, balance: (requests, balance - tokens))
+
+    def status(self, client_id: str) -> dict:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM buckets WHERE client_id = ?", (client_id,)).fetchone()
+        requests, tokens = self._refilled(row, time.time())
+        return {"requests_left": math.floor(requests), "tokens_left": math.floor(tokens)}
+
+    def prune(self) -> int:
+        """Drop buckets idle long enough to be full again — the same as no row."""
+        refill = max(
+            self.burst / self.request_rate if self.request_rate > 0 else 0,
+            self.token_quota / self.token_rate if self.token_rate > 0 else 0,
+        )
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM buckets WHERE updated_at < ?", (time.time() - refill,))
+        return cur.rowcount
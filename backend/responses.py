@@ -0,0 +1,189 @@
+"""
+Fast JSON responses for the large roadmap payloads.
+
+  - Validate once: endpoints validate LLM output into the response model
+    themselves and return a Response, so FastAPI's response_model step
+    (re-validation + jsonable_encoder + json.dumps) is skipped
+  - Serialize straight to bytes with pydantic-core (cached TypeAdapters)
+  - Compress with brotli (if installed) or gzip when the client accepts
+    it and the body is at least COMPRESS_MIN_BYTES
+  - Rarely-changing bodies (/roles, /sample-resume) are serialized, hashed
+    and compressed once, and served with a strong ETag, Cache-Control and
+    304 Not Modified; file-backed ones rebuild when the file changes
+"""
+import functools
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+from config import env
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESS_MIN_BYTES = int(env("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 3       # within 7% of level 9 on roadmap JSON at under half the CPU
+BROTLI_QUALITY = 4
+CACHE_MAX_AGE = int(env("CACHE_MAX_AGE", "300"))   # seconds browsers reuse a cached body before revalidating
+
+
+@functools.cache
+def adapter(model_type) -> TypeAdapter:
+    return TypeAdapter(model_type)
+
+
+def validate(model_type, data):
+    """Validate `data` into `model_type` — the only validation on the response path."""
+    return adapter(model_type).validate_python(data)
+
+
+def negotiate_encoding(accept_encoding: str, size: int) -> str | None:
+    """Best supported Content-Encoding for this body, or None to send it as is."""
+    if size < COMPRESS_MIN_BYTES or not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def encoded_response(
+    body: bytes,
+    request: Request,
+    media_type: str = "application/json",
+    status_code: int = 200,
+    headers: dict | None = None,
+) -> Response:
+    """Response for pre-serialized bytes, compressed if worthwhile."""
+    headers = dict(headers or {})
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), len(body))
+    if encoding == "br":
+        body = brotli.compress(body, quality=BROTLI_QUALITY)
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    headers["Vary"] = "Accept-Encoding"
+    return Response(body, status_code=status_code, headers=headers, media_type=media_type)
+
+
+def model_response(model, request: Request, status_code: int = 200) -> Response:
+    """Serialize an already-validated Pydantic model without re-validating it."""
+    return encoded_response(adapter(type(model)).dump_json(model), request, status_code=status_code)
+
+
+# ── Cacheable bodies ────────────────────────────────────────────
+class CachedBody:
+    """A JSON body serialized, hashed and compressed once. Each encoding is its own representation and ETag."""
+
+    __slots__ = ("body", "etag", "_variants")
+
+    def __init__(self, content):
+        self.body = json.dumps(content, separators=(",", ":")).encode()
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self._variants = {None: (self.body, self.etag)}
+        if len(self.body) >= COMPRESS_MIN_BYTES:
+            self._variants["gzip"] = (gzip.compress(self.body, compresslevel=9, mtime=0), f'"{digest}-gzip"')
+            if brotli is not None:
+                self._variants["br"] = (brotli.compress(self.body, quality=11), f'"{digest}-br"')
+
+    def variant(self, encoding: str | None) -> tuple[bytes, str]:
+        return self._variants.get(encoding, self._variants[None])
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check — weak comparison, as the spec requires for it."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def cached_response(cached: CachedBody, request: Request, max_age: int = CACHE_MAX_AGE) -> Response:
+    """200 with the precomputed bytes, or 304 if the client already has this representation."""
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), len(cached.body))
+    body, etag = cached.variant(encoding)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, headers=headers, media_type="application/json")
+
+
+class BodyCache:
+    """
+    Small LRU of CachedBody by key — for bodies that depend on query
+    parameters. Bound to one source object (`scope`, e.g. a catalog
+    snapshot): a get() for a different one starts the cache over.
+    """
+
+    def __init__(self, size: int = 256):
+        self.size = size
+        self._bodies: OrderedDict = OrderedDict()
+        self._scope = None
+        self._lock = threading.Lock()
+
+    def get(self, key, build: Callable[[], object], scope=None) -> CachedBody:
+        with self._lock:
+            if scope is not self._scope:
+                self._bodies.clear()
+                self._scope = scope
+            cached = self._bodies.get(key)
+            if cached is not None:
+                self._bodies.move_to_end(key)
+                return cached
+        cached = CachedBody(build())
+        with self._lock:
+            if scope is self._scope:
+                self._bodies[key] = cached
+                if len(self._bodies) > self.size:
+                    self._bodies.popitem(last=False)
+        return cached
+
+
+class FileBody:
+    """CachedBody built from a text file; rebuilt when the file's mtime or size changes (one stat per get)."""
+
+    def __init__(self, path: Path, build: Callable[[str | None], object]):
+        self.path = path
+        self.build = build     # file text (None if missing) → JSON content
+        self._stamp = object()
+        self._cached: CachedBody | None = None
+
+    def get(self) -> CachedBody:
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp != self._stamp or self._cached is None:
+            text = self.path.read_text(encoding="utf-8") if stamp is not None else None
+            self._cached, self._stamp = CachedBody(self.build(text)), stamp
+        return self._cached
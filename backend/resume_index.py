@@ -0,0 +1,176 @@
+"""
+Near-duplicate resume index — reuse Call 1 for template resumes.
+
+Features:
+  - Normalized text (lowercase, no emails/URLs/phone numbers) → word 3-shingles
+  - 64-hash MinHash signatures (XOR-mask family), LSH with 16 bands × 4 rows
+  - Candidates verified by exact Jaccard similarity ≥ RESUME_SIMILARITY
+  - One index per (dream_role, GitHub context): a match is only reused for
+    the same role and the same enrichment evidence
+  - Bounded LRU per index; invalidate(role) drops one role's entries
+  - Pure Python, deterministic across processes (blake2b shingle hashes)
+"""
+import copy
+import hashlib
+import random
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import metrics
+from config import env
+
+
+RESUME_REUSE = env("RESUME_REUSE", "true").lower() == "true"
+RESUME_SIMILARITY = float(env("RESUME_SIMILARITY", "0.85"))
+RESUME_INDEX_SIZE = int(env("RESUME_INDEX_SIZE", "256"))   # entries per role
+
+# Sections of a Call 1 result that depend only on the resume, role and GitHub
+# context. The flagship project (Call 2) is regenerated for every request.
+REUSED_SECTIONS = ("reasoning", "skill_map", "role_requirements", "gap_analysis", "roadmap")
+
+SHINGLE_WORDS = 3
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# h ^ mask is a cheap stand-in for a random permutation of 64-bit hashes —
+# 4x faster than (a*h + b) mod p in pure Python. Candidates are verified
+# by exact Jaccard, so weaker permutations cost only a little recall.
+_MASKS = [random.Random(0x5EED + i).getrandbits(64) for i in range(NUM_PERM)]
+
+_NOISE_RE = re.compile(r"\S+@\S+|https?://\S+|\S+\.(?:com|edu|org|io|dev)\S*|\+?\d[\d\s().-]{7,}\d")
+_WORD_RE = re.compile(r"[a-z][a-z0-9+#]*")
+
+
+# ── Fingerprints ────────────────────────────────────────────────
+@dataclass(frozen=True)
+class Fingerprint:
+    shingles: frozenset[int]
+    signature: tuple[int, ...]
+
+
+def _shingles(text: str) -> frozenset[int]:
+    words = _WORD_RE.findall(_NOISE_RE.sub(" ", text.lower()))
+    if len(words) < SHINGLE_WORDS:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)]
+    return frozenset(
+        int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "big") for g in grams
+    )
+
+
+def fingerprint(resume_text: str) -> Fingerprint:
+    """Shingle set and MinHash signature of a resume."""
+    shingles = _shingles(resume_text)
+    if not shingles:
+        return Fingerprint(shingles, ())
+    signature = tuple(min(map(mask.__xor__, shingles)) for mask in _MASKS)
+    return Fingerprint(shingles, signature)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+# ── Index ───────────────────────────────────────────────────────
+class _RoleIndex:
+    """LSH buckets + LRU entries for one (role, context)."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.entries: OrderedDict[int, tuple[Fingerprint, dict]] = OrderedDict()
+        self.bands: dict[tuple, set[int]] = {}
+        self._next_id = 0
+
+    def candidates(self, fp: Fingerprint) -> set[int]:
+        found: set[int] = set()
+        for key in _band_keys(fp):
+            found |= self.bands.get(key, set())
+        return found
+
+    def add(self, fp: Fingerprint, sections: dict) -> None:
+        entry_id = self._next_id
+        self._next_id += 1
+        self.entries[entry_id] = (fp, sections)
+        for key in _band_keys(fp):
+            self.bands.setdefault(key, set()).add(entry_id)
+        while len(self.entries) > self.capacity:
+            old_id, (old_fp, _) = self.entries.popitem(last=False)
+            for key in _band_keys(old_fp):
+                bucket = self.bands.get(key)
+                if bucket is not None:
+                    bucket.discard(old_id)
+                    if not bucket:
+                        del self.bands[key]
+
+
+def _band_keys(fp: Fingerprint):
+    for band in range(BANDS):
+        yield (band, *fp.signature[band * ROWS:(band + 1) * ROWS])
+
+
+def _context_key(context: str) -> str:
+    return hashlib.sha1(context.encode("utf-8")).hexdigest() if context else ""
+
+
+class ResumeIndex:
+    """Per-role MinHash/LSH index of Call 1 results. Thread-safe."""
+
+    def __init__(self, threshold: float = RESUME_SIMILARITY, capacity: int = RESUME_INDEX_SIZE):
+        self.threshold = threshold
+        self.capacity = capacity
+        self._indexes: dict[tuple[str, str], _RoleIndex] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, dream_role: str, fp: Fingerprint, context: str = "") -> tuple[dict, float] | None:
+        """Copy of the closest cached sections and their similarity, or None."""
+        if not fp.signature:
+            return None
+        with self._lock:
+            index = self._indexes.get((dream_role, _context_key(context)))
+            best_id, best_sim = None, 0.0
+            if index is not None:
+                for entry_id in index.candidates(fp):
+                    sim = jaccard(fp.shingles, index.entries[entry_id][0].shingles)
+                    if sim > best_sim:
+                        best_id, best_sim = entry_id, sim
+            if best_id is None or best_sim < self.threshold:
+                metrics.RESUME_REUSE.inc(outcome="miss")
+                return None
+            index.entries.move_to_end(best_id)
+            sections = index.entries[best_id][1]
+        metrics.RESUME_REUSE.inc(outcome="hit")
+        return copy.deepcopy(sections), best_sim
+
+    def add(self, dream_role: str, fp: Fingerprint, result: dict, context: str = "") -> None:
+        """Index the reusable sections of a successful Call 1 result."""
+        if not fp.signature:
+            return
+        sections = copy.deepcopy({name: result[name] for name in REUSED_SECTIONS if name in result})
+        with self._lock:
+            key = (dream_role, _context_key(context))
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = _RoleIndex(self.capacity)
+            index.add(fp, sections)
+
+    def invalidate(self, dream_role: str | None = None) -> None:
+        """Drop one role's entries (or everything)."""
+        with self._lock:
+            if dream_role is None:
+                self._indexes.clear()
+            else:
+                for key in [k for k in self._indexes if k[0] == dream_role]:
+                    del self._indexes[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(index.entries) for index in self._indexes.values())
+
+
+resume_index = ResumeIndex()
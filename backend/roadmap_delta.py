@@ -0,0 +1,150 @@
+"""
+Server-side roadmap merging and JSON Patch deltas for /adapt-roadmap.
+
+An adaptation only re-plans the remaining days, so the server folds it into
+the stored roadmap and can answer with just the difference.
+
+Features:
+  - merge_adaptation: adapted days replace stored days by day number,
+    adapted milestones and project features replace theirs by week; the
+    merged roadmap is the authoritative copy the next adaptation starts from.
+    Entries without a number in range (day 1-30, week 1-4) or repeating one
+    are dropped, so the stored plan keeps one entry per day/week
+  - make_patch: RFC 6902 JSON Patch (add / remove / replace) between two
+    JSON documents, field by field, so one changed day objective is one op;
+    a fully rewritten day or list is one replace, so a patch is never much
+    bigger than the full adaptation
+  - apply_patch: the client side of make_patch (used by tests and tooling)
+"""
+import copy
+import json
+
+DAYS = 30
+WEEKS = 4
+
+
+# ── Merge ───────────────────────────────────────────────────────
+def _numbered(items: list, key: str, last: int) -> dict[int, dict]:
+    """Entries by number; ones numbered outside 1..last (e.g. DayPlan's default 0) or repeated are dropped."""
+    by_number = {}
+    for item in items or []:
+        n = item.get(key) if isinstance(item, dict) else None
+        if isinstance(n, int) and not isinstance(n, bool) and 1 <= n <= last and n not in by_number:
+            by_number[n] = item
+    return by_number
+
+
+def _merge_by(items: list[dict], updates: list[dict], key: str, last: int) -> list[dict]:
+    merged = _numbered(items, key, last)
+    merged.update(_numbered(copy.deepcopy(updates), key, last))
+    return [merged[n] for n in sorted(merged)]
+
+
+def merge_adaptation(roadmap: dict, adaptation: dict) -> dict:
+    """A new roadmap dict: `roadmap` with an AdaptResponse dict folded in."""
+    merged = copy.deepcopy(roadmap)
+    adapted = adaptation.get("adapted_roadmap") or {}
+    plan = merged.setdefault("roadmap", {})
+    plan["days"] = _merge_by(plan.get("days", []), adapted.get("days", []), "day", DAYS)
+    plan["weekly_milestones"] = _merge_by(
+        plan.get("weekly_milestones", []), adapted.get("weekly_milestones", []), "week", WEEKS,
+    )
+    features = (adaptation.get("adapted_project") or {}).get("weekly_features", [])
+    if features:
+        project = merged.setdefault("flagship_project", {})
+        project["weekly_features"] = _merge_by(project.get("weekly_features", []), features, "week", WEEKS)
+    return merged
+
+
+# ── JSON Patch ──────────────────────────────────────────────────
+def _pointer(path: str, key) -> str:
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+def _size(value) -> int:
+    return len(json.dumps(value, separators=(",", ":"), ensure_ascii=False))
+
+
+def _child_patch(old, new, path: str) -> list[dict]:
+    """Field-level ops for a child, or one replace when that is smaller (a fully rewritten day)."""
+    ops = make_patch(old, new, path)
+    if len(ops) > 1 and isinstance(new, (dict, list)):
+        replace = [{"op": "replace", "path": path, "value": new}]
+        if _size(replace) < _size(ops):
+            return replace
+    return ops
+
+
+def make_patch(old, new, path: str = "") -> list[dict]:
+    """RFC 6902 operations turning `old` into `new`. Lists are compared by position."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = [{"op": "remove", "path": _pointer(path, key)} for key in old if key not in new]
+        for key, value in new.items():
+            if key in old:
+                ops.extend(_child_patch(old[key], value, _pointer(path, key)))
+            else:
+                ops.append({"op": "add", "path": _pointer(path, key), "value": value})
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        common = min(len(old), len(new))
+        ops = []
+        for i in range(common):
+            ops.extend(_child_patch(old[i], new[i], _pointer(path, i)))
+        ops.extend({"op": "add", "path": _pointer(path, i), "value": new[i]} for i in range(common, len(new)))
+        # Remove from the end so earlier indexes stay valid
+        ops.extend({"op": "remove", "path": _pointer(path, i)} for i in reversed(range(common, len(old))))
+        return ops
+    if old != new or type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def _split(path: str) -> list[str]:
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer: {path!r}")
+    return [part.replace("~1", "/").replace("~0", "~") for part in path.split("/")[1:]]
+
+
+def _index(container: list, part: str, allow_end: bool = False) -> int:
+    if part == "-" and allow_end:
+        return len(container)
+    if not part.isdigit() or int(part) > len(container) - (0 if allow_end else 1):
+        raise ValueError(f"List index out of range: {part!r}")
+    return int(part)
+
+
+def apply_patch(doc, ops: list[dict]):
+    """A copy of `doc` with RFC 6902 add / remove / replace operations applied."""
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        parts = _split(op["path"])
+        if not parts:
+            if op["op"] == "remove":
+                raise ValueError("Cannot remove the document root")
+            doc = copy.deepcopy(op["value"])
+            continue
+        parent = doc
+        for part in parts[:-1]:
+            parent = parent[_index(parent, part)] if isinstance(parent, list) else parent[part]
+        last = parts[-1]
+        if isinstance(parent, list):
+            if op["op"] == "add":
+                parent.insert(_index(parent, last, allow_end=True), copy.deepcopy(op["value"]))
+            elif op["op"] == "remove":
+                del parent[_index(parent, last)]
+            elif op["op"] == "replace":
+                parent[_index(parent, last)] = copy.deepcopy(op["value"])
+            else:
+                raise ValueError(f"Unsupported patch op: {op['op']!r}")
+        else:
+            if op["op"] in ("add", "replace"):
+                if op["op"] == "replace" and last not in parent:
+                    raise ValueError(f"Path not found: {op['path']!r}")
+                parent[last] = copy.deepcopy(op["value"])
+            elif op["op"] == "remove":
+                del parent[last]
+            else:
+                raise ValueError(f"Unsupported patch op: {op['op']!r}")
+    return doc
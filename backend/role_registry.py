@@ -0,0 +1,465 @@
+"""
+Role catalog — SQLite-backed, lazily loaded, with fuzzy title matching.
+
+Features:
+  - roles.json is imported into a SQLite file (ROLES_DB) when it changes;
+    workers then keep only names, aliases and categories in memory and
+    load each role's requirements on first use (bounded LRU)
+  - A catalog can also ship as the SQLite file alone — roles.json optional
+  - resolve("Sr. Backend Dev") → "Backend Developer": seniority words are
+    dropped and abbreviations expanded ("ml eng" → "machine learning
+    engineer"), then an exact alias lookup, then word overlap weighted by
+    rarity ("react" in "React developer" counts, "developer" barely does),
+    with misspelled words corrected through a trigram index of the
+    catalog's vocabulary; titles scoring below ROLE_MATCH_MIN stay custom
+  - search(q, category, offset, limit) for the paged /roles endpoint
+  - Behaves as a read-only mapping of name → requirements, so it drops in
+    wherever the roles dict was used
+  - Versioned: each import writes a new catalog version next to the last
+    few, so a registry is an immutable snapshot — requests that started on
+    the old catalog keep reading it while a reload swaps in the new one
+  - CatalogWatcher polls roles.json (and the catalog other workers import
+    into) and reports which roles' entries actually changed
+
+roles.json entries may carry "aliases" and "category"; both are index-only
+and stripped from the requirements sent to the LLM.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict, defaultdict
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Callable
+
+from config import env
+from log_config import get_logger
+
+
+ROLES_PATH = Path(__file__).parent / "data" / "roles.json"
+ROLES_DB = env("ROLES_DB", str(Path(__file__).parent / "data" / "roles.db"))
+ROLE_MATCH_MIN = float(env("ROLE_MATCH_MIN", "0.5"))
+ROLE_CACHE_SIZE = int(env("ROLE_CACHE_SIZE", "512"))
+ROLES_PAGE_MAX = 500   # /roles page size cap (and default)
+ROLES_RELOAD_INTERVAL = float(env("ROLES_RELOAD_INTERVAL", "2"))  # seconds; 0 = no hot reload
+KEEP_VERSIONS = 3      # catalog versions kept for snapshots still in use
+
+logger = get_logger("roles")
+
+SCHEMA_VERSION = 2
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS roles (
+    version     INTEGER NOT NULL,
+    position    INTEGER NOT NULL,
+    name        TEXT NOT NULL,
+    category    TEXT NOT NULL DEFAULT '',
+    aliases     TEXT NOT NULL DEFAULT '[]',
+    entry       TEXT NOT NULL,
+    digest      TEXT NOT NULL,
+    PRIMARY KEY (version, name)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key         TEXT PRIMARY KEY,
+    value       TEXT NOT NULL
+);
+"""
+
+INDEX_ONLY_FIELDS = ("aliases", "category")
+
+# ── Title normalization ─────────────────────────────────────────
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+_SENIORITY = {
+    "sr", "senior", "jr", "junior", "lead", "principal", "staff", "associate",
+    "intern", "entry", "level", "mid", "i", "ii", "iii", "iv",
+}
+_ABBREVIATIONS = {
+    "ml": "machine learning", "ai": "artificial intelligence", "ds": "data scientist",
+    "eng": "engineer", "engr": "engineer", "engineering": "engineer",
+    "dev": "developer", "devs": "developer", "development": "developer", "programmer": "developer",
+    "swe": "software engineer", "sde": "software developer",
+    "fe": "frontend", "be": "backend",
+    "fullstack": "full stack", "sec": "security", "cyber": "cybersecurity",
+    "mgr": "manager", "pm": "product manager", "ui": "frontend",
+}
+
+
+def normalize_title(title: str) -> str:
+    """"Sr. Backend Dev" → "backend developer"."""
+    words = []
+    for word in _WORD_RE.findall(title.lower()):
+        if word in _SENIORITY:
+            continue
+        words.extend(_ABBREVIATIONS.get(word, word).split())
+    # "front end" / "back end" / "full stack" → one form
+    return re.sub(r"\b(front|back) end\b", r"\1end", " ".join(words))
+
+
+WORD_MATCH_MIN = 0.6   # trigram similarity for a misspelled word to count as a catalog word
+
+
+def trigrams(text: str) -> frozenset[str]:
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+# ── Registry ────────────────────────────────────────────────────
+class RoleRegistry(Mapping):
+    """Role name → requirements, backed by a SQLite catalog."""
+
+    def __init__(self, db_path: str = ROLES_DB, version: int | None = None, cache_size: int = ROLE_CACHE_SIZE):
+        self.db_path = db_path
+        self._conn = _connect(db_path)
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, dict] = OrderedDict()
+        self._cache_size = cache_size
+        self._build_index(version)
+
+    # ── Construction ──
+    @classmethod
+    def open(cls, json_path: Path = ROLES_PATH, db_path: str = ROLES_DB) -> "RoleRegistry":
+        """Registry over db_path, re-importing json_path first if it changed."""
+        if json_path.exists():
+            import_catalog(json_path, db_path, _stamp(json_path))
+        elif not Path(db_path).exists():
+            logger.warning("roles.json not found")
+        return cls(db_path)
+
+    @classmethod
+    def from_dict(cls, roles: dict) -> "RoleRegistry":
+        """In-memory registry (tests, small catalogs)."""
+        registry = cls(":memory:")
+        with registry._lock:
+            _write_roles(registry._conn, roles, stamp="dict")
+        registry._build_index(None)
+        return registry
+
+    def _build_index(self, version: int | None) -> None:
+        with self._lock:
+            self.version = _current_version(self._conn) if version is None else version
+            rows = self._conn.execute(
+                "SELECT name, category, aliases, digest FROM roles WHERE version = ? ORDER BY position",
+                (self.version,),
+            ).fetchall()
+        self._names = [row[0] for row in rows]
+        self._ids = {name: i for i, name in enumerate(self._names)}
+        self._categories = [row[1] for row in rows]
+        self.digests = {row[0]: row[3] for row in rows}
+        self._exact: dict[str, int] = {}
+        self._alias_role: list[int] = []
+        self._alias_words = alias_words = []
+        for role_id, (name, _, aliases, _) in enumerate(rows):
+            for alias in [name, *json.loads(aliases)]:
+                key = normalize_title(alias)
+                if key and key not in self._exact:
+                    self._exact[key] = role_id
+                    self._alias_role.append(role_id)
+                    alias_words.append(frozenset(key.split()))
+
+        # Words weighted by rarity: "react" says more than "developer"
+        self._postings: dict[str, list[int]] = defaultdict(list)
+        for alias_id, words in enumerate(alias_words):
+            for word in words:
+                self._postings[word].append(alias_id)
+        total = len(alias_words)
+        self._idf = {word: math.log(1 + total / len(ids)) for word, ids in self._postings.items()}
+        self._unknown_idf = math.log(1 + max(total, 1))
+        self._alias_weight = [sum(self._idf[w] for w in words) for words in alias_words]
+
+        # Trigrams over the (small) vocabulary, for misspelled words
+        self._word_grams: dict[str, list[str]] = defaultdict(list)
+        for word in self._postings:
+            for gram in trigrams(word):
+                self._word_grams[gram].append(word)
+
+    # ── Mapping ──
+    def __getitem__(self, name: str) -> dict:
+        with self._lock:
+            entry = self._cache.get(name)
+            if entry is not None:
+                self._cache.move_to_end(name)
+                return entry
+            row = self._conn.execute(
+                "SELECT entry FROM roles WHERE version = ? AND name = ?", (self.version, name),
+            ).fetchone()
+            if row is None:
+                raise KeyError(name)
+            entry = json.loads(row[0])
+            self._cache[name] = entry
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+            return entry
+
+    def __contains__(self, name) -> bool:
+        return name in self._ids
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    # ── Matching ──
+    def _correct(self, word: str) -> tuple[str | None, float]:
+        """(closest catalog word, similarity) for a word, or (None, 0) if nothing is close."""
+        if word in self._idf:
+            return word, 1.0
+        grams = trigrams(word)
+        shared: dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for candidate in self._word_grams.get(gram, ()):
+                shared[candidate] += 1
+        best, best_sim = None, WORD_MATCH_MIN
+        for candidate, count in shared.items():
+            sim = 2 * count / (len(grams) + len(candidate) + 1)    # a word has len + 1 trigrams
+            if sim >= best_sim:
+                best, best_sim = candidate, sim
+        return (best, best_sim) if best else (None, 0.0)
+
+    def _scores(self, key: str, floor: float = ROLE_MATCH_MIN, best_only: bool = False) -> dict[int, float]:
+        """
+        Similarity ≥ floor per role id (best over its aliases): IDF-weighted
+        Dice on (corrected) words. Aliases are visited through the query's
+        words, rarest first, and the scan stops once the words left couldn't
+        lift an unseen alias to the floor — or, with best_only, past the best
+        score found so far.
+        """
+        query: dict[str, float] = {}     # catalog word → weight it contributes when shared
+        query_weight = 0.0
+        for word in set(key.split()):
+            match, sim = self._correct(word)
+            if match is None:
+                query_weight += self._unknown_idf
+            else:
+                query_weight += self._idf[match]
+                query[match] = max(query.get(match, 0.0), self._idf[match] * sim)
+        query_words = frozenset(query)
+
+        scores: dict[int, float] = {}
+        seen: set[int] = set()
+        remaining = sum(query.values())
+        bar = floor
+        for word, weight in sorted(query.items(), key=lambda kv: -kv[1]):
+            # An alias with none of the words visited so far shares at most `remaining`
+            if 2 * remaining / (query_weight + remaining) < bar:
+                break
+            for alias_id in self._postings[word]:
+                if alias_id in seen:
+                    continue
+                seen.add(alias_id)
+                shared = sum(query[w] for w in self._alias_words[alias_id] & query_words)
+                score = 2 * shared / (query_weight + self._alias_weight[alias_id])
+                role_id = self._alias_role[alias_id]
+                if score >= floor and score > scores.get(role_id, 0.0):
+                    scores[role_id] = score
+                    if best_only and score > bar:
+                        bar = score
+            remaining -= weight
+        return scores
+
+    def match(self, title: str) -> tuple[str, float] | None:
+        """(catalog name, similarity) for a free-text title, or None if nothing is close."""
+        key = normalize_title(title)
+        if not key:
+            return None
+        if key in self._exact:
+            return self._names[self._exact[key]], 1.0
+        scores = self._scores(key, best_only=True)
+        if not scores:
+            return None
+        role_id = max(scores, key=lambda i: (scores[i], -i))
+        return self._names[role_id], scores[role_id]
+
+    def resolve(self, title: str) -> str | None:
+        """Catalog name for a free-text title, or None (a custom role)."""
+        if title in self._ids:
+            return title
+        found = self.match(title)
+        return found[0] if found else None
+
+    def search(self, q: str = "", category: str = "", offset: int = 0, limit: int = 100) -> tuple[list[str], int]:
+        """(page of role names, total matches). With q, best matches first."""
+        ids = range(len(self._names))
+        if category:
+            wanted = category.lower()
+            ids = [i for i in ids if self._categories[i].lower() == wanted]
+        key = normalize_title(q)
+        if key:
+            scores = self._scores(key, floor=ROLE_MATCH_MIN / 2)
+            ids = sorted(
+                (i for i in ids if i in scores or key in normalize_title(self._names[i])),
+                key=lambda i: (-scores.get(i, 0.0), i),
+            )
+        ids = list(ids)
+        return [self._names[i] for i in ids[offset:offset + limit]], len(ids)
+
+    def categories(self) -> list[str]:
+        return sorted({c for c in self._categories if c})
+
+
+def changed_roles(old: RoleRegistry, new: RoleRegistry) -> set[str]:
+    """Roles added, removed or whose requirements differ between two snapshots."""
+    return {name for name in old.digests.keys() | new.digests.keys() if old.digests.get(name) != new.digests.get(name)}
+
+
+# ── Storage ─────────────────────────────────────────────────────
+def _connect(db_path: str) -> sqlite3.Connection:
+    if db_path != ":memory:":
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        # Derived from roles.json — an older layout is simply rebuilt on the next import
+        conn.execute("BEGIN IMMEDIATE")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:   # not done by another worker
+            conn.execute("DROP TABLE IF EXISTS roles")
+            conn.execute("DROP TABLE IF EXISTS meta")
+            for statement in _SCHEMA.split(";"):
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    return conn
+
+
+def _current_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def catalog_version(db_path: str = ROLES_DB) -> int:
+    conn = _connect(db_path)
+    try:
+        return _current_version(conn)
+    finally:
+        conn.close()
+
+
+def _source(conn: sqlite3.Connection) -> str | None:
+    row = conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+    return row[0] if row else None
+
+
+def _write_roles(conn: sqlite3.Connection, roles: dict, stamp: str) -> int | None:
+    """Write roles as a new catalog version; None if `stamp` is already imported."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if _source(conn) == stamp:     # another worker got here first
+            conn.execute("ROLLBACK")
+            return None
+        version = _current_version(conn) + 1
+        rows = []
+        for position, (name, entry) in enumerate(roles.items()):
+            requirements = json.dumps({k: v for k, v in entry.items() if k not in INDEX_ONLY_FIELDS}, sort_keys=True)
+            rows.append((
+                version, position, name, entry.get("category", ""), json.dumps(entry.get("aliases", [])),
+                requirements, hashlib.sha256(requirements.encode()).hexdigest()[:16],
+            ))
+        conn.executemany(
+            "INSERT INTO roles (version, position, name, category, aliases, entry, digest)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute("DELETE FROM roles WHERE version <= ?", (version - KEEP_VERSIONS,))
+        conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [("source", stamp), ("version", str(version))],
+        )
+        conn.execute("COMMIT")
+        return version
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def import_catalog(json_path: Path, db_path: str, stamp: str) -> bool:
+    """Import roles.json into the SQLite catalog unless it is already current. True if imported."""
+    conn = _connect(db_path)
+    try:
+        if _source(conn) == stamp:
+            return False
+        with open(json_path, "r", encoding="utf-8") as f:
+            roles = json.load(f)
+        version = _write_roles(conn, roles, stamp)
+        if version is None:
+            return False
+        logger.info("Imported %d roles into %s (catalog v%d)", len(roles), os.path.basename(db_path), version)
+        return True
+    finally:
+        conn.close()
+
+
+def _stamp(path: Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+# ── Hot reload ──────────────────────────────────────────────────
+ReloadCallback = Callable[[RoleRegistry, set[str]], None]
+
+
+class CatalogWatcher:
+    """
+    Keeps `registry` current. Each check re-imports roles.json if its mtime
+    or size changed, then swaps in a new snapshot if the catalog version
+    moved (also when another worker did the import) and calls
+    `on_reload(registry, changed_role_names)`. A roles.json that fails to
+    parse is logged and retried on the next change; the old catalog stays.
+    """
+
+    def __init__(
+        self,
+        registry: RoleRegistry,
+        json_path: Path = ROLES_PATH,
+        on_reload: ReloadCallback | None = None,
+        interval: float = ROLES_RELOAD_INTERVAL,
+    ):
+        self.registry = registry
+        self.json_path = json_path
+        self.on_reload = on_reload
+        self.interval = interval
+        self._stamp: str | None = None     # last roles.json stamp handed to import_catalog
+        self._task: asyncio.Task | None = None
+
+    def check(self) -> set[str] | None:
+        """Reload if the catalog changed; the changed role names, or None if nothing did."""
+        if self.json_path.exists():
+            stamp = _stamp(self.json_path)
+            if stamp != self._stamp:
+                try:
+                    import_catalog(self.json_path, self.registry.db_path, stamp)
+                except (OSError, ValueError) as e:
+                    logger.error("roles.json reload failed, keeping catalog v%d: %s", self.registry.version, e)
+                    return None
+                self._stamp = stamp
+        version = catalog_version(self.registry.db_path)
+        if version == self.registry.version:
+            return None
+        old, new = self.registry, RoleRegistry(self.registry.db_path, version)
+        changed = changed_roles(old, new)
+        self.registry = new
+        logger.info("Role catalog v%d → v%d: %d role(s) changed", old.version, new.version, len(changed))
+        if self.on_reload:
+            self.on_reload(new, changed)
+        return changed
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.check)
+            except Exception:
+                logger.exception("Role catalog check failed")
+
+    def start(self) -> None:
+        if self.interval > 0 and self.registry.db_path != ":memory:":
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
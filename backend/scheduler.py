@@ -0,0 +1,285 @@
+"""
+LLM job scheduler — admission control in front of Ollama.
+
+Features:
+  - Bounded number of concurrent LLM calls (LLM_CONCURRENCY slots)
+  - Bounded wait queue (LLM_QUEUE_SIZE) — overflow raises QueueFullError → 429
+  - Priorities: adapt > interactive > batch
+  - Per-client fairness: within a priority, clients are served round-robin
+  - Waiters whose client disconnected or whose deadline passed are dropped
+  - Running calls are cancelled (via a threading.Event) when the client disconnects;
+    their slot is only freed once the worker thread has actually returned
+  - Queue depth / wait time stats for /health and /metrics
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable
+
+from config import env
+from metrics import LLM_QUEUE_WAIT
+from tracing import span
+
+
+# ── Constants ───────────────────────────────────────────────────
+
+PRIORITY_ADAPT = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_BATCH = 2
+PRIORITY_NAMES = {PRIORITY_ADAPT: "adapt", PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+LLM_CONCURRENCY = int(env("LLM_CONCURRENCY", "2"))
+LLM_QUEUE_SIZE = int(env("LLM_QUEUE_SIZE", "32"))
+POLL_INTERVAL = 0.5  # seconds between disconnect checks while queued
+WAIT_SAMPLES = 200   # recent wait/service times kept for stats
+
+
+# ── Errors ──────────────────────────────────────────────────────
+
+class QueueFullError(Exception):
+    """Raised when the wait queue is at capacity. Carries a Retry-After hint."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"LLM queue full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class RequestDroppedError(Exception):
+    """Raised when a queued job is dropped (client gone or deadline passed)."""
+
+
+class DeadlinePassedError(RequestDroppedError):
+    """Raised when a queued job's deadline passes — the client may still be waiting."""
+
+
+# ── Scheduler ───────────────────────────────────────────────────
+
+class _Waiter:
+    __slots__ = ("key", "client_id", "priority", "granted", "enqueued_at", "cancelled")
+
+    def __init__(self, key: tuple, client_id: str, priority: int):
+        self.key = key
+        self.client_id = client_id
+        self.priority = priority
+        self.granted = asyncio.get_running_loop().create_future()
+        self.enqueued_at = time.monotonic()
+        self.cancelled = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return self.key < other.key
+
+
+class LLMScheduler:
+    """
+    Priority + fair-share gate for LLM calls.
+
+    Usage:
+        result = await scheduler.run(call_llm, prompt,
+                                     priority=PRIORITY_INTERACTIVE,
+                                     client_id="1.2.3.4",
+                                     is_disconnected=request.is_disconnected)
+    """
+
+    def __init__(self, concurrency: int = LLM_CONCURRENCY, max_queue: int = LLM_QUEUE_SIZE):
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max_queue
+        self._heap: list[_Waiter] = []
+        self._queued = 0
+        self._running = 0
+        self._seq = itertools.count()
+        # Fair share: each client's next "round" per priority level
+        self._client_round: dict[tuple[int, str], int] = {}
+        self._round_floor: dict[int, int] = {}
+        self._waits: deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self._service: deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.dropped = 0
+        self.rejected = 0
+        self.cancelled = 0
+        # Own pool, so a slot can follow its thread (the scheduler bounds how many run)
+        self._executor = ThreadPoolExecutor(max_workers=max(32, self.concurrency), thread_name_prefix="llm")
+
+    # ── Public API ──────────────────────────────────────────────
+
+    async def run(
+        self,
+        fn: Callable,
+        *args,
+        priority: int = PRIORITY_INTERACTIVE,
+        client_id: str = "anonymous",
+        deadline: float | None = None,
+        is_disconnected: Callable[[], Awaitable[bool]] | None = None,
+        cancel_event: threading.Event | None = None,
+    ):
+        """
+        Wait for a slot, then run fn(*args) in a worker thread.
+        `deadline` is a time.monotonic() timestamp after which a queued job is dropped.
+        `cancel_event` is set if the client disconnects (or the caller is cancelled)
+        while fn runs — fn is expected to watch it and return early. The slot
+        stays taken until fn has returned, even if the caller stopped waiting.
+        """
+        with span("llm_queue", priority=PRIORITY_NAMES.get(priority, str(priority))):
+            await self.acquire(priority, client_id, deadline, is_disconnected)
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        released = False
+
+        def finish(_=None) -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self._service.append(time.monotonic() - started)
+                self.release()
+
+        def thread_done(_) -> None:
+            try:
+                loop.call_soon_threadsafe(finish)
+            except RuntimeError:
+                pass  # event loop already closed
+
+        job = self._executor.submit(contextvars.copy_context().run, fn, *args)
+        job.add_done_callback(thread_done)
+        task = asyncio.wrap_future(job)
+        try:
+            if is_disconnected is not None and cancel_event is not None:
+                while True:
+                    done, _ = await asyncio.wait({task}, timeout=POLL_INTERVAL)
+                    if done:
+                        break
+                    if await is_disconnected():
+                        cancel_event.set()
+                        await task  # returns as soon as fn notices the event
+                        self.cancelled += 1
+                        raise RequestDroppedError("client disconnected during generation")
+            return await task
+        except asyncio.CancelledError:
+            if cancel_event is not None:
+                cancel_event.set()
+            raise
+        finally:
+            if job.done():
+                finish()
+            # else: still generating — thread_done frees the slot when fn returns
+
+    async def acquire(
+        self,
+        priority: int = PRIORITY_INTERACTIVE,
+        client_id: str = "anonymous",
+        deadline: float | None = None,
+        is_disconnected: Callable[[], Awaitable[bool]] | None = None,
+    ) -> None:
+        """Take a slot (possibly after queueing). Pair every acquire() with release()."""
+        if self._running < self.concurrency and self._queued == 0:
+            self._running += 1
+            self._record_wait(priority, 0.0)
+            return
+
+        if self._queued >= self.max_queue:
+            self.rejected += 1
+            raise QueueFullError(self.retry_after())
+
+        waiter = self._enqueue(priority, client_id)
+        try:
+            while True:
+                timeout = POLL_INTERVAL
+                if deadline is not None:
+                    timeout = min(timeout, max(0.0, deadline - time.monotonic()))
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.granted), timeout)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise DeadlinePassedError("deadline passed while queued")
+                if is_disconnected is not None and await is_disconnected():
+                    raise RequestDroppedError("client disconnected while queued")
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        self._record_wait(priority, time.monotonic() - waiter.enqueued_at)
+
+    def release(self) -> None:
+        self._running -= 1
+        self._dispatch()
+
+    def retry_after(self) -> int:
+        """Rough seconds until a queue slot frees up."""
+        service = self._avg(self._service) or 30.0
+        return max(1, int(service * (self._queued + 1) / self.concurrency))
+
+    def estimated_wait(self, priority: int = PRIORITY_INTERACTIVE) -> float:
+        """Rough seconds a new job at `priority` would wait before starting."""
+        if self._running < self.concurrency and self._queued == 0:
+            return 0.0
+        ahead = sum(1 for w in self._heap if not w.cancelled and w.priority <= priority)
+        service = self._avg(self._service) or 30.0
+        return service * (ahead + 1) / self.concurrency
+
+    def stats(self) -> dict:
+        by_priority = {name: 0 for name in PRIORITY_NAMES.values()}
+        for w in self._heap:
+            if not w.cancelled:
+                by_priority[PRIORITY_NAMES.get(w.priority, str(w.priority))] += 1
+        waits = sorted(self._waits)
+        return {
+            "running": self._running,
+            "concurrency": self.concurrency,
+            "queue_depth": self._queued,
+            "queue_capacity": self.max_queue,
+            "queued_by_priority": by_priority,
+            "wait_avg_s": round(self._avg(waits), 3),
+            "wait_p95_s": round(waits[int(len(waits) * 0.95)] if waits else 0.0, 3),
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+        }
+
+    # ── Internal helpers ────────────────────────────────────────
+
+    def _record_wait(self, priority: int, seconds: float) -> None:
+        self._waits.append(seconds)
+        LLM_QUEUE_WAIT.observe(seconds, priority=PRIORITY_NAMES.get(priority, str(priority)))
+
+    def _enqueue(self, priority: int, client_id: str) -> _Waiter:
+        floor = self._round_floor.get(priority, 0)
+        rnd = max(self._client_round.get((priority, client_id), 0), floor)
+        self._client_round[(priority, client_id)] = rnd + 1
+        waiter = _Waiter((priority, rnd, next(self._seq)), client_id, priority)
+        heapq.heappush(self._heap, waiter)
+        self._queued += 1
+        return waiter
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        if waiter.granted.done() and not waiter.granted.cancelled():
+            # Slot was handed over just as we gave up — pass it on
+            self.release()
+            return
+        waiter.cancelled = True
+        waiter.granted.cancel()
+        self._queued -= 1
+        self.dropped += 1
+
+    def _dispatch(self) -> None:
+        while self._heap and self._running < self.concurrency:
+            waiter = heapq.heappop(self._heap)
+            if waiter.cancelled:
+                continue
+            priority, rnd, _ = waiter.key
+            self._round_floor[priority] = rnd
+            self._queued -= 1
+            self._running += 1
+            waiter.granted.set_result(None)
+        if not self._heap:
+            self._client_round.clear()
+            self._round_floor.clear()
+
+    @staticmethod
+    def _avg(values) -> float:
+        return sum(values) / len(values) if values else 0.0
+
+
+scheduler = LLMScheduler()
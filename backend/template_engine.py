@@ -0,0 +1,297 @@
+"""
+Deterministic roadmap engine — the graceful-degradation tier.
+
+Composes a complete roadmap in milliseconds, without the LLM, when Ollama
+is down or the queue is too long.
+
+Features:
+  - Skills detected by matching roles.json skills against the resume
+    ("Python (intermediate)" annotations set the level)
+  - Gaps: missing core skills → critical, core skills at beginner level and
+    missing supporting/theory skills → important, missing tools → nice to have
+  - Topics from the resource catalog (data/resources.json), generic steps
+    for skills it doesn't cover
+  - 30 days: weekly reviews on days 7/14/21, capstone on days 28-30, study
+    days filled round-robin by gap priority within a DAILY_HOURS budget
+  - With a pre-generated baseline, its days are kept and only the days on
+    skills the student already has are swapped for uncovered gaps
+  - Pieces for partial results: a flagship project from an LLM gap
+    analysis (when Call 2 has no time left) and rule-based days for the
+    days a timed-out call never produced
+"""
+import copy
+import json
+import math
+import re
+from pathlib import Path
+
+from baselines import get_baseline, classify_days, uncovered_gaps, mentions, text_words
+from config import env
+from mock_data import MOCK_ROADMAP_RESPONSE
+import metrics
+
+
+RESOURCES_PATH = Path(__file__).parent / "data" / "resources.json"
+DAILY_HOURS = float(env("TEMPLATE_DAILY_HOURS", "2.5"))
+
+REVIEW_DAYS = (7, 14, 21)
+CAPSTONE_DAYS = (28, 29, 30)
+WEEK_RANGES = [(1, 7), (8, 14), (15, 21), (22, 30)]
+
+_LEVEL_RE = r"{skill}\s*\((beginner|basic|intermediate|advanced|expert)\)"
+_LEVELS = {"basic": "beginner", "expert": "advanced"}
+
+_catalog: dict | None = None
+
+
+# ── Resource catalog ────────────────────────────────────────────
+def _resources() -> dict:
+    global _catalog
+    if _catalog is None:
+        with open(RESOURCES_PATH, "r", encoding="utf-8") as f:
+            _catalog = json.load(f)
+    return _catalog
+
+
+def topic_steps(skill: str) -> list[dict]:
+    """Study steps for a skill: catalog entries, or generic learn + practice days."""
+    catalog = _resources()
+    key = skill.lower()
+    if key in catalog:
+        return copy.deepcopy(catalog[key])
+    words = text_words(skill)
+    for name, steps in catalog.items():
+        if mentions(words, name):
+            return copy.deepcopy(steps)
+    return [
+        {"objective": f"{skill}: core concepts", "resource": f"Official {skill} documentation or a top-rated free course",
+         "task": f"Work through the {skill} getting-started material and take notes", "output": "Study notes", "hours": 2.5},
+        {"objective": f"{skill}: hands-on practice", "resource": f"Guided {skill} exercises or a tutorial project",
+         "task": f"Build a small exercise that uses {skill}", "output": "Exercise repo", "hours": 2.5},
+    ]
+
+
+# ── Skills & gaps ───────────────────────────────────────────────
+def _level(resume_lower: str, skill: str) -> str:
+    for part in re.split(r"[/,]| or ", skill):
+        match = re.search(_LEVEL_RE.format(skill=re.escape(part.strip().lower())), resume_lower)
+        if match:
+            return _LEVELS.get(match.group(1), match.group(1))
+    return "intermediate"
+
+
+def analyze(resume_text: str, role: dict) -> tuple[list[dict], dict]:
+    """(detected skills, gap analysis) for a resume against a roles.json entry."""
+    words = text_words(resume_text)
+    lower = resume_text.lower()
+    skills, gaps = [], {"critical": [], "important": [], "nice_to_have": []}
+    tiers = (
+        ("core_technical", "technical", "critical", "Core requirement for the role; not found in your resume."),
+        ("supporting_skills", "technical", "important", "Supporting skill the role expects; not found in your resume."),
+        ("theory_math", "technical", "important", "Theory the role builds on; not found in your resume."),
+        ("tools", "tool", "nice_to_have", "Common tool in the role; worth picking up."),
+        ("soft_skills", "soft", None, ""),
+    )
+    for section, category, tier, reason in tiers:
+        for skill in role.get(section, []):
+            if mentions(words, skill):
+                level = _level(lower, skill)
+                skills.append({"name": skill, "level": level, "category": category})
+                if section == "core_technical" and level == "beginner":
+                    gaps["important"].append({"skill": skill, "reason": "Listed at beginner level; core work needs more depth."})
+            elif tier:
+                gaps[tier].append({"skill": skill, "reason": reason})
+    return skills, gaps
+
+
+# ── Day planning ────────────────────────────────────────────────
+def _gap_order(gaps: dict) -> list[str]:
+    return [g["skill"] for tier in ("critical", "important", "nice_to_have") for g in gaps[tier]]
+
+
+def allocate(topics: list[str], slots: int, daily_hours: float = DAILY_HOURS) -> list[tuple[str, dict]]:
+    """
+    Fill `slots` study days from topics in priority order: round-robin, one
+    step per topic per round, so higher-priority topics get their later steps
+    before lower-priority ones run out of room. Extra days go to practice on
+    the top topics. Steps longer than the daily budget are capped.
+    """
+    queues = [(t, topic_steps(t)) for t in topics]
+    taken: dict[str, list[dict]] = {t: [] for t in topics}
+    remaining = slots
+    while remaining and any(steps for _, steps in queues):
+        for topic, steps in queues:
+            if steps and remaining:
+                taken[topic].append(steps.pop(0))
+                remaining -= 1
+    practice_topics = topics[:max(1, math.ceil(len(topics) / 3))] if topics else []
+    i = 0
+    while remaining and practice_topics:
+        topic = practice_topics[i % len(practice_topics)]
+        taken[topic].append({
+            "objective": f"{topic}: applied practice", "resource": "Your notes + official examples",
+            "task": f"Solve a realistic problem end to end with {topic}", "output": "Practice project commit",
+            "hours": daily_hours,
+        })
+        remaining -= 1
+        i += 1
+    plan = []
+    for topic in topics:    # keep each topic's steps together, highest priority first
+        for step in taken[topic]:
+            plan.append((topic, {**step, "hours": min(float(step.get("hours", daily_hours)), daily_hours)}))
+    return plan
+
+
+def _review_day(day: int, topics: list[str], daily_hours: float) -> dict:
+    covered = ", ".join(topics[:3]) or "this week's topics"
+    return {
+        "day": day, "objective": f"Week {day // 7} review: {covered}", "resource": "Your notes and exercises from this week",
+        "task": f"Build a mini-project combining {covered}", "output": "Mini-project in your portfolio repo",
+        "hours": daily_hours + 1,
+    }
+
+
+def _capstone_days(role_name: str, project_title: str, daily_hours: float) -> list[dict]:
+    return [
+        {"day": 28, "objective": f"Capstone: build {project_title}", "resource": "Everything from weeks 1-4",
+         "task": "Implement the core feature set", "output": "Working capstone build", "hours": daily_hours + 1},
+        {"day": 29, "objective": "Capstone: polish and document", "resource": "README and code review checklists",
+         "task": "Write tests, a README and an architecture diagram", "output": "Portfolio-ready repo", "hours": daily_hours},
+        {"day": 30, "objective": f"Present your {role_name} portfolio", "resource": "LinkedIn / resume guides",
+         "task": "Update your resume and publish a project write-up", "output": "Updated resume + project post",
+         "hours": daily_hours},
+    ]
+
+
+def _milestones(days: list[dict], topics_by_day: dict[int, str]) -> list[dict]:
+    milestones = []
+    for week, (first, last) in enumerate(WEEK_RANGES, start=1):
+        skills = list(dict.fromkeys(topics_by_day[d] for d in range(first, last + 1) if d in topics_by_day))
+        milestones.append({
+            "week": week,
+            "milestone": f"Covered {', '.join(skills[:3])}" if skills else "Capstone project complete",
+            "skills_gained": skills[:5] or ["Project delivery"],
+        })
+    return milestones
+
+
+def _project(role_name: str, role: dict, skills: list[dict], gaps: dict) -> dict:
+    expectations = role.get("portfolio_expectations", []) or [f"{role_name} portfolio project"]
+    focus = _gap_order(gaps)[:3] or [s["name"] for s in skills[:3]]
+    stack = list(dict.fromkeys([s["name"] for s in skills if s["category"] != "soft"][:3] + focus))[:6]
+    return {
+        "title": f"{expectations[0]}: {role_name} capstone",
+        "problem_statement": f"Build {expectations[0].lower()} that puts {', '.join(focus)} into practice on a real dataset or user problem.",
+        "tech_stack": stack,
+        "weekly_features": [
+            {"week": w, "feature": f"Apply {topic}", "description": f"Use what you learned about {topic} in the project."}
+            for w, topic in enumerate((focus + ["Integration & testing"] * 4)[:3], start=1)
+        ] + [{"week": 4, "feature": "Polish & deployment", "description": "Tests, documentation and a public demo."}],
+        "portfolio_quality": f"Matches what {role_name} hiring managers look for: {', '.join(expectations[:3])}.",
+    }
+
+
+# ── Compose ─────────────────────────────────────────────────────
+def compose_roadmap(
+    dream_role: str,
+    resume_text: str,
+    role: dict,
+    baseline: dict | None = None,
+    daily_hours: float = DAILY_HOURS,
+) -> dict:
+    """A complete roadmap dict (same shape as Call 1 + Call 2) from rules only."""
+    skills, gaps = analyze(resume_text, role)
+    order = _gap_order(gaps)
+    known = [s["name"] for s in skills if s["level"] != "beginner"]
+    top = ", ".join(order[:3]) or f"advanced {dream_role} practice"
+
+    if baseline is not None:
+        days = baseline["roadmap"]["days"]
+        redundant, _ = classify_days(days, order, known)
+        missing = uncovered_gaps(days, order)
+        swaps = dict(zip(redundant, (step for _, step in allocate(missing, len(redundant), daily_hours))))
+        roadmap = {
+            "days": [{**swaps[d["day"]], "day": d["day"]} if d["day"] in swaps else d for d in days],
+            "weekly_milestones": baseline["roadmap"]["weekly_milestones"],
+        }
+        project = baseline.get("flagship_project", {})
+    else:
+        project = _project(dream_role, role, skills, gaps)
+        study_days = [d for d in range(1, 31) if d not in REVIEW_DAYS and d not in CAPSTONE_DAYS]
+        topics = order or role.get("core_technical", [])
+        plan = allocate(topics, len(study_days), daily_hours)
+        topics_by_day = {day: topic for day, (topic, _) in zip(study_days, plan)}
+        days = [{**step, "day": day} for day, (_, step) in zip(study_days, plan)]
+        for day in REVIEW_DAYS:
+            week_topics = [topics_by_day[d] for d in range(day - 6, day) if d in topics_by_day]
+            days.append(_review_day(day, list(dict.fromkeys(week_topics)), daily_hours))
+        days.extend(_capstone_days(dream_role, project["title"], daily_hours))
+        days.sort(key=lambda d: d["day"])
+        roadmap = {"days": days, "weekly_milestones": _milestones(days, topics_by_day)}
+
+    found = [s["name"] for s in skills if s["category"] != "soft"]
+    return {
+        "reasoning": (
+            f"Found {len(found)} of the {dream_role} skills in your resume. "
+            f"This plan was built instantly from the {dream_role} skill catalog and focuses on {top}; "
+            f"regenerate later for a fully AI-personalized plan."
+        ),
+        "skill_map": {
+            "skills": skills,
+            "strengths": [f"Already uses {name}" for name in found[:3]] or ["Motivated to learn"],
+            "weaknesses": [f"No evidence of {g['skill']}" for g in gaps["critical"][:3]] or ["Needs deeper role experience"],
+        },
+        "role_requirements": copy.deepcopy(role),
+        "gap_analysis": gaps,
+        "roadmap": roadmap,
+        "flagship_project": project,
+    }
+
+
+def template_project(dream_role: str, role: dict | None, result: dict) -> dict:
+    """A rule-based flagship project for a (post-processed) Call 1 result."""
+    skills = [
+        {"name": s.get("name", ""), "category": s.get("category", "technical")}
+        for s in result.get("skill_map", {}).get("skills", []) if isinstance(s, dict) and s.get("name")
+    ]
+    gaps = {
+        tier: [g for g in result.get("gap_analysis", {}).get(tier, []) if isinstance(g, dict) and g.get("skill")]
+        for tier in ("critical", "important", "nice_to_have")
+    }
+    return _project(dream_role, role or {}, skills, gaps)
+
+
+def fill_missing_days(result: dict, dream_role: str, resume_text: str, role: dict) -> list[int]:
+    """
+    Add rule-based days for the day numbers a (partial) Call 1 result lacks.
+    Runs before post-processing, which would pad them with generic days.
+    Returns the day numbers filled.
+    """
+    roadmap = result.get("roadmap")
+    if not isinstance(roadmap, dict):
+        roadmap = result["roadmap"] = {"days": [], "weekly_milestones": []}
+    days = [d for d in roadmap.get("days") or [] if isinstance(d, dict)]
+    have = {d.get("day") for d in days}
+    missing = [n for n in range(1, 31) if n not in have]
+    if not missing:
+        return []
+    template = compose_roadmap(dream_role, resume_text, role)["roadmap"]["days"]
+    days.extend(d for d in template if d["day"] in missing)
+    roadmap["days"] = sorted(days, key=lambda d: d["day"] if isinstance(d.get("day"), int) else 0)
+    return missing
+
+
+def degraded_roadmap(dream_role: str, resume_text: str = "", role: dict | None = None, reason: str = "llm_failure") -> dict:
+    """
+    Best roadmap available without the LLM: rule-based (on the role's
+    baseline if there is one), else the baseline as is, else the static mock.
+    """
+    baseline = get_baseline(dream_role)
+    if role:
+        tier, result = "template", compose_roadmap(dream_role, resume_text, role, baseline)
+    elif baseline is not None:
+        tier, result = "baseline", baseline
+    else:
+        tier, result = "mock", copy.deepcopy(MOCK_ROADMAP_RESPONSE)
+    metrics.DEGRADED_ROADMAPS.inc(tier=tier, reason=reason)
+    return result
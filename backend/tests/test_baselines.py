@@ -0,0 +1,144 @@
+"""
+Unit tests for baselines.py and baseline mode in pipeline.py
+
+Covers:
+  - Day selection: gap days and days on already-known skills, capped
+  - Role-appropriate fallback (baseline, else static mock)
+  - Baseline mode: analysis + one call for the selected days, rest kept
+  - Overload: the baseline is served with no LLM calls
+"""
+import asyncio
+import copy
+import unittest
+from unittest.mock import patch
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import baselines
+import pipeline
+from llm_schemas import call_type
+from mock_data import MOCK_ROADMAP_RESPONSE
+from models import RoadmapRequest
+from normalizer import post_process_roadmap
+
+ROLE = "Data Analyst"
+
+
+def _baseline() -> dict:
+    baseline = post_process_roadmap(copy.deepcopy(MOCK_ROADMAP_RESPONSE), ROLE)
+    baseline["reasoning"] = "baseline"
+    return baseline
+
+
+def _day(n: int, objective: str) -> dict:
+    return {"day": n, "objective": objective, "resource": "Docs", "task": "Practice", "hours": 2}
+
+
+class TestSelectDays(unittest.TestCase):
+
+    def test_gap_and_known_days_selected(self):
+        days = [
+            _day(1, "Pandas for data wrangling"),
+            _day(2, "SQL joins and window functions"),
+            _day(3, "Tableau dashboards"),
+            _day(4, "Communication for analysts"),
+        ]
+        picked = baselines.select_days(days, gaps=["Tableau", "Statistics"], known=["SQL", "Tableau"])
+        self.assertEqual(picked, [2, 3])      # SQL is known, Tableau is a gap (not "known")
+
+    def test_alternatives_and_limit(self):
+        days = [_day(n, "Intro to PyTorch") for n in range(1, 8)]
+        self.assertEqual(baselines.select_days(days, ["PyTorch/TensorFlow"], [], limit=3), [1, 2, 3])
+        self.assertEqual(baselines.select_days(days, ["Linear algebra"], []), [])
+
+    def test_known_skills(self):
+        result = {"skill_map": {"skills": [
+            {"name": "Python", "level": "advanced"}, {"name": "SQL", "level": "beginner"},
+        ]}}
+        self.assertEqual(baselines.known_skills(result), ["Python"])
+
+
+class TestFallback(unittest.TestCase):
+
+    def tearDown(self):
+        baselines.reset_baselines()
+
+    def test_baseline_when_available_else_mock(self):
+        baselines.reset_baselines({ROLE: _baseline()})
+        self.assertEqual(baselines.fallback_roadmap(ROLE)["reasoning"], "baseline")
+        self.assertEqual(baselines.fallback_roadmap("Astronaut")["reasoning"], MOCK_ROADMAP_RESPONSE["reasoning"])
+
+    def test_copies_are_independent(self):
+        baselines.reset_baselines({ROLE: _baseline()})
+        baselines.get_baseline(ROLE)["reasoning"] = "mutated"
+        self.assertEqual(baselines.get_baseline(ROLE)["reasoning"], "baseline")
+
+    def test_pipeline_falls_back_to_role_baseline(self):
+        baselines.reset_baselines({ROLE: _baseline()})
+
+        async def llm(prompt, schema=None):
+            return None
+
+        req = RoadmapRequest(resume_text="Excel and SQL", dream_role=ROLE)
+        with patch.object(pipeline, "RESUME_REUSE", False):
+            result = asyncio.run(pipeline.run_roadmap_pipeline(req, "", "", llm))
+        self.assertEqual(result["reasoning"], "baseline")
+
+
+class TestBaselineMode(unittest.TestCase):
+
+    def setUp(self):
+        baselines.reset_baselines({ROLE: _baseline()})
+
+    def tearDown(self):
+        baselines.reset_baselines()
+
+    def _run(self, llm, overloaded=None):
+        req = RoadmapRequest(resume_text="Python and pandas", dream_role=ROLE)
+        with patch.object(pipeline, "ROADMAP_MODE", "baseline"), patch.object(pipeline, "RESUME_REUSE", False):
+            return asyncio.run(pipeline.run_roadmap_pipeline(req, "", "", llm, overloaded=overloaded))
+
+    def test_only_selected_days_are_rewritten(self):
+        calls = []
+
+        async def llm(prompt, schema=None):
+            kind = call_type(schema)
+            calls.append(kind)
+            if kind == "analysis":
+                return {
+                    "reasoning": "personal",
+                    "skill_map": {"skills": [{"name": "Pandas", "level": "advanced", "category": "tool"}]},
+                    "gap_analysis": {"critical": [{"skill": "PyTorch", "reason": "r"}]},
+                }
+            if kind == "week":
+                # Renumbered 1..n — mapped back onto the selected days
+                count = schema["properties"]["days"]["minItems"]
+                return {"days": [_day(i, f"Rewritten {i}") for i in range(1, count + 1)]}
+            return None
+
+        result = self._run(llm)
+        self.assertEqual(calls, ["analysis", "week", "project"])
+        self.assertEqual(result["reasoning"], "personal")
+        days = {d["day"]: d["objective"] for d in result["roadmap"]["days"]}
+        self.assertEqual(len(days), 30)
+        self.assertTrue(days[2].startswith("Rewritten"))     # Pandas: already known
+        self.assertTrue(days[16].startswith("Rewritten"))    # PyTorch: a gap
+        self.assertEqual(days[4], _baseline()["roadmap"]["days"][3]["objective"])
+        self.assertEqual(result["flagship_project"]["title"], _baseline()["flagship_project"]["title"])
+
+    def test_overloaded_serves_baseline_without_llm(self):
+        async def llm(prompt, schema=None):
+            raise AssertionError("no LLM calls under load")
+
+        sections = []
+        req = RoadmapRequest(resume_text="Python", dream_role=ROLE)
+        result = asyncio.run(pipeline.run_roadmap_pipeline(
+            req, "", "", llm, on_section=lambda name, data: sections.append(name), overloaded=lambda: True,
+        ))
+        self.assertEqual(result["reasoning"], "baseline")
+        self.assertEqual(sections[-1], "flagship_project")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Unit tests for batch.py
+
+Covers:
+  - JSONL / CSV parsing with stable row IDs; non-object JSONL lines rejected
+  - Streaming run writes one result per row
+  - Resume skips rows already checkpointed as ok
+  - PDF paths rejected when not allowed (HTTP endpoint)
+  - Rows admitted and charged against the submitting client's limits
+  - A full LLM queue is retried, not a row error; a crashed writer fails the batch
+  - Batch status survives a restart (jobs DB + results file)
+"""
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import batch
+from batch import parse_rows, completed_ids, run_batch, BatchStats
+from jobs import JobStore
+from rate_limit import RateLimiter
+from scheduler import QueueFullError
+
+
+COHORT_JSONL = "\n".join([
+    json.dumps({"resume_text": "Python dev", "dream_role": "Data Analyst"}),
+    json.dumps({"id": "s-2", "resume_text": "Java dev", "dream_role": "Backend Developer"}),
+    "",
+])
+
+
+def fake_llm(prompt: str, schema: dict | None = None, on_usage=None) -> dict:
+    if on_usage is not None:
+        on_usage({"prompt_tokens": 90, "output_tokens": 10})
+    return {"reasoning": "ok", "flagship_project": {"title": "Project"}}
+
+
+class TestParseRows(unittest.TestCase):
+
+    def test_jsonl_ids(self):
+        rows = parse_rows(COHORT_JSONL, "jsonl")
+        self.assertEqual([r["id"] for r in rows], ["row-1", "s-2"])
+
+    def test_csv(self):
+        rows = parse_rows("resume_text,dream_role,github_username\nPython dev,ML Engineer,octocat\n", "csv")
+        self.assertEqual(rows[0]["dream_role"], "ML Engineer")
+        self.assertEqual(rows[0]["github_username"], "octocat")
+        self.assertEqual(rows[0]["id"], "row-1")
+
+    def test_jsonl_non_object_rejected(self):
+        with self.assertRaisesRegex(ValueError, "line 3: expected a JSON object"):
+            parse_rows('{"resume_text": "x"}\n\n["not", "a", "row"]\n', "jsonl")
+
+
+class TestRunBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = Path(self.tmp.name) / "out.jsonl"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch("batch.call_llm", side_effect=fake_llm)
+    def test_writes_results_and_resumes(self, mock_llm):
+        rows = parse_rows(COHORT_JSONL, "jsonl")
+        report = asyncio.run(run_batch(rows, self.output, {}))
+
+        self.assertEqual(report["ok"], 2)
+        self.assertIn("roadmaps_per_minute", report)
+        self.assertEqual(report["stages"]["llm"]["count"], 2)
+        self.assertEqual(completed_ids(self.output), {"row-1", "s-2"})
+
+        calls = mock_llm.call_count
+        report = asyncio.run(run_batch(rows, self.output, {}))
+        self.assertEqual(report["skipped"], 2)
+        self.assertEqual(mock_llm.call_count, calls)
+
+    @patch("batch.call_llm", side_effect=fake_llm)
+    def test_pdf_paths_rejected_when_disallowed(self, mock_llm):
+        rows = parse_rows(json.dumps({"resume_pdf": "/etc/passwd", "dream_role": "x"}), "jsonl")
+        report = asyncio.run(run_batch(rows, self.output, {}, allow_pdf_paths=False))
+
+        self.assertEqual(report["failed"], 1)
+        record = json.loads(self.output.read_text().splitlines()[0])
+        self.assertEqual(record["status"], "error")
+        mock_llm.assert_not_called()
+
+    @patch("batch.call_llm", side_effect=fake_llm)
+    def test_rows_charged_to_client(self, mock_llm):
+        limiter = RateLimiter(":memory:", per_minute=6, burst=2, token_quota=10_000)
+        rows = parse_rows(COHORT_JSONL, "jsonl")
+        report = asyncio.run(run_batch(rows, self.output, {}, limiter=limiter, client_id="key:k1"))
+
+        self.assertEqual(report["ok"], 2)
+        status = limiter.status("key:k1")
+        self.assertEqual(status["requests_left"], 0)
+        self.assertEqual(status["tokens_left"], 10_000 - 100 * mock_llm.call_count)
+
+    @patch("batch.call_llm", side_effect=fake_llm)
+    def test_full_queue_is_retried(self, mock_llm):
+        calls = []
+
+        async def run(fn, *args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise QueueFullError(retry_after=0)
+            return fn(*args)
+
+        rows = parse_rows(COHORT_JSONL, "jsonl")[:1]
+        with patch.object(batch.scheduler, "run", run):
+            report = asyncio.run(run_batch(rows, self.output, {}))
+        self.assertEqual((report["ok"], report["failed"]), (1, 0))
+
+    @patch("batch.call_llm", side_effect=fake_llm)
+    def test_writer_crash_fails_batch(self, mock_llm):
+        self.output.write_text("")     # a file where the results directory should be
+        rows = parse_rows(COHORT_JSONL, "jsonl") * 20
+        stats = BatchStats()
+        with self.assertRaises(OSError):
+            asyncio.run(run_batch(rows, self.output / "out.jsonl", {}, stats=stats))
+        report = stats.report()
+        self.assertEqual(report["status"], "failed")
+        self.assertTrue(report["done"])
+        self.assertIn("Error", report["error"])
+
+
+class TestBatchEndpoints(unittest.TestCase):
+
+    def setUp(self):
+        from fastapi.testclient import TestClient
+        import main
+
+        self.main = main
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = JobStore(os.path.join(self.tmp.name, "jobs.db"))
+        self.patches = [
+            patch.object(main, "job_store", self.store),
+            patch.object(main, "BATCH_DIR", Path(self.tmp.name)),
+            patch.dict(main.batches, clear=True),
+        ]
+        for p in self.patches:
+            p.start()
+        self.client = TestClient(main.app)
+
+    def tearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        self.tmp.cleanup()
+
+    def test_status_survives_restart(self):
+        self.store.save_batch("b1", "1.2.3.4", BatchStats(3).report())
+        lines = [{"id": "row-1", "status": "ok"}, {"id": "row-2", "status": "error", "error": "pdf: x"}]
+        (Path(self.tmp.name) / "b1.jsonl").write_text("".join(json.dumps(r) + "\n" for r in lines))
+        self.assertEqual(self.store.interrupt_batches(), 1)    # what startup does after a restart
+
+        body = self.client.get("/batch/b1").json()
+        self.assertEqual((body["status"], body["done"]), ("interrupted", True))
+        self.assertEqual((body["total"], body["ok"], body["failed"]), (3, 1, 1))
+        self.assertEqual(self.client.get("/batch/b1/results").status_code, 200)
+        self.assertEqual(self.client.get("/batch/nope").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Unit tests for chunked roadmap generation (ROADMAP_MODE=chunked).
+
+Covers:
+  - Merging a week's days into the right day range
+  - Re-numbering weeks the model numbered from 1
+  - Full 30-day roadmap with no filler days
+"""
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pipeline
+from pipeline import _merge_week_days, generate_roadmap_chunked, WEEK_DAY_RANGES
+from models import RoadmapRequest
+
+
+def _day(n):
+    return {"day": n, "objective": f"obj {n}", "resource": "docs", "task": "build", "hours": 2}
+
+
+def fake_llm(prompt: str, schema: dict | None = None) -> dict:
+    """Answer analysis and week prompts like a well-behaved model."""
+    if "Plan week" in prompt:
+        week = int(prompt.split("Plan week ")[1].split()[0])
+        first, last = WEEK_DAY_RANGES[week - 1]
+        return {"days": [_day(n) for n in range(first, last + 1)]}
+    return {
+        "reasoning": "Strong Python, weak SQL.",
+        "gap_analysis": {"critical": [{"skill": "SQL", "reason": "Required"}]},
+        "roadmap": {"weekly_milestones": [
+            {"week": w, "milestone": f"Milestone {w}", "skills_gained": ["SQL"]} for w in range(1, 5)
+        ]},
+    }
+
+
+class TestMergeWeekDays(unittest.TestCase):
+
+    def test_keeps_days_in_range(self):
+        days = _merge_week_days([_day(8), _day(9), _day(30)], 8, 14)
+        self.assertEqual([d["day"] for d in days], [8, 9])
+
+    def test_renumbers_relative_week(self):
+        days = _merge_week_days([_day(1), _day(2), _day(3)], 8, 14)
+        self.assertEqual([d["day"] for d in days], [8, 9, 10])
+
+    def test_drops_duplicates_and_garbage(self):
+        days = _merge_week_days([_day(15), _day(15), "junk", _day(16)], 15, 21)
+        self.assertEqual([d["day"] for d in days], [15, 16])
+
+    def test_non_list_returns_empty(self):
+        self.assertEqual(_merge_week_days(None, 1, 7), [])
+
+
+class TestGenerateRoadmapChunked(unittest.TestCase):
+
+    @patch("pipeline.call_llm", side_effect=fake_llm)
+    def test_produces_30_real_days(self, mock_llm):
+        req = RoadmapRequest(resume_text="resume", dream_role="Data Analyst")
+        result = asyncio.run(generate_roadmap_chunked(req, "skills", ""))
+
+        days = result["roadmap"]["days"]
+        self.assertEqual([d["day"] for d in days], list(range(1, 31)))
+        self.assertFalse(any(d["objective"].startswith("Self-study") for d in days))
+        self.assertEqual(len(result["roadmap"]["weekly_milestones"]), 4)
+        self.assertEqual(mock_llm.call_count, 5)  # analysis + 4 weeks
+
+    @patch("pipeline.call_llm", return_value=None)
+    def test_analysis_failure_returns_none(self, mock_llm):
+        req = RoadmapRequest(resume_text="resume", dream_role="Data Analyst")
+        self.assertIsNone(asyncio.run(generate_roadmap_chunked(req, "skills", "")))
+
+    def test_short_week_is_retried(self):
+        responses = iter([{"days": [_day(1)]}, {"days": [_day(n) for n in range(1, 8)]}])
+        with patch("pipeline.call_llm", side_effect=lambda p, schema=None: next(responses)):
+            req = RoadmapRequest(resume_text="resume", dream_role="Data Analyst")
+            days = asyncio.run(pipeline._generate_week(req, 1, {"week": 1}, []))
+        self.assertEqual(len(days), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+"""
+Unit tests for request deadlines and per-stage budgets
+
+Covers:
+  - bounded_llm cuts off a hanging call; stage_deadline budgets and reserve
+  - A scheduled call cut off by its stage keeps the LLM slot until Ollama stops
+  - Call 1 out of time → rule-based roadmap + template project, within budget
+  - Too little time for Call 2 → template project from Call 1's gaps
+  - A chunked week out of time → rule-based days, not generic padding
+  - call_llm stops streaming at the deadline
+  - GitHub: no call with an expired deadline; partial profiles not cached
+  - X-Request-Timeout parsing
+"""
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import github_service
+import llm_service
+import main
+import pipeline
+from llm_service import call_llm
+from models import RoadmapRequest
+from pipeline import bounded_llm, run_roadmap_pipeline, stage_deadline, WEEK_DAY_RANGES
+from scheduler import LLMScheduler, PRIORITY_INTERACTIVE
+from test_chunked_roadmap import fake_llm
+from test_llm_service import FakeStream
+
+ROLE = "Data Analyst"
+
+
+def _run(llm, deadline, mode="single"):
+    req = RoadmapRequest(resume_text="Excel and SQL", dream_role=ROLE)
+    role = pipeline.load_roles().get(ROLE)
+    with patch.object(pipeline, "ROADMAP_MODE", mode), patch.object(pipeline, "RESUME_REUSE", False):
+        return asyncio.run(run_roadmap_pipeline(req, "", "", llm, role=role, deadline=deadline))
+
+
+class TestBudgets(unittest.TestCase):
+
+    def test_stage_deadline(self):
+        self.assertIsNone(stage_deadline(None, 5))
+        now = time.monotonic()
+        self.assertLessEqual(stage_deadline(now + 100, 5), time.monotonic() + 5)
+        self.assertAlmostEqual(stage_deadline(now + 100, reserve=20), now + 80)
+
+    def test_bounded_llm_cuts_off(self):
+        async def hang(prompt, schema=None):
+            await asyncio.sleep(10)
+
+        start = time.monotonic()
+        self.assertIsNone(asyncio.run(bounded_llm(hang, start + 0.05)("p")))
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_stage_timeout_keeps_slot_until_generation_stops(self):
+        sched, generating, stop = LLMScheduler(concurrency=1), threading.Event(), threading.Event()
+        seen = {}
+
+        def slow_call_llm(prompt, schema=None, cancel_event=None, on_usage=None, deadline=None):
+            seen["deadline"] = deadline
+            generating.set()
+            stop.wait(5)          # prefill: the cancel event is only seen at the next chunk
+            return None
+
+        async def scenario():
+            deadline = time.monotonic() + 0.05
+            llm = main._scheduled_llm(None, PRIORITY_INTERACTIVE, client_id="c", quota=False, deadline=deadline)
+            self.assertIsNone(await bounded_llm(llm, deadline)("p"))
+            self.assertTrue(generating.is_set())
+            self.assertEqual(seen["deadline"], deadline)
+            self.assertEqual(sched.stats()["running"], 1)
+            stop.set()
+            for _ in range(100):
+                if sched.stats()["running"] == 0:
+                    break
+                await asyncio.sleep(0.01)
+            self.assertEqual(sched.stats()["running"], 0)
+
+        with patch.object(main, "scheduler", sched), patch.object(main, "call_llm", slow_call_llm):
+            asyncio.run(scenario())
+
+
+class TestPipelineDegrades(unittest.TestCase):
+
+    def test_call1_out_of_time(self):
+        async def hang(prompt, schema=None):
+            await asyncio.sleep(10)
+
+        start = time.monotonic()
+        with patch.object(pipeline, "PROJECT_BUDGET", 0), patch.object(pipeline, "PROJECT_MIN_BUDGET", 0):
+            result = _run(hang, start + 0.1)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(len(result["roadmap"]["days"]), 30)
+        self.assertIn("capstone", result["flagship_project"]["title"])
+
+    def test_no_time_for_call2(self):
+        prompts = []
+
+        async def llm(prompt, schema=None):
+            prompts.append(prompt)
+            return fake_llm(prompt)
+
+        # Call 1 returns at once, but less than PROJECT_MIN_BUDGET is left for Call 2
+        with patch.object(pipeline, "PROJECT_BUDGET", 0), patch.object(pipeline, "PROJECT_MIN_BUDGET", 30):
+            result = _run(llm, time.monotonic() + 10)
+        self.assertEqual(len(prompts), 1)
+        project = result["flagship_project"]
+        self.assertIn("SQL", project["tech_stack"])
+        self.assertEqual([f["week"] for f in project["weekly_features"]], [1, 2, 3, 4])
+
+    def test_chunked_week_out_of_time(self):
+        async def llm(prompt, schema=None):
+            if "Plan week 3" in prompt:
+                await asyncio.sleep(10)
+            return fake_llm(prompt)
+
+        start = time.monotonic()
+        with patch.object(pipeline, "PROJECT_BUDGET", 0), patch.object(pipeline, "PROJECT_MIN_BUDGET", 0):
+            result = _run(llm, start + 0.2, mode="chunked")
+        self.assertLess(time.monotonic() - start, 1)
+        days = result["roadmap"]["days"]
+        self.assertEqual([d["day"] for d in days], list(range(1, 31)))
+        first, last = WEEK_DAY_RANGES[2]
+        self.assertEqual(days[0]["objective"], "obj 1")                   # LLM days kept
+        for day in days[first - 1:last]:
+            self.assertFalse(day["objective"].startswith("Self-study"))  # rule-based, not padding
+
+
+class TestCallLLMDeadline(unittest.TestCase):
+
+    def test_stops_streaming_at_deadline(self):
+        stream = FakeStream(['{"reasoning": ', '"ok"}'])
+        with patch.object(llm_service.get_ollama_client(), "chat", return_value=stream):
+            self.assertIsNone(call_llm("prompt", deadline=time.monotonic() - 1))
+        self.assertTrue(stream.closed)
+        self.assertLess(stream.consumed, 2)
+
+
+class TestGitHubDeadline(unittest.TestCase):
+
+    def setUp(self):
+        github_service._cache.clear()
+
+    def test_expired_deadline_skips_calls(self):
+        with patch.object(github_service, "_get") as get:
+            self.assertIsNone(github_service.fetch_github_profile("octocat", time.monotonic()))
+        get.assert_not_called()
+
+    def test_partial_profile_not_cached(self):
+        user = {"login": "octocat", "name": "The Octocat", "public_repos": 8}
+        clock = MagicMock(side_effect=[0.0, 10.0] + [100.0] * 10)   # time for the profile, not the repos
+        with patch.object(github_service, "_get", return_value=user) as get, \
+                patch.object(github_service.time, "monotonic", clock):
+            summary = github_service.fetch_github_profile("octocat", 5.0)
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(summary["notable_projects"], [])
+        self.assertNotIn("octocat", github_service._cache)
+
+
+class TestRequestTimeoutHeader(unittest.TestCase):
+
+    def _deadline(self, value=None):
+        request = MagicMock()
+        request.headers = {"x-request-timeout": value} if value is not None else {}
+        return main._request_deadline(request)
+
+    def test_header(self):
+        with patch.object(main, "REQUEST_DEADLINE", 120), patch.object(main, "REQUEST_DEADLINE_MAX", 300):
+            self.assertAlmostEqual(self._deadline() - time.monotonic(), 120, delta=1)
+            self.assertAlmostEqual(self._deadline("30") - time.monotonic(), 30, delta=1)
+            self.assertAlmostEqual(self._deadline("9999") - time.monotonic(), 300, delta=1)
+            self.assertAlmostEqual(self._deadline("soon") - time.monotonic(), 120, delta=1)
+            self.assertIsNone(self._deadline("0"))
+        with patch.object(main, "REQUEST_DEADLINE", 0):
+            self.assertIsNone(self._deadline())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Unit tests for jobs.py
+
+Covers:
+  - Job persistence and priority claiming
+  - Re-queueing jobs interrupted by a restart
+  - Worker pool running a job to completion with partial sections
+  - Failed jobs record their error
+"""
+import asyncio
+import os
+import tempfile
+import unittest
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from jobs import JobStore, JobManager, STATUS_DONE, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING
+
+
+class TestJobStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "jobs.db")
+        self.store = JobStore(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_create_and_get(self):
+        job_id = self.store.create("roadmap", {"dream_role": "ML Engineer"}, 1, "1.2.3.4")
+        job = self.store.get(job_id)
+        self.assertEqual(job["status"], STATUS_QUEUED)
+        self.assertEqual(job["payload"], {"dream_role": "ML Engineer"})
+        self.assertIsNone(self.store.get("missing"))
+
+    def test_claims_by_priority(self):
+        batch = self.store.create("roadmap", {}, 2, "a")
+        interactive = self.store.create("roadmap", {}, 1, "b")
+        self.assertEqual(self.store.claim_next()["id"], interactive)
+        self.assertEqual(self.store.claim_next()["id"], batch)
+        self.assertIsNone(self.store.claim_next())
+
+    def test_survives_restart(self):
+        job_id = self.store.create("roadmap", {}, 1, "a")
+        self.store.claim_next()
+
+        reopened = JobStore(self.path)
+        self.assertEqual(reopened.get(job_id)["status"], STATUS_RUNNING)
+        self.assertEqual(reopened.requeue_interrupted(), 1)
+        self.assertEqual(reopened.get(job_id)["status"], STATUS_QUEUED)
+
+
+class TestJobManager(unittest.TestCase):
+
+    def _run_job(self, runner) -> dict:
+        store = JobStore(":memory:")
+
+        async def scenario():
+            manager = JobManager(store, runner, workers=1)
+            await manager.start()
+            job_id = manager.submit("roadmap", {"dream_role": "Data Analyst"}, 1, "a")
+            for _ in range(100):
+                if store.get(job_id)["status"] in (STATUS_DONE, STATUS_FAILED):
+                    break
+                await asyncio.sleep(0.01)
+            await manager.stop()
+            return store.get(job_id)
+
+        return asyncio.run(scenario())
+
+    def test_runs_job_with_sections(self):
+        async def runner(job, on_section):
+            on_section("skill_map", {"skills": []})
+            return {"reasoning": job["payload"]["dream_role"]}
+
+        job = self._run_job(runner)
+        self.assertEqual(job["status"], STATUS_DONE)
+        self.assertEqual(job["sections"], {"skill_map": {"skills": []}})
+        self.assertEqual(job["result"], {"reasoning": "Data Analyst"})
+
+    def test_failed_job_records_error(self):
+        async def runner(job, on_section):
+            raise RuntimeError("boom")
+
+        job = self._run_job(runner)
+        self.assertEqual(job["status"], STATUS_FAILED)
+        self.assertEqual(job["error"], "boom")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Unit tests for llm_archive.py and call_llm record/replay
+
+Covers:
+  - Record mode archives raw output (including malformed) with Ollama's timing fields
+  - Replay mode serves recorded responses without calling Ollama
+  - Replay misses, round-robin over repeated keys, simulated timing
+"""
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import llm_service
+from llm_archive import LLMArchive, archive_key, replay_stream
+from llm_schemas import PROJECT_SCHEMA
+from llm_service import call_llm
+
+
+def _stream(pieces, **final):
+    chunks = [SimpleNamespace(message=SimpleNamespace(content=p), done=False, prompt_eval_count=None)
+              for p in pieces]
+    chunks.append(SimpleNamespace(message=SimpleNamespace(content=""), done=True,
+                                  **{"prompt_eval_count": None, **final}))
+
+    class S(list):
+        def close(self):
+            pass
+    return S(chunks)
+
+
+class TestRecordReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.archive = LLMArchive(Path(self.tmp.name) / "archive.jsonl")
+        self._patch = patch.object(llm_service, "archive", self.archive)
+        self._patch.start()
+
+    def tearDown(self):
+        self._patch.stop()
+        self.tmp.cleanup()
+
+    def test_records_ollama_timing_from_done_chunk(self):
+        final = {"prompt_eval_count": 400, "eval_count": 50, "load_duration": 10**8,
+                 "prompt_eval_duration": 2 * 10**9, "eval_duration": 5 * 10**9}
+        with patch.object(llm_service, "ARCHIVE_MODE", "record"), \
+                patch.object(llm_service.get_ollama_client(), "chat",
+                             return_value=_stream(['{"flagship_project": ', '{"title": "X"}}'], **final)):
+            call_llm("timed prompt", schema=PROJECT_SCHEMA)
+        entry = LLMArchive(self.archive.path).lookup(archive_key("timed prompt", PROJECT_SCHEMA))
+        self.assertEqual(entry["timing"], final)
+
+    def test_record_then_replay(self):
+        with patch.object(llm_service, "ARCHIVE_MODE", "record"), \
+                patch.object(llm_service.get_ollama_client(), "chat", return_value=_stream(['{"flagship_project": ', '{"title": "X"}}'])):
+            recorded = call_llm("prompt", schema=PROJECT_SCHEMA)
+
+        entry = LLMArchive(self.archive.path).lookup(archive_key("prompt", PROJECT_SCHEMA))
+        self.assertEqual(entry["call_type"], "project")
+        self.assertIn("eval_count", entry["timing"])
+
+        with patch.object(llm_service, "ARCHIVE_MODE", "replay"), \
+                patch.object(llm_service.get_ollama_client(), "chat", side_effect=AssertionError("Ollama must not be called")):
+            self.assertEqual(call_llm("prompt", schema=PROJECT_SCHEMA), recorded)
+
+    def test_malformed_output_is_recorded(self):
+        with patch.object(llm_service, "ARCHIVE_MODE", "record"), \
+                patch.object(llm_service.get_ollama_client(), "chat", return_value=_stream(['{"flagship_project": {"title"'])):
+            self.assertIsNone(call_llm("bad", schema=PROJECT_SCHEMA))
+        entry = self.archive.lookup(archive_key("bad", PROJECT_SCHEMA))
+        self.assertEqual(entry["content"], '{"flagship_project": {"title"')
+
+    def test_replay_miss_returns_none(self):
+        with patch.object(llm_service, "ARCHIVE_MODE", "replay"):
+            self.assertIsNone(call_llm("never recorded"))
+
+    def test_round_robin_over_entries(self):
+        key = archive_key("p", None)
+        for content in ('{"a": 1}', '{"a": 2}'):
+            self.archive.record(key, "json", "m", content, {})
+        served = [self.archive.lookup(key)["content"] for _ in range(3)]
+        self.assertEqual(served, ['{"a": 1}', '{"a": 2}', '{"a": 1}'])
+
+
+class TestReplayStream(unittest.TestCase):
+
+    def test_chunks_and_final_timing(self):
+        entry = {"content": "x" * 70, "timing": {"eval_count": 18, "eval_duration": 10**9}}
+        chunks = list(replay_stream(entry, simulate_timing=False))
+        self.assertEqual("".join(c.message.content for c in chunks), "x" * 70)
+        self.assertTrue(chunks[-1].done)
+        self.assertEqual(chunks[-1].eval_count, 18)
+
+    def test_simulated_timing_is_scaled(self):
+        entry = {"content": "{}", "timing": {"prompt_eval_duration": 10**9, "eval_duration": 10**9}}
+        started = time.monotonic()
+        list(replay_stream(entry, simulate_timing=True, speed=20))
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertGreater(time.monotonic() - started, 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
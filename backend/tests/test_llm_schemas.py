@@ -0,0 +1,67 @@
+"""
+Unit tests for llm_schemas.py
+
+Covers:
+  - $refs inlined, every property required
+  - Title annotations stripped, but fields named "title" kept
+  - Fixed cardinalities (30 days, 4 milestones, 4 features)
+  - Per-call schemas only contain the sections that call produces
+"""
+import json
+import unittest
+from collections.abc import Iterator
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from llm_schemas import ROADMAP_SCHEMA, ANALYSIS_SCHEMA, PROJECT_SCHEMA, ADAPT_SCHEMA, week_schema
+
+
+def _schema_nodes(node: dict) -> Iterator[dict]:
+    """Every schema node, skipping the field-name level of `properties` maps."""
+    yield node
+    for sub in node.get("properties", {}).values():
+        yield from _schema_nodes(sub)
+    if isinstance(node.get("items"), dict):
+        yield from _schema_nodes(node["items"])
+
+
+class TestLLMSchemas(unittest.TestCase):
+
+    def test_no_refs_or_title_annotations(self):
+        for schema in (ROADMAP_SCHEMA, ANALYSIS_SCHEMA, PROJECT_SCHEMA, ADAPT_SCHEMA):
+            self.assertNotIn("$ref", json.dumps(schema))
+            for node in _schema_nodes(schema):
+                self.assertNotIn("title", node)
+                self.assertNotIn("default", node)
+
+    def test_title_field_kept(self):
+        project = PROJECT_SCHEMA["properties"]["flagship_project"]
+        self.assertIn("title", project["properties"])
+        self.assertIn("title", project["required"])
+        self.assertEqual(project["properties"]["title"]["type"], "string")
+
+    def test_all_properties_required(self):
+        day = ROADMAP_SCHEMA["properties"]["roadmap"]["properties"]["days"]["items"]
+        self.assertEqual(set(day["required"]), {"day", "objective", "resource", "task", "output", "hours"})
+
+    def test_roadmap_cardinality(self):
+        roadmap = ROADMAP_SCHEMA["properties"]["roadmap"]["properties"]
+        self.assertEqual((roadmap["days"]["minItems"], roadmap["days"]["maxItems"]), (30, 30))
+        self.assertEqual(roadmap["weekly_milestones"]["minItems"], 4)
+        self.assertNotIn("flagship_project", ROADMAP_SCHEMA["properties"])
+
+    def test_analysis_has_no_days(self):
+        roadmap = ANALYSIS_SCHEMA["properties"]["roadmap"]
+        self.assertEqual(list(roadmap["properties"]), ["weekly_milestones"])
+        # Deriving the analysis schema must not mutate the roadmap schema
+        self.assertIn("days", ROADMAP_SCHEMA["properties"]["roadmap"]["properties"])
+
+    def test_project_and_week(self):
+        features = PROJECT_SCHEMA["properties"]["flagship_project"]["properties"]["weekly_features"]
+        self.assertEqual(features["maxItems"], 4)
+        self.assertEqual(week_schema(9)["properties"]["days"]["minItems"], 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Unit tests for llm_service.py
+
+Covers:
+  - JsonObjectScanner (strings, escapes, split chunks)
+  - Early stop once the top-level object closes (bounded wait for the done chunk)
+  - Cancellation via cancel_event
+"""
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import llm_service
+from llm_service import JsonObjectScanner, call_llm
+
+
+def _scan(chunks: list[str]) -> str | None:
+    scanner, seen = JsonObjectScanner(), ""
+    for chunk in chunks:
+        end = scanner.feed(chunk)
+        if end is not None:
+            return seen + chunk[:end]
+        seen += chunk
+    return None
+
+
+class FakeStream:
+    """Stands in for ollama.chat(stream=True); records how much was consumed."""
+
+    def __init__(self, pieces: list[str]):
+        self.pieces = pieces
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for i, piece in enumerate(self.pieces):
+            self.consumed += 1
+            yield SimpleNamespace(
+                message=SimpleNamespace(content=piece),
+                done=i == len(self.pieces) - 1,
+                prompt_eval_count=None,
+            )
+
+    def close(self):
+        self.closed = True
+
+
+class TestJsonObjectScanner(unittest.TestCase):
+
+    def test_finds_end_across_chunks(self):
+        self.assertEqual(_scan(['{"a": [1, ', '{"b": 2}]', '}  \n\n']), '{"a": [1, {"b": 2}]}')
+
+    def test_ignores_braces_in_strings(self):
+        self.assertEqual(_scan(['{"a": "}{]["}', ' tail']), '{"a": "}{]["}')
+
+    def test_escape_split_across_chunks(self):
+        self.assertEqual(_scan(['{"a": "x\\', '"}"}', '!!']), '{"a": "x\\"}"}')
+
+    def test_leading_text_is_not_counted(self):
+        self.assertEqual(_scan(['Sure} ] ', '{"a": 1}', ' more']), 'Sure} ] {"a": 1}')
+
+    def test_incomplete_returns_none(self):
+        self.assertIsNone(_scan(['{"a": ', '{"b": 1}']))
+
+
+class TestCallLLMStreaming(unittest.TestCase):
+
+    def test_stops_when_object_closes(self):
+        stream = FakeStream(['{"reasoning": ', '"ok"}'] + ["\n" * 50] * 100)
+        with patch.object(llm_service.get_ollama_client(), "chat", return_value=stream):
+            result = call_llm("prompt")
+        self.assertEqual(result, {"reasoning": "ok"})
+        self.assertEqual(stream.consumed, 2 + llm_service.DRAIN_CHUNKS)
+        self.assertTrue(stream.closed)
+
+    def test_reads_on_to_done_chunk(self):
+        stream = FakeStream(['{"reasoning": ', '"ok"}', "", "\n" * 50])
+        with patch.object(llm_service.get_ollama_client(), "chat", return_value=stream):
+            self.assertEqual(call_llm("prompt"), {"reasoning": "ok"})
+        self.assertEqual(stream.consumed, 4)
+
+    def test_cancel_event_aborts(self):
+        stream = FakeStream(['{"reasoning": ', '"ok"}'])
+        cancel = threading.Event()
+        cancel.set()
+        with patch.object(llm_service.get_ollama_client(), "chat", return_value=stream):
+            result = call_llm("prompt", cancel_event=cancel)
+        self.assertIsNone(result)
+        self.assertEqual(stream.consumed, 1)
+        self.assertTrue(stream.closed)
+
+    def test_truncated_json_returns_none(self):
+        with patch.object(llm_service.get_ollama_client(), "chat", return_value=FakeStream(['{"reasoning": "o'])):
+            self.assertIsNone(call_llm("prompt"))
+
+
+if __name__ == "__main__":
+    unittest.main()
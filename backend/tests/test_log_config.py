@@ -0,0 +1,77 @@
+"""
+Unit tests for log_config.py
+
+Covers:
+  - JSON lines with request_id and extra fields
+  - DEBUG sampling per message template
+  - Per-subsystem levels through the background listener
+"""
+import io
+import json
+import logging
+import unittest
+from unittest.mock import patch
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import tracing
+import log_config
+from log_config import JsonFormatter, SamplingFilter, setup_logging, shutdown_logging, get_logger
+
+
+def _record(msg="hello %s", args=("world",), level=logging.INFO, **extra):
+    record = logging.LogRecord("career_brain.test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestFormatting(unittest.TestCase):
+
+    def test_json_line(self):
+        line = json.loads(JsonFormatter().format(_record(request_id="r1", call_type="roadmap")))
+        self.assertEqual(line["msg"], "hello world")
+        self.assertEqual(line["level"], "info")
+        self.assertEqual(line["request_id"], "r1")
+        self.assertEqual(line["call_type"], "roadmap")
+
+    def test_sampling_keeps_one_in_n_debug(self):
+        f = SamplingFilter(0.25)
+        kept = sum(f.filter(_record(level=logging.DEBUG)) for _ in range(8))
+        self.assertEqual(kept, 2)
+        self.assertTrue(all(f.filter(_record(level=logging.WARNING)) for _ in range(3)))
+
+    def test_sampling_zero_drops_debug(self):
+        self.assertFalse(SamplingFilter(0).filter(_record(level=logging.DEBUG)))
+
+
+class TestSetup(unittest.TestCase):
+
+    def tearDown(self):
+        shutdown_logging()
+        root = logging.getLogger(log_config.ROOT)
+        root.handlers[:] = []
+        root.propagate = True
+        root.setLevel(logging.NOTSET)
+        get_logger("github").setLevel(logging.NOTSET)
+
+    def test_listener_writes_with_subsystem_levels(self):
+        out = io.StringIO()
+        env = {"LOG_LEVEL": "info", "LOG_LEVELS": "github=warning", "LOG_FORMAT": "json"}
+        with patch.dict(os.environ, env):
+            setup_logging(out)
+        with patch.object(tracing, "TRACE_LOG", False):
+            with tracing.start_trace("req", request_id="abc"):
+                get_logger("llm").info("kept %d", 1)
+                get_logger("github").info("filtered")
+                get_logger("llm").debug("below level")
+        shutdown_logging()  # flushes the queue
+
+        lines = [json.loads(l) for l in out.getvalue().splitlines()]
+        self.assertEqual([l["msg"] for l in lines], ["kept 1"])
+        self.assertEqual(lines[0]["request_id"], "abc")
+        self.assertEqual(lines[0]["logger"], "career_brain.llm")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Unit tests for metrics.py and LLM call telemetry
+
+Covers:
+  - Prometheus text rendering (labels, cumulative buckets, escaping)
+  - Telemetry from Ollama's final chunk vs client-side estimates
+  - Call-type labels derived from schemas
+"""
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import metrics
+from llm_schemas import ROADMAP_SCHEMA, PROJECT_SCHEMA, ADAPT_SCHEMA, week_schema, call_type
+import llm_service
+from llm_service import call_llm
+
+
+def _chunk(content: str, done: bool = False, **fields):
+    return SimpleNamespace(message=SimpleNamespace(content=content), done=done,
+                           prompt_eval_count=fields.pop("prompt_eval_count", None), **fields)
+
+
+class _Stream(list):
+    def close(self):
+        pass
+
+
+class TestRendering(unittest.TestCase):
+
+    def setUp(self):
+        self._registry = list(metrics.REGISTRY)
+
+    def tearDown(self):
+        metrics.REGISTRY[:] = self._registry
+
+    def test_counter_with_labels(self):
+        c = metrics.Counter("t_calls_total", "help", ("kind",))
+        c.inc(kind="a")
+        c.inc(2, kind='b"x')
+        lines = c.render()
+        self.assertIn("# TYPE t_calls_total counter", lines)
+        self.assertIn('t_calls_total{kind="a"} 1', lines)
+        self.assertIn('t_calls_total{kind="b\\"x"} 2', lines)
+
+    def test_histogram_buckets_are_cumulative(self):
+        h = metrics.Histogram("t_seconds", "help", ("kind",), buckets=(1, 5))
+        for v in (0.5, 3, 3, 10):
+            h.observe(v, kind="a")
+        lines = h.render()
+        self.assertIn('t_seconds_bucket{kind="a",le="1"} 1', lines)
+        self.assertIn('t_seconds_bucket{kind="a",le="5"} 3', lines)
+        self.assertIn('t_seconds_bucket{kind="a",le="+Inf"} 4', lines)
+        self.assertIn('t_seconds_sum{kind="a"} 16.5', lines)
+        self.assertIn('t_seconds_count{kind="a"} 4', lines)
+
+    def test_render_metrics_includes_llm_series(self):
+        text = metrics.render_metrics()
+        self.assertIn("# TYPE llm_decode_tokens_per_second histogram", text)
+        self.assertTrue(text.endswith("\n"))
+
+
+class TestCallTypes(unittest.TestCase):
+
+    def test_labels(self):
+        self.assertEqual(call_type(ROADMAP_SCHEMA), "roadmap")
+        self.assertEqual(call_type(PROJECT_SCHEMA), "project")
+        self.assertEqual(call_type(ADAPT_SCHEMA), "adapt")
+        self.assertEqual(call_type(week_schema(7)), "week")
+        self.assertEqual(call_type(None), "json")
+
+
+class TestCallTelemetry(unittest.TestCase):
+
+    def test_ollama_timings_from_final_chunk(self):
+        # As Ollama streams: the closing brace in a content chunk, then an empty done chunk
+        stream = _Stream([
+            _chunk('{"flagship_project": '),
+            _chunk('{}}'),
+            _chunk('', done=True, prompt_eval_count=400, eval_count=50,
+                   load_duration=int(0.5e9), prompt_eval_duration=int(2e9), eval_duration=int(5e9)),
+        ])
+        before_tokens = metrics.LLM_OUTPUT_TOKENS.value(call_type="project")
+        before_rates = metrics.LLM_DECODE_RATE.count(call_type="project")
+        usage = []
+        with patch.object(llm_service.get_ollama_client(), "chat", return_value=stream):
+            call_llm("prompt", schema=PROJECT_SCHEMA, on_usage=usage.append)
+        self.assertEqual((usage[0]["prompt_tokens"], usage[0]["output_tokens"]), (400, 50))
+        self.assertEqual(usage[0]["source"], "ollama")
+        self.assertEqual(metrics.LLM_OUTPUT_TOKENS.value(call_type="project") - before_tokens, 50)
+        self.assertEqual(metrics.LLM_DECODE_RATE.count(call_type="project") - before_rates, 1)
+        # 50 tokens / 5 s = 10 tok/s lands in the le="10" bucket
+        self.assertIn('llm_decode_tokens_per_second_bucket{call_type="project",le="10"}',
+                      metrics.render_metrics())
+
+    def test_early_stop_falls_back_to_client_estimates(self):
+        # No done chunk within DRAIN_CHUNKS of the closing brace: one token per chunk read
+        stream = _Stream([_chunk('{"a": '), _chunk('1}')] + [_chunk("\n" * 20)] * 50)
+        before = metrics.LLM_OUTPUT_TOKENS.value(call_type="json")
+        with patch.object(llm_service.get_ollama_client(), "chat", return_value=stream):
+            self.assertEqual(call_llm("prompt"), {"a": 1})
+        self.assertEqual(metrics.LLM_OUTPUT_TOKENS.value(call_type="json") - before, 2 + llm_service.DRAIN_CHUNKS)
+
+    def test_outcome_labels(self):
+        before = metrics.LLM_CALLS.value(call_type="adapt", outcome="parse_error")
+        with patch.object(llm_service.get_ollama_client(), "chat", return_value=_Stream([_chunk('{"a": ', done=True)])):
+            self.assertIsNone(call_llm("prompt", schema=ADAPT_SCHEMA))
+        self.assertEqual(metrics.LLM_CALLS.value(call_type="adapt", outcome="parse_error") - before, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
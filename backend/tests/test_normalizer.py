@@ -0,0 +1,99 @@
+"""
+Unit tests for normalizer.py
+
+Covers:
+  - Key alias fixing (top-level and project sub-keys)
+  - Padding to exactly 30 days / 4 milestones / 4 features
+  - Junk, duplicate and out-of-range items dropped
+  - Idempotency (second run is a no-op)
+  - Output validates as RoadmapResponse
+"""
+import copy
+import unittest
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from normalizer import post_process_roadmap, normalize_project
+from models import RoadmapResponse
+
+
+ROLE = "Data Analyst"
+
+
+def _complete() -> dict:
+    return post_process_roadmap({}, ROLE)
+
+
+class TestAliases(unittest.TestCase):
+
+    def test_top_level_aliases(self):
+        data = post_process_roadmap({"skills": {"strengths": ["SQL"]}, "gaps": {"critical": []}}, ROLE)
+        self.assertEqual(data["skill_map"], {"strengths": ["SQL"]})
+        self.assertNotIn("skills", data)
+        self.assertIn("gap_analysis", data)
+
+    def test_alias_ignored_when_canonical_present(self):
+        data = post_process_roadmap({"project": {"title": "A"}, "flagship_project": {"title": "B"}}, ROLE)
+        self.assertEqual(data["flagship_project"]["title"], "B")
+
+    def test_project_aliases(self):
+        fp = normalize_project({"name": "Dash", "technologies": ["SQL"], "features": []}, ROLE)
+        self.assertEqual(fp["title"], "Dash")
+        self.assertEqual(fp["tech_stack"], ["SQL"])
+        self.assertEqual(len(fp["weekly_features"]), 4)
+
+
+class TestPadding(unittest.TestCase):
+
+    def test_empty_response_is_complete(self):
+        data = _complete()
+        self.assertEqual([d["day"] for d in data["roadmap"]["days"]], list(range(1, 31)))
+        self.assertEqual([m["week"] for m in data["roadmap"]["weekly_milestones"]], [1, 2, 3, 4])
+        self.assertEqual(data["flagship_project"]["title"], f"{ROLE} Portfolio Project")
+        self.assertTrue(data["reasoning"])
+        RoadmapResponse(**data)
+
+    def test_keeps_real_days_and_sorts(self):
+        days = [{"day": 3, "objective": "SQL joins"}, {"day": "1", "objective": "SQL basics"}]
+        data = post_process_roadmap({"roadmap": {"days": days}}, ROLE)
+        result = data["roadmap"]["days"]
+        self.assertEqual(result[0]["objective"], "SQL basics")
+        self.assertEqual(result[2]["objective"], "SQL joins")
+        self.assertTrue(result[1]["objective"].startswith("Self-study"))
+
+    def test_drops_junk_duplicates_and_out_of_range(self):
+        days = [{"day": 1, "objective": "first"}, {"day": 1, "objective": "dup"}, {"day": 31}, "junk", None]
+        data = post_process_roadmap({"roadmap": {"days": days}}, ROLE)
+        result = data["roadmap"]["days"]
+        self.assertEqual(len(result), 30)
+        self.assertEqual(result[0]["objective"], "first")
+
+    def test_fills_empty_feature_fields(self):
+        fp = normalize_project({"title": "X", "weekly_features": [{"week": 2, "feature": ""}]}, ROLE)
+        self.assertEqual(fp["weekly_features"][1]["feature"], "Feature development")
+        self.assertEqual(fp["weekly_features"][1]["description"], "Week 2: Feature development")
+
+    def test_non_dict_sections_replaced(self):
+        data = post_process_roadmap({"roadmap": "30 days of SQL", "flagship_project": None}, ROLE)
+        self.assertEqual(len(data["roadmap"]["days"]), 30)
+        self.assertEqual(len(data["flagship_project"]["weekly_features"]), 4)
+
+    def test_non_dict_passthrough(self):
+        self.assertIsNone(post_process_roadmap(None, ROLE))
+
+
+class TestIdempotency(unittest.TestCase):
+
+    def test_second_run_is_noop(self):
+        data = post_process_roadmap({"roadmap": {"days": [{"day": 5}]}, "project": {"name": "X"}}, ROLE)
+        snapshot = copy.deepcopy(data)
+        days = data["roadmap"]["days"]
+
+        again = post_process_roadmap(data, ROLE)
+        self.assertEqual(again, snapshot)
+        self.assertIs(again["roadmap"]["days"], days)  # no re-allocation
+
+
+if __name__ == "__main__":
+    unittest.main()
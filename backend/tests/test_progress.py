@@ -0,0 +1,190 @@
+"""
+Unit tests for progress.py and the progress endpoints
+
+Covers:
+  - Append-only event log with per-day aggregates (re-reports replace the day)
+  - Drift from skipped, unreported and short days; the trigger threshold
+  - Adapted drift is not counted twice; reset on a new roadmap
+  - AdaptationBatcher: only off-peak, one re-plan per round in series,
+    failures stay due, full queue defers, a replaced roadmap is not a failure
+  - POST /progress → background re-plan merged into the stored roadmap
+"""
+import asyncio
+import copy
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main
+import metrics
+from mock_data import MOCK_ADAPT_RESPONSE, MOCK_ROADMAP_RESPONSE
+from normalizer import post_process_roadmap
+from progress import AdaptationBatcher, ProgressStore, progress_prompt
+from scheduler import QueueFullError
+
+ROADMAP = post_process_roadmap(copy.deepcopy(MOCK_ROADMAP_RESPONSE), "ML Engineer")
+
+
+class TestStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ProgressStore(os.path.join(self.tmp.name, "progress.db"), threshold=3)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_aggregates(self):
+        self.store.record("u", 1, 1, "completed", planned_hours=2)
+        self.store.record("u", 1, 2, "completed", hours=1, planned_hours=2)
+        summary = self.store.record("u", 1, 4, "skipped", planned_hours=3)
+        self.assertEqual((summary["days_completed"], summary["days_skipped"], summary["days_missed"]), (2, 1, 2))
+        self.assertEqual((summary["hours_spent"], summary["hours_planned"]), (3, 7))
+        self.assertEqual(summary["drift"], 2.5)        # half of day 2, unreported day 3, skipped day 4
+        self.assertFalse(summary["adaptation_due"])
+        self.assertIn("skipped days [4]", progress_prompt(summary))
+
+    def test_re_report_replaces_day_but_log_keeps_both(self):
+        self.store.record("u", 1, 1, "skipped", planned_hours=2)
+        summary = self.store.record("u", 1, 1, "completed", planned_hours=2)
+        self.assertEqual((summary["days_completed"], summary["days_skipped"], summary["drift"]), (1, 0, 0))
+        self.assertEqual([e["status"] for e in self.store.events("u")], ["skipped", "completed"])
+
+    def test_threshold_and_adapted_drift(self):
+        for day in (1, 2):
+            self.store.record("u", 1, day, "skipped", planned_hours=2)
+        self.assertEqual(self.store.due(), [])
+        summary = self.store.record("u", 1, 3, "skipped", planned_hours=2)
+        self.assertTrue(summary["adaptation_due"])
+        self.assertEqual([s["user_id"] for s in self.store.due()], ["u"])
+
+        self.store.mark_adapted("u", summary["drift_total"])
+        summary = self.store.record("u", 2, 4, "skipped", planned_hours=2)
+        self.assertEqual((summary["drift"], summary["adaptation_due"]), (1, False))
+        self.assertIsNotNone(summary["adapted_at"])
+
+    def test_reset_keeps_log(self):
+        self.store.record("u", 1, 1, "completed", planned_hours=2)
+        self.store.reset("u")
+        self.assertIsNone(self.store.summary("u"))
+        self.assertEqual(len(self.store.events("u")), 1)
+
+
+class TestBatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ProgressStore(os.path.join(self.tmp.name, "progress.db"), threshold=1)
+        for user in ("a", "b", "c"):
+            self.store.record(user, 1, 1, "skipped", planned_hours=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, adapt, off_peak=True, batch_size=2):
+        batcher = AdaptationBatcher(self.store, adapt, lambda: off_peak, batch_size=batch_size)
+        return asyncio.run(batcher.run_once())
+
+    def test_waits_for_off_peak(self):
+        async def adapt(summary):
+            raise AssertionError("not off-peak")
+
+        self.assertEqual(self._run(adapt, off_peak=False), 0)
+
+    def test_one_replan_per_round_in_series(self):
+        seen, running = [], []
+
+        async def adapt(summary):
+            running.append(summary["user_id"])
+            self.assertEqual(len(running), 1)          # never two at once
+            await asyncio.sleep(0)
+            running.pop()
+            seen.append(summary["user_id"])
+            return summary["user_id"] != "a"
+
+        self.assertEqual(self._run(adapt, batch_size=3), 1)
+        self.assertEqual(seen, ["a", "b"])             # stops at the first re-plan
+        self.assertEqual(sorted(s["user_id"] for s in self.store.due(10)), ["a", "c"])
+
+    def test_replaced_roadmap_is_not_a_failure(self):
+        async def adapt(summary):
+            return None
+
+        failed = metrics.AUTO_ADAPTATIONS.value(outcome="failed")
+        superseded = metrics.AUTO_ADAPTATIONS.value(outcome="superseded")
+        self.assertEqual(self._run(adapt, batch_size=1), 0)
+        self.assertEqual(metrics.AUTO_ADAPTATIONS.value(outcome="failed"), failed)
+        self.assertEqual(metrics.AUTO_ADAPTATIONS.value(outcome="superseded") - superseded, 1)
+        self.assertEqual(len(self.store.due(10)), 3)
+
+    def test_full_queue_defers(self):
+        async def adapt(summary):
+            raise QueueFullError(retry_after=5)
+
+        self.assertEqual(self._run(adapt, batch_size=10), 0)
+        self.assertEqual(len(self.store.due(10)), 3)
+
+
+class TestEndpoints(unittest.TestCase):
+
+    def setUp(self):
+        from fastapi.testclient import TestClient
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = TestClient(main.app)
+        self.store = ProgressStore(os.path.join(self.tmp.name, "progress.db"), threshold=3)
+        self.patches = [
+            patch.dict(main.state, {"last_roadmap": copy.deepcopy(ROADMAP), "roadmap_version": 1}),
+            patch.object(main, "progress_store", self.store),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        self.tmp.cleanup()
+
+    def test_drift_triggers_background_adaptation(self):
+        self.assertEqual(self.client.get("/progress").status_code, 404)
+        self.client.post("/progress", json={"day": 1, "status": "completed"})
+        body = self.client.post("/progress", json={"day": 4, "status": "skipped"}).json()
+        self.assertEqual(body["hours_spent"], ROADMAP["roadmap"]["days"][0]["hours"])
+        self.assertEqual(body["days_missed"], 3)
+        self.assertTrue(body["adaptation_due"])
+        self.assertEqual(self.client.post("/progress", json={"day": 31, "status": "skipped"}).status_code, 422)
+
+        prompts = []
+
+        async def llm(prompt, schema=None):
+            prompts.append(prompt)
+            return MOCK_ADAPT_RESPONSE
+
+        batcher = AdaptationBatcher(self.store, main._auto_adapt, lambda: True)
+        with patch.object(main, "_scheduled_llm", lambda *a, **kw: llm):
+            self.assertEqual(asyncio.run(batcher.run_once()), 1)
+        self.assertIn("PROGRESS LOG", prompts[0])
+        self.assertIn("skipped days [4]", prompts[0])
+        self.assertEqual(main.state["roadmap_version"], 2)
+        self.assertFalse(self.client.get("/progress").json()["adaptation_due"])
+
+    def test_background_llm_failure_is_not_merged(self):
+        for day in (1, 2, 3):
+            self.client.post("/progress", json={"day": day, "status": "skipped"})
+
+        async def llm(prompt, schema=None):
+            return None
+
+        batcher = AdaptationBatcher(self.store, main._auto_adapt, lambda: True)
+        with patch.object(main, "_scheduled_llm", lambda *a, **kw: llm):
+            self.assertEqual(asyncio.run(batcher.run_once()), 0)
+        self.assertEqual(main.state["roadmap_version"], 1)
+        self.assertTrue(self.client.get("/progress").json()["adaptation_due"])
+
+
+if __name__ == "__main__":
+    unittest.main()
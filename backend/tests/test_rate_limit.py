@@ -0,0 +1,118 @@
+"""
+Unit tests for rate_limit.py
+
+Covers:
+  - Request bucket: burst, refill, Retry-After
+  - LLM-token quota charged with actual counts; debt blocks admission
+  - Limits shared by two limiters on one SQLite file (two workers)
+  - Idle buckets pruned; limits off when both rates are 0
+  - 429 + Retry-After on /generate-roadmap, per client key; LLM usage charged
+"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import rate_limit
+from mock_data import MOCK_ROADMAP_RESPONSE
+from rate_limit import RateLimiter, RateLimitedError
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestBuckets(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "ratelimit.db")
+        self.clock = _Clock()
+        self.patch = patch.object(rate_limit.time, "time", self.clock)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmp.cleanup()
+
+    def test_burst_then_refill(self):
+        limiter = RateLimiter(self.path, per_minute=6, burst=2, token_quota=0)
+        limiter.acquire("a")
+        self.assertEqual(limiter.acquire("a")["requests_left"], 0)
+        with self.assertRaises(RateLimitedError) as ctx:
+            limiter.acquire("a")
+        self.assertEqual((ctx.exception.limit, ctx.exception.retry_after), ("requests", 10))
+        limiter.acquire("b")                    # other clients unaffected
+        self.clock.now += 10
+        limiter.acquire("a")
+
+    def test_token_quota_uses_actual_counts(self):
+        limiter = RateLimiter(self.path, per_minute=0, token_quota=1000, token_window=100)
+        limiter.acquire("a")
+        limiter.charge("a", 1500)               # one long generation: 500 tokens in debt
+        self.assertEqual(limiter.status("a")["tokens_left"], -500)
+        with self.assertRaises(RateLimitedError) as ctx:
+            limiter.acquire("a")
+        self.assertEqual((ctx.exception.limit, ctx.exception.retry_after), ("llm_tokens", 51))
+        self.clock.now += 51
+        limiter.acquire("a")
+
+    def test_limits_hold_across_workers(self):
+        first = RateLimiter(self.path, per_minute=6, burst=2, token_quota=0)
+        second = RateLimiter(self.path, per_minute=6, burst=2, token_quota=0)
+        first.acquire("a")
+        second.acquire("a")
+        with self.assertRaises(RateLimitedError):
+            first.acquire("a")
+
+    def test_prune_and_disabled(self):
+        limiter = RateLimiter(self.path, per_minute=60, burst=5, token_quota=0)
+        limiter.acquire("a")
+        self.assertEqual(limiter.prune(), 0)
+        self.clock.now += 6
+        self.assertEqual(limiter.prune(), 1)
+        off = RateLimiter(self.path, per_minute=0, token_quota=0)
+        self.assertFalse(off.enabled)
+        for _ in range(50):
+            off.acquire("a")
+
+
+class TestEndpoint(unittest.TestCase):
+
+    def test_429_with_retry_after_per_client(self):
+        from fastapi.testclient import TestClient
+        import main
+
+        async def fake_pipeline(req, role_context, github_context, llm, *args, **kwargs):
+            await llm("prompt")
+            return dict(MOCK_ROADMAP_RESPONSE)
+
+        def fake_call_llm(prompt, schema=None, cancel_event=None, on_usage=None, deadline=None):
+            on_usage({"prompt_tokens": 1200, "output_tokens": 300})
+            return {}
+
+        limiter = RateLimiter(":memory:", per_minute=1, burst=1, token_quota=10_000)
+        client = TestClient(main.app)
+        body = {"resume_text": "Python developer", "dream_role": "ML Engineer"}
+        with patch.object(main, "rate_limiter", limiter), \
+                patch.object(main, "run_roadmap_pipeline", fake_pipeline), \
+                patch.object(main, "call_llm", fake_call_llm):
+            self.assertEqual(client.post("/generate-roadmap", json=body).status_code, 200)
+            res = client.post("/generate-roadmap", json=body)
+            self.assertEqual(res.status_code, 429)
+            self.assertEqual(res.headers["retry-after"], "60")
+            self.assertEqual(res.json()["limit"], "requests")
+            keyed = client.post("/generate-roadmap", json=body, headers={"X-API-Key": "k1"})
+            self.assertEqual(keyed.status_code, 200)
+        self.assertEqual(limiter.status("key:k1")["tokens_left"], 10_000 - 1500)
+
+
+if __name__ == "__main__":
+    unittest.main()
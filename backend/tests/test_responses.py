@@ -0,0 +1,178 @@
+"""
+Unit tests for responses.py
+
+Covers:
+  - Accept-Encoding negotiation (q=0, size threshold, brotli availability)
+  - Pre-serialized model responses: gzip for large bodies, identity for small
+  - /generate-roadmap validates the roadmap exactly once
+  - Cached bodies: strong ETags per encoding, If-None-Match → 304, refresh
+    when the sample resume file or the role catalog changes
+"""
+import copy
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from starlette.requests import Request
+
+import responses
+from models import RoadmapResponse
+from mock_data import MOCK_ROADMAP_RESPONSE
+from normalizer import post_process_roadmap
+from rate_limit import RateLimiter
+
+
+def _request(accept_encoding: str | None) -> Request:
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding is not None else []
+    return Request({"type": "http", "headers": headers})
+
+
+def _roadmap() -> dict:
+    return post_process_roadmap(copy.deepcopy(MOCK_ROADMAP_RESPONSE), "ML Engineer")
+
+
+class TestNegotiation(unittest.TestCase):
+
+    def test_small_or_unaccepted_bodies_are_not_compressed(self):
+        self.assertIsNone(responses.negotiate_encoding("gzip", 10))
+        self.assertIsNone(responses.negotiate_encoding("", 10_000))
+        self.assertIsNone(responses.negotiate_encoding("identity", 10_000))
+        self.assertIsNone(responses.negotiate_encoding("gzip;q=0", 10_000))
+
+    def test_prefers_brotli_only_when_installed(self):
+        with patch.object(responses, "brotli", None):
+            self.assertEqual(responses.negotiate_encoding("br, gzip", 10_000), "gzip")
+            self.assertIsNone(responses.negotiate_encoding("br", 10_000))
+        with patch.object(responses, "brotli", object()):
+            self.assertEqual(responses.negotiate_encoding("gzip, br;q=0.9", 10_000), "br")
+        self.assertEqual(responses.negotiate_encoding("*", 10_000), "gzip")
+
+
+class TestModelResponse(unittest.TestCase):
+
+    def test_large_payload_is_gzipped(self):
+        model = responses.validate(RoadmapResponse, _roadmap())
+        with patch.object(responses, "brotli", None):
+            res = responses.model_response(model, _request("gzip, deflate"))
+        self.assertEqual(res.headers["content-encoding"], "gzip")
+        self.assertEqual(res.headers["vary"], "Accept-Encoding")
+        self.assertEqual(json.loads(gzip.decompress(res.body)), model.model_dump(mode="json"))
+
+    def test_identity_without_accept_encoding(self):
+        model = responses.validate(RoadmapResponse, _roadmap())
+        res = responses.model_response(model, _request(None))
+        self.assertNotIn("content-encoding", res.headers)
+        self.assertEqual(res.media_type, "application/json")
+        self.assertEqual(json.loads(res.body)["reasoning"], model.reasoning)
+
+
+class TestEndpoint(unittest.TestCase):
+
+    def test_generate_roadmap_validates_once(self):
+        from fastapi.testclient import TestClient
+        import main
+
+        roadmap = _roadmap()
+
+        async def fake_pipeline(*args, **kwargs):
+            return copy.deepcopy(roadmap)
+
+        import fastapi.routing
+
+        client = TestClient(main.app)
+        with patch.object(main, "run_roadmap_pipeline", fake_pipeline), \
+                patch.object(main, "rate_limiter", RateLimiter(":memory:")), \
+                patch("pipeline.validate", wraps=responses.validate) as validate, \
+                patch.object(fastapi.routing, "serialize_response", wraps=fastapi.routing.serialize_response) as reserialize:
+            res = client.post(
+                "/generate-roadmap",
+                json={"resume_text": "Python developer", "dream_role": "ML Engineer"},
+                headers={"Accept-Encoding": "gzip"},
+            )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.headers["content-encoding"], "gzip")
+        self.assertEqual(len(res.json()["roadmap"]["days"]), len(roadmap["roadmap"]["days"]))
+        self.assertEqual(validate.call_count, 1)
+        reserialize.assert_not_called()
+
+
+class TestCachedBody(unittest.TestCase):
+
+    def test_etags_are_strong_and_per_encoding(self):
+        big = responses.CachedBody({"roles": ["Role %d" % i for i in range(200)]})
+        self.assertEqual(big.etag, responses.CachedBody({"roles": ["Role %d" % i for i in range(200)]}).etag)
+        body, etag = big.variant("gzip")
+        self.assertNotEqual(etag, big.etag)
+        self.assertFalse(etag.startswith("W/"))
+        self.assertEqual(gzip.decompress(body), big.body)
+        small = responses.CachedBody({"roles": []})
+        self.assertEqual(small.variant("gzip"), (small.body, small.etag))
+
+    def test_if_none_match(self):
+        self.assertTrue(responses.etag_matches('"a", "b"', '"b"'))
+        self.assertTrue(responses.etag_matches('W/"b"', '"b"'))
+        self.assertTrue(responses.etag_matches("*", '"b"'))
+        self.assertFalse(responses.etag_matches('"a"', '"b"'))
+        self.assertFalse(responses.etag_matches("", '"b"'))
+
+    def test_body_cache_is_scoped(self):
+        cache, scope = responses.BodyCache(size=1), object()
+        first = cache.get("k", lambda: {"v": 1}, scope=scope)
+        self.assertIs(cache.get("k", lambda: {"v": 2}, scope=scope), first)
+        self.assertIsNot(cache.get("k", lambda: {"v": 3}, scope=object()), first)
+
+
+class TestCachedEndpoints(unittest.TestCase):
+
+    def setUp(self):
+        from fastapi.testclient import TestClient
+        import main
+
+        self.main = main
+        self.client = TestClient(main.app)
+
+    def test_sample_resume_revalidates_and_refreshes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "sample_resume.txt"
+            path.write_text("Jane Doe\nPython", encoding="utf-8")
+            body = responses.FileBody(path, lambda text: {"resume_text": text or ""})
+            with patch.object(self.main, "sample_resume", body):
+                res = self.client.get("/sample-resume")
+                self.assertEqual(res.json(), {"resume_text": "Jane Doe\nPython"})
+                self.assertIn("max-age=", res.headers["cache-control"])
+                etag = res.headers["etag"]
+
+                res = self.client.get("/sample-resume", headers={"If-None-Match": etag})
+                self.assertEqual(res.status_code, 304)
+                self.assertEqual(res.content, b"")
+                self.assertEqual(res.headers["etag"], etag)
+
+                path.write_text("Jane Doe\nPython, SQL", encoding="utf-8")
+                res = self.client.get("/sample-resume", headers={"If-None-Match": etag})
+                self.assertEqual(res.status_code, 200)
+                self.assertNotEqual(res.headers["etag"], etag)
+                self.assertEqual(res.json()["resume_text"], "Jane Doe\nPython, SQL")
+
+    def test_roles_revalidate_until_catalog_changes(self):
+        from role_registry import RoleRegistry
+
+        with patch.dict(self.main.state, {"roles": RoleRegistry.from_dict({"ML Engineer": {}})}):
+            etag = self.client.get("/roles").headers["etag"]
+            self.assertEqual(self.client.get("/roles", headers={"If-None-Match": etag}).status_code, 304)
+            # A different page is a different body
+            self.assertNotEqual(self.client.get("/roles", params={"offset": 1}).headers["etag"], etag)
+
+            self.main._on_roles_reload(RoleRegistry.from_dict({"ML Engineer": {}, "Data Analyst": {}}), {"Data Analyst"})
+            res = self.client.get("/roles", headers={"If-None-Match": etag})
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(res.json()["roles"], ["ML Engineer", "Data Analyst"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Unit tests for resume_index.py
+
+Covers:
+  - Fingerprints ignore contact details and survive small edits
+  - Lookup is scoped to (dream_role, GitHub context) and thresholded
+  - LRU capacity and per-role invalidation
+  - run_roadmap_pipeline skips Call 1 for a near-duplicate resume
+  - A reuse hit whose Call 2 fails still gets a project and finishes its job
+"""
+import asyncio
+import copy
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main
+import pipeline
+from llm_schemas import call_type
+from mock_data import MOCK_ROADMAP_RESPONSE
+from models import RoadmapRequest
+from resume_index import ResumeIndex, fingerprint, jaccard, resume_index
+
+SAMPLE = (Path(__file__).parent.parent / "data" / "sample_resume.txt").read_text(encoding="utf-8")
+EDITED = (
+    SAMPLE.replace("John Doe", "Priya Raman")
+    .replace("john.doe@university.edu", "priya.r@college.edu")
+    .replace("GPA: 3.4/4.0", "GPA: 3.8/4.0")
+)
+OTHER = "Senior Java engineer. Spring Boot, Kafka, microservices, Oracle. Led payments platform migration."
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def test_contact_details_are_ignored(self):
+        a = fingerprint("Jane Roe\njane@x.edu | +1 (555) 123-4567\nBuilt a REST API in Flask")
+        b = fingerprint("Jane Roe\nroe.j@y.com | 555 987 6543\nBuilt a REST API in Flask")
+        self.assertEqual(a, b)
+
+    def test_small_edits_stay_similar(self):
+        self.assertGreater(jaccard(fingerprint(SAMPLE).shingles, fingerprint(EDITED).shingles), 0.9)
+        self.assertLess(jaccard(fingerprint(SAMPLE).shingles, fingerprint(OTHER).shingles), 0.1)
+
+    def test_empty_text_is_never_indexed(self):
+        index = ResumeIndex()
+        index.add("ML Engineer", fingerprint(""), {"reasoning": "x"})
+        self.assertEqual(len(index), 0)
+        self.assertIsNone(index.lookup("ML Engineer", fingerprint("")))
+
+
+class TestResumeIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ResumeIndex(threshold=0.85, capacity=2)
+        self.index.add("ML Engineer", fingerprint(SAMPLE), {"reasoning": "sample", "flagship_project": {"title": "x"}})
+
+    def test_near_duplicate_hit_returns_copy_of_reused_sections(self):
+        hit = self.index.lookup("ML Engineer", fingerprint(EDITED))
+        self.assertIsNotNone(hit)
+        sections, similarity = hit
+        self.assertEqual(sections, {"reasoning": "sample"})
+        self.assertGreaterEqual(similarity, 0.85)
+        sections["reasoning"] = "mutated"
+        self.assertEqual(self.index.lookup("ML Engineer", fingerprint(EDITED))[0]["reasoning"], "sample")
+
+    def test_scoped_by_role_context_and_threshold(self):
+        self.assertIsNone(self.index.lookup("Data Analyst", fingerprint(EDITED)))
+        self.assertIsNone(self.index.lookup("ML Engineer", fingerprint(EDITED), context="GitHub: 12 repos"))
+        self.assertIsNone(self.index.lookup("ML Engineer", fingerprint(OTHER)))
+
+    def test_capacity_and_invalidation(self):
+        self.index.add("ML Engineer", fingerprint(OTHER), {"reasoning": "other"})
+        self.index.add("ML Engineer", fingerprint(OTHER + " Kubernetes on-call rotation."), {"reasoning": "other2"})
+        self.assertEqual(len(self.index), 2)
+        self.assertIsNone(self.index.lookup("ML Engineer", fingerprint(SAMPLE)))  # evicted
+
+        self.index.add("Data Analyst", fingerprint(SAMPLE), {"reasoning": "analyst"})
+        self.index.invalidate("ML Engineer")
+        self.assertEqual(len(self.index), 1)
+        self.assertIsNotNone(self.index.lookup("Data Analyst", fingerprint(EDITED)))
+
+
+class TestPipelineReuse(unittest.TestCase):
+
+    def setUp(self):
+        resume_index.invalidate()
+
+    def tearDown(self):
+        resume_index.invalidate()
+
+    def test_second_near_duplicate_skips_call_1(self):
+        calls = []
+
+        async def llm(prompt, schema=None):
+            calls.append(call_type(schema))
+            if call_type(schema) == "project":
+                return {"title": f"Project {len(calls)}", "description": "d"}
+            return copy.deepcopy(MOCK_ROADMAP_RESPONSE)
+
+        async def run(text):
+            req = RoadmapRequest(resume_text=text, dream_role="ML Engineer")
+            return await pipeline.run_roadmap_pipeline(req, "", "", llm)
+
+        with patch.object(pipeline, "RESUME_REUSE", True), patch.object(pipeline, "ROADMAP_MODE", "single"):
+            first = asyncio.run(run(SAMPLE))
+            second = asyncio.run(run(EDITED))
+        self.assertEqual(calls, ["roadmap", "project", "project"])
+        self.assertEqual(second["gap_analysis"], first["gap_analysis"])
+        self.assertEqual(second["flagship_project"]["title"], "Project 3")
+
+    def test_reuse_hit_with_call_2_failure(self):
+        async def llm(prompt, schema=None):
+            return copy.deepcopy(MOCK_ROADMAP_RESPONSE) if call_type(schema) == "roadmap" else None
+
+        async def run(text):
+            sections = {}
+            job = {
+                "id": "job-1", "priority": 0, "client_id": "c",
+                "payload": {"resume_text": text, "dream_role": "ML Engineer"},
+            }
+            response = await main._run_roadmap_job(job, lambda name, value: sections.update({name: value}))
+            return response, sections
+
+        with patch.object(pipeline, "RESUME_REUSE", True), patch.object(pipeline, "ROADMAP_MODE", "single"), \
+                patch.object(main, "_scheduled_llm", lambda *a, **kw: llm), \
+                patch.object(main, "_store_roadmap") as store, patch.object(main, "progress_store", MagicMock()):
+            asyncio.run(run(SAMPLE))
+            response, sections = asyncio.run(run(EDITED))
+        self.assertEqual(store.call_count, 2)
+        self.assertTrue(response["flagship_project"]["title"])
+        self.assertEqual(sections["flagship_project"], response["flagship_project"])
+
+    def test_mock_fallback_is_not_indexed(self):
+        async def llm(prompt, schema=None):
+            return None
+
+        req = RoadmapRequest(resume_text=SAMPLE, dream_role="ML Engineer")
+        with patch.object(pipeline, "RESUME_REUSE", True):
+            asyncio.run(pipeline.run_roadmap_pipeline(req, "", "", llm))
+        self.assertEqual(len(resume_index), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
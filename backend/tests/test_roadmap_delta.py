@@ -0,0 +1,171 @@
+"""
+Unit tests for roadmap_delta.py and delta responses on /adapt-roadmap
+
+Covers:
+  - Adaptations merge into the stored roadmap by day / week
+  - JSON Patch round trip, pointer escaping, list growth and shrinkage
+  - Delta mode: a small change gives a small patch that reproduces the
+    server's merged roadmap; stale base versions get 409
+  - A failed LLM call returns the mock as a preview, never stored (delta → 503)
+"""
+import copy
+import json
+import unittest
+from unittest.mock import patch
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main
+from mock_data import MOCK_ADAPT_RESPONSE, MOCK_ROADMAP_RESPONSE
+from normalizer import post_process_roadmap
+from rate_limit import RateLimiter
+from roadmap_delta import apply_patch, make_patch, merge_adaptation
+
+ROADMAP = post_process_roadmap(copy.deepcopy(MOCK_ROADMAP_RESPONSE), "ML Engineer")
+
+
+def _adaptation(days: dict[int, str], first_day: int | None = None) -> dict:
+    """An AdaptResponse dict re-planning `days` (day → new objective), resending every day from `first_day`."""
+    by_day = {d["day"]: d for d in ROADMAP["roadmap"]["days"]}
+    first_day = first_day or min(days)
+    return {
+        "adaptation_reasoning": "Compressed the missed week.",
+        "adapted_roadmap": {
+            "days": [{**d, "objective": days.get(n, d["objective"])} for n, d in by_day.items() if n >= first_day],
+            "weekly_milestones": [],
+        },
+        "adapted_project": {"changes": "Smaller scope.", "weekly_features": []},
+        "motivation": "Keep going!",
+    }
+
+
+class TestMerge(unittest.TestCase):
+
+    def test_adapted_days_replace_by_day_number(self):
+        adaptation = _adaptation({15: "Crash course", 16: "Evaluation"})
+        adaptation["adapted_roadmap"]["weekly_milestones"] = [{"week": 3, "milestone": "Recovered", "skills_gained": []}]
+        merged = merge_adaptation(ROADMAP, adaptation)
+        days = merged["roadmap"]["days"]
+        self.assertEqual([d["day"] for d in days], [d["day"] for d in ROADMAP["roadmap"]["days"]])
+        self.assertEqual(days[14]["objective"], "Crash course")
+        self.assertEqual(days[0], ROADMAP["roadmap"]["days"][0])
+        self.assertEqual([m["milestone"] for m in merged["roadmap"]["weekly_milestones"]][2], "Recovered")
+        self.assertEqual(len(merged["roadmap"]["weekly_milestones"]), len(ROADMAP["roadmap"]["weekly_milestones"]))
+        self.assertNotEqual(ROADMAP["roadmap"]["days"][14]["objective"], "Crash course")   # input untouched
+
+    def test_out_of_range_and_duplicate_days_dropped(self):
+        adaptation = _adaptation({25: "First"}, first_day=25)
+        day = adaptation["adapted_roadmap"]["days"][0]
+        adaptation["adapted_roadmap"]["days"] += [
+            {**day, "day": 0},                 # DayPlan default for a missing number
+            {**day, "day": 31},                # renumbered past the plan
+            {**day, "objective": "Second"},    # day 25 again
+            {k: v for k, v in day.items() if k != "day"},
+        ]
+        adaptation["adapted_roadmap"]["weekly_milestones"] = [{"week": 5, "milestone": "x", "skills_gained": []}]
+        merged = merge_adaptation(ROADMAP, adaptation)
+        days = merged["roadmap"]["days"]
+        self.assertEqual([d["day"] for d in days], list(range(1, 31)))
+        self.assertEqual(days[24]["objective"], "First")
+        self.assertEqual([m["week"] for m in merged["roadmap"]["weekly_milestones"]], [1, 2, 3, 4])
+
+
+class TestPatch(unittest.TestCase):
+
+    def test_round_trip(self):
+        old = {"a": 1, "b/c": [1, 2, 3], "d": {"x": "y"}, "gone": True}
+        new = {"a": 2, "b/c": [1, 5], "d": {"x": "y", "z": [0]}, "e~": None}
+        ops = make_patch(old, new)
+        self.assertEqual(apply_patch(old, ops), new)
+        self.assertIn({"op": "add", "path": "/e~0", "value": None}, ops)
+        self.assertIn({"op": "replace", "path": "/b~1c", "value": [1, 5]}, ops)     # smaller than two ops
+        self.assertEqual(make_patch(new, new), [])
+        self.assertEqual(apply_patch(old, make_patch(old, [1, 2])), [1, 2])
+
+    def test_invalid_paths(self):
+        with self.assertRaises(ValueError):
+            apply_patch([1], [{"op": "remove", "path": "/3"}])
+        with self.assertRaises(ValueError):
+            apply_patch({}, [{"op": "replace", "path": "/missing", "value": 1}])
+
+    def test_one_field_change_is_one_op(self):
+        merged = merge_adaptation(ROADMAP, _adaptation({20: "Flagship kickoff"}))
+        self.assertEqual(make_patch(ROADMAP, merged),
+                         [{"op": "replace", "path": "/roadmap/days/19/objective", "value": "Flagship kickoff"}])
+
+    def test_rewritten_days_are_replaced_whole(self):
+        merged = merge_adaptation(ROADMAP, MOCK_ADAPT_RESPONSE)
+        ops = make_patch(ROADMAP, merged)
+        self.assertEqual(apply_patch(ROADMAP, ops), merged)
+        self.assertIn("/roadmap/days/14", [op["path"] for op in ops])
+        self.assertLess(len(json.dumps(ops)), 1.1 * len(json.dumps(MOCK_ADAPT_RESPONSE)))
+
+
+class TestDeltaEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        from fastapi.testclient import TestClient
+
+        self.client = TestClient(main.app)
+        self.state = patch.dict(main.state, {"last_roadmap": copy.deepcopy(ROADMAP), "roadmap_version": 7})
+        self.state.start()
+        self.limiter = patch.object(main, "rate_limiter", RateLimiter(":memory:"))
+        self.limiter.start()
+
+    def tearDown(self):
+        self.limiter.stop()
+        self.state.stop()
+
+    def _adapt(self, adaptation: dict, **body):
+        async def llm(prompt, schema=None):
+            return adaptation
+
+        with patch.object(main, "_scheduled_llm", lambda *a, **kw: llm):
+            return self.client.post("/adapt-roadmap", json={"days_completed": 14, "days_missed": 3, **body})
+
+    def test_delta_reproduces_the_server_roadmap(self):
+        # Like a real adaptation: every remaining day comes back, two of them changed
+        res = self._adapt(_adaptation({15: "Crash course", 16: "Evaluation"}, first_day=15), delta=True, base_version=7)
+        self.assertEqual(res.status_code, 200)
+        delta = res.json()
+        self.assertEqual((delta["base_version"], delta["version"]), (7, 8))
+        self.assertEqual(res.headers["x-roadmap-version"], "8")
+        self.assertEqual(len(delta["patch"]), 2)
+        self.assertEqual(delta["project_changes"], "Smaller scope.")
+
+        snapshot = self.client.get("/roadmap").json()
+        self.assertEqual(snapshot["version"], 8)
+        client_copy = json.loads(json.dumps(main.validate(main.RoadmapResponse, ROADMAP).model_dump()))
+        self.assertEqual(apply_patch(client_copy, delta["patch"]), snapshot["roadmap"])
+
+        full = self._adapt(_adaptation({15: "Crash course", 16: "Evaluation"}, first_day=15))
+        self.assertGreater(len(full.content), 5 * len(res.content))
+        self.assertEqual(full.headers["x-roadmap-version"], "9")
+
+    def test_stale_base_version_is_rejected(self):
+        res = self._adapt(_adaptation({15: "Crash course"}), delta=True, base_version=3)
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(res.json()["version"], 7)
+        self.assertEqual(main.state["roadmap_version"], 7)
+
+    def test_full_mode_still_returns_the_adaptation(self):
+        res = self._adapt(_adaptation({15: "Crash course"}))
+        self.assertEqual(res.json()["adapted_roadmap"]["days"][0]["objective"], "Crash course")
+        self.assertEqual(main.state["last_roadmap"]["roadmap"]["days"][14]["objective"], "Crash course")
+
+    def test_llm_failure_is_not_stored(self):
+        before = self.client.get("/roadmap").json()
+        res = self._adapt(None)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["adaptation_reasoning"], MOCK_ADAPT_RESPONSE["adaptation_reasoning"])
+        self.assertNotIn("x-roadmap-version", res.headers)
+        self.assertEqual(self._adapt(None, delta=True, base_version=7).status_code, 503)
+
+        after = self.client.get("/roadmap").json()
+        self.assertEqual(after["version"], 7)
+        self.assertEqual(after["roadmap"], before["roadmap"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,239 @@
+"""
+Unit tests for role_registry.py
+
+Covers:
+  - Title normalization (seniority, abbreviations)
+  - Fuzzy resolution: aliases, abbreviations, near-misses, custom roles
+  - Lazy entry loading with index-only fields stripped
+  - roles.json → SQLite import only when the file changes
+  - Paged, filtered search and the /roles endpoint
+  - resolve_role rewrites free-text dream roles before the pipeline runs
+  - Hot reload: versioned snapshots, changed-role detection, cache invalidation
+"""
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pipeline
+from models import RoadmapRequest
+from resume_index import resume_index, fingerprint
+from role_registry import CatalogWatcher, RoleRegistry, catalog_version, changed_roles, import_catalog, normalize_title
+
+ROLES_JSON = Path(__file__).parent.parent / "data" / "roles.json"
+ROLES = json.loads(ROLES_JSON.read_text(encoding="utf-8"))
+
+
+class TestNormalize(unittest.TestCase):
+
+    def test_seniority_and_abbreviations(self):
+        self.assertEqual(normalize_title("Sr. Backend Dev"), "backend developer")
+        self.assertEqual(normalize_title("ml eng II"), "machine learning engineer")
+        self.assertEqual(normalize_title("Front End Developer"), "frontend developer")
+
+
+class TestResolve(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.roles = RoleRegistry.from_dict(ROLES)
+
+    def test_free_text_titles(self):
+        cases = {
+            "ml eng": "ML Engineer",
+            "Sr. Backend Dev": "Backend Developer",
+            "Junior full-stack dev": "Full Stack Developer",
+            "SRE": "DevOps Engineer",
+            "NLP engineer": "AI/NLP Engineer",
+            "security analyst": "Cybersecurity Analyst",
+            "frontend": "Frontend Developer",
+            "Data Analyst": "Data Analyst",
+        }
+        for title, expected in cases.items():
+            self.assertEqual(self.roles.resolve(title), expected, title)
+
+    def test_generic_words_alone_do_not_match(self):
+        # "developer" is shared with every developer role — not evidence
+        self.assertIsNone(self.roles.resolve("Rust developer"))
+        self.assertIsNone(self.roles.resolve("Astronaut"))
+        self.assertIsNone(self.roles.resolve(""))
+
+    def test_resolution_is_sub_millisecond(self):
+        started = time.perf_counter()
+        for _ in range(200):
+            self.roles.match("Senior Machine Learnin Engineer")
+        self.assertLess((time.perf_counter() - started) / 200, 0.001)
+
+
+class TestStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_path = Path(self.tmp.name) / "roles.json"
+        self.db_path = os.path.join(self.tmp.name, "roles.db")
+        self.json_path.write_text(json.dumps(ROLES), encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_entries_are_lazy_and_stripped(self):
+        roles = RoleRegistry.open(self.json_path, self.db_path)
+        self.assertEqual(len(roles), len(ROLES))
+        self.assertEqual(len(roles._cache), 0)
+        entry = roles["ML Engineer"]
+        self.assertNotIn("aliases", entry)
+        self.assertNotIn("category", entry)
+        self.assertEqual(entry["core_technical"], ROLES["ML Engineer"]["core_technical"])
+        self.assertIsNone(roles.get("Astronaut"))
+        self.assertEqual(list(roles._cache), ["ML Engineer"])
+
+    def test_import_only_when_changed(self):
+        self.assertTrue(import_catalog(self.json_path, self.db_path, "v1"))
+        self.assertFalse(import_catalog(self.json_path, self.db_path, "v1"))
+        self.json_path.write_text(json.dumps({"Astronaut": {"core_technical": ["Orbital mechanics"]}}))
+        self.assertTrue(import_catalog(self.json_path, self.db_path, "v2"))
+        self.assertEqual(list(RoleRegistry(self.db_path)), ["Astronaut"])
+
+    def test_sqlite_catalog_without_json(self):
+        RoleRegistry.open(self.json_path, self.db_path)
+        roles = RoleRegistry.open(Path(self.tmp.name) / "missing.json", self.db_path)
+        self.assertIn("DevOps Engineer", roles)
+
+
+class TestSearch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.roles = RoleRegistry.from_dict(ROLES)
+
+    def test_paging_and_category(self):
+        names, total = self.roles.search(offset=2, limit=3)
+        self.assertEqual(total, len(ROLES))
+        self.assertEqual(names, list(ROLES)[2:5])
+        names, total = self.roles.search(category="data & ai")
+        self.assertEqual(names, ["ML Engineer", "Data Analyst", "AI/NLP Engineer"])
+
+    def test_query_ranks_best_match_first(self):
+        names, total = self.roles.search("devops")
+        self.assertEqual(names[0], "DevOps Engineer")
+        self.assertEqual(total, len(names))
+
+    def test_roles_endpoint(self):
+        from fastapi.testclient import TestClient
+        import main
+
+        with patch.dict(main.state, {"roles": self.roles}):
+            client = TestClient(main.app)
+            body = client.get("/roles", params={"q": "ml eng", "limit": 1}).json()
+            self.assertEqual(body["roles"], ["ML Engineer"])
+            self.assertEqual(body["limit"], 1)
+            self.assertIn("Security", body["categories"])
+            self.assertEqual(client.get("/roles").json()["roles"], list(ROLES))
+            self.assertEqual(client.get("/roles", params={"limit": 0}).status_code, 422)
+
+
+class TestResolveRequest(unittest.TestCase):
+
+    def test_free_text_role_is_rewritten(self):
+        roles = RoleRegistry.from_dict(ROLES)
+        req = pipeline.resolve_role(roles, RoadmapRequest(resume_text="x", dream_role="Sr. Backend Dev"))
+        self.assertEqual(req.dream_role, "Backend Developer")
+        custom = RoadmapRequest(resume_text="x", dream_role="Astronaut")
+        self.assertIs(pipeline.resolve_role(roles, custom), custom)
+
+
+class TestHotReload(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_path = Path(self.tmp.name) / "roles.json"
+        self.db_path = os.path.join(self.tmp.name, "roles.db")
+        self._write(ROLES)
+        self.roles = RoleRegistry.open(self.json_path, self.db_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, roles: dict) -> None:
+        self.json_path.write_text(json.dumps(roles), encoding="utf-8")
+        stat = self.json_path.stat()
+        os.utime(self.json_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    def _edited(self) -> dict:
+        roles = json.loads(json.dumps(ROLES))
+        roles["ML Engineer"]["tools"].append("Ray")
+        roles["Data Analyst"]["aliases"].append("Reporting Analyst")     # index-only: not a content change
+        del roles["Cybersecurity Analyst"]
+        return roles
+
+    def test_reload_reports_only_changed_entries(self):
+        reloads = []
+        watcher = CatalogWatcher(self.roles, self.json_path, on_reload=lambda r, changed: reloads.append(changed))
+        self.assertIsNone(watcher.check())
+
+        self._write(self._edited())
+        self.assertEqual(watcher.check(), {"ML Engineer", "Cybersecurity Analyst"})
+        self.assertEqual(watcher.registry.version, self.roles.version + 1)
+        self.assertEqual(watcher.registry.resolve("Reporting Analyst"), "Data Analyst")
+        self.assertEqual(len(reloads), 1)
+        self.assertIsNone(watcher.check())
+
+    def test_old_snapshot_stays_consistent(self):
+        new = self._edited()
+        self._write(new)
+        CatalogWatcher(self.roles, self.json_path).check()
+        # A request that started before the reload still sees the old catalog
+        self.assertNotIn("Ray", self.roles["ML Engineer"]["tools"])
+        self.assertIn("Cybersecurity Analyst", self.roles)
+        self.assertEqual(self.roles["Cybersecurity Analyst"]["core_technical"],
+                         ROLES["Cybersecurity Analyst"]["core_technical"])
+        self.assertEqual(changed_roles(self.roles, RoleRegistry(self.db_path)), {"ML Engineer", "Cybersecurity Analyst"})
+
+    def test_invalid_json_keeps_catalog(self):
+        watcher = CatalogWatcher(self.roles, self.json_path)
+        self.json_path.write_text('{"ML Engineer": ', encoding="utf-8")
+        self.assertIsNone(watcher.check())
+        self.assertIs(watcher.registry, self.roles)
+        self._write(self._edited())
+        self.assertIsNotNone(watcher.check())
+
+    def test_other_worker_picks_up_import(self):
+        other = CatalogWatcher(RoleRegistry(self.db_path), Path(self.tmp.name) / "elsewhere.json")
+        self._write(self._edited())
+        CatalogWatcher(self.roles, self.json_path).check()
+        self.assertEqual(other.check(), {"ML Engineer", "Cybersecurity Analyst"})
+        self.assertEqual(other.registry.version, catalog_version(self.db_path))
+
+    def test_old_layout_is_rebuilt(self):
+        import sqlite3
+        path = os.path.join(self.tmp.name, "old.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE roles (position INTEGER, name TEXT PRIMARY KEY, entry TEXT)")
+        conn.commit()
+        conn.close()
+        self.assertIn("ML Engineer", RoleRegistry.open(self.json_path, path))
+
+    def test_app_invalidates_only_changed_roles(self):
+        import main
+
+        resume_index.invalidate()
+        fp = fingerprint("Python developer with Flask and SQL experience")
+        for role in ("ML Engineer", "Data Analyst"):
+            resume_index.add(role, fp, {"reasoning": role})
+        try:
+            with patch.dict(main.state, {"roles": self.roles}):
+                main._on_roles_reload(RoleRegistry(self.db_path), {"ML Engineer"})
+            self.assertIsNone(resume_index.lookup("ML Engineer", fp))
+            self.assertIsNotNone(resume_index.lookup("Data Analyst", fp))
+        finally:
+            resume_index.invalidate()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+"""
+Unit tests for scheduler.py
+
+Covers:
+  - Concurrency limit
+  - Priority ordering (adapt > interactive > batch)
+  - Per-client round-robin fairness
+  - Queue-full rejection with Retry-After hint
+  - Dropping queued jobs whose client disconnected
+  - Cancelling a running call when the client disconnects
+  - A cancelled call keeps its slot until its thread returns
+"""
+import asyncio
+import threading
+import time
+import unittest
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scheduler import (
+    LLMScheduler, QueueFullError, RequestDroppedError,
+    PRIORITY_ADAPT, PRIORITY_INTERACTIVE, PRIORITY_BATCH,
+)
+
+
+async def _hold_slot(sched: LLMScheduler, release: asyncio.Event):
+    """Occupy the only slot until `release` is set."""
+    await sched.acquire()
+    await release.wait()
+    sched.release()
+
+
+class TestScheduler(unittest.TestCase):
+
+    def test_limits_concurrency(self):
+        async def scenario():
+            sched = LLMScheduler(concurrency=2, max_queue=10)
+            active, peak = 0, 0
+
+            async def job():
+                nonlocal active, peak
+                await sched.acquire()
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+                sched.release()
+
+            await asyncio.gather(*(job() for _ in range(6)))
+            return peak
+
+        self.assertEqual(asyncio.run(scenario()), 2)
+
+    def test_priority_order(self):
+        async def scenario():
+            sched = LLMScheduler(concurrency=1, max_queue=10)
+            release, order = asyncio.Event(), []
+            holder = asyncio.create_task(_hold_slot(sched, release))
+            await asyncio.sleep(0)
+
+            async def job(name, priority):
+                await sched.acquire(priority, client_id=name)
+                order.append(name)
+                sched.release()
+
+            tasks = [
+                asyncio.create_task(job("batch", PRIORITY_BATCH)),
+                asyncio.create_task(job("interactive", PRIORITY_INTERACTIVE)),
+                asyncio.create_task(job("adapt", PRIORITY_ADAPT)),
+            ]
+            await asyncio.sleep(0.01)
+            release.set()
+            await asyncio.gather(holder, *tasks)
+            return order
+
+        self.assertEqual(asyncio.run(scenario()), ["adapt", "interactive", "batch"])
+
+    def test_clients_are_interleaved(self):
+        async def scenario():
+            sched = LLMScheduler(concurrency=1, max_queue=10)
+            release, order = asyncio.Event(), []
+            holder = asyncio.create_task(_hold_slot(sched, release))
+            await asyncio.sleep(0)
+
+            async def job(client):
+                await sched.acquire(PRIORITY_INTERACTIVE, client_id=client)
+                order.append(client)
+                sched.release()
+
+            # Client "a" floods the queue before "b" shows up
+            tasks = [asyncio.create_task(job("a")) for _ in range(3)]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(job("b")))
+            await asyncio.sleep(0.01)
+            release.set()
+            await asyncio.gather(holder, *tasks)
+            return order
+
+        self.assertEqual(asyncio.run(scenario())[:2], ["a", "b"])
+
+    def test_queue_full_raises(self):
+        async def scenario():
+            sched = LLMScheduler(concurrency=1, max_queue=1)
+            release = asyncio.Event()
+            holder = asyncio.create_task(_hold_slot(sched, release))
+            await asyncio.sleep(0)
+            queued = asyncio.create_task(sched.acquire())
+            await asyncio.sleep(0)
+            try:
+                with self.assertRaises(QueueFullError) as ctx:
+                    await sched.acquire()
+                self.assertGreaterEqual(ctx.exception.retry_after, 1)
+                self.assertEqual(sched.stats()["rejected"], 1)
+            finally:
+                release.set()
+                await holder
+                await queued
+                sched.release()
+
+        asyncio.run(scenario())
+
+    def test_disconnected_client_is_dropped(self):
+        async def scenario():
+            sched = LLMScheduler(concurrency=1, max_queue=5)
+            release = asyncio.Event()
+            holder = asyncio.create_task(_hold_slot(sched, release))
+            await asyncio.sleep(0)
+
+            async def gone():
+                return True
+
+            with self.assertRaises(RequestDroppedError):
+                await sched.acquire(is_disconnected=gone, deadline=None)
+            self.assertEqual(sched.stats()["queue_depth"], 0)
+            self.assertEqual(sched.stats()["dropped"], 1)
+            release.set()
+            await holder
+            self.assertEqual(sched.stats()["running"], 0)
+
+        asyncio.run(scenario())
+
+    def test_disconnect_cancels_running_call(self):
+        async def scenario():
+            sched = LLMScheduler(concurrency=1)
+            cancel = threading.Event()
+
+            def generate():
+                # Stand-in for a streaming generation watching the event
+                for _ in range(200):
+                    if cancel.is_set():
+                        return None
+                    time.sleep(0.01)
+                return "finished"
+
+            async def gone():
+                return True
+
+            with self.assertRaises(RequestDroppedError):
+                await sched.run(generate, is_disconnected=gone, cancel_event=cancel)
+            self.assertTrue(cancel.is_set())
+            self.assertEqual(sched.stats()["running"], 0)
+            self.assertEqual(sched.stats()["cancelled"], 1)
+
+        asyncio.run(scenario())
+
+    def test_cancelled_call_holds_slot_until_thread_returns(self):
+        async def scenario():
+            sched = LLMScheduler(concurrency=1)
+            cancel, in_prefill, prefill_done = threading.Event(), threading.Event(), threading.Event()
+
+            def generate():
+                # Prefill: no chunk yet, so the cancel event isn't seen
+                in_prefill.set()
+                prefill_done.wait(5)
+                return None if cancel.is_set() else "finished"
+
+            call = asyncio.create_task(sched.run(generate, cancel_event=cancel))
+            await asyncio.to_thread(in_prefill.wait, 5)
+            call.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await call
+            self.assertTrue(cancel.is_set())
+
+            started = []
+            waiting = asyncio.create_task(sched.run(lambda: started.append(1)))
+            await asyncio.sleep(0.05)
+            self.assertEqual(sched.stats()["running"], 1)    # still held by the cancelled call
+            self.assertEqual(started, [])
+
+            prefill_done.set()
+            await waiting
+            self.assertEqual(started, [1])
+            self.assertEqual(sched.stats()["running"], 0)
+
+        asyncio.run(scenario())
+
+    def test_run_returns_result(self):
+        sched = LLMScheduler(concurrency=1)
+        self.assertEqual(asyncio.run(sched.run(lambda x: x * 2, 21)), 42)
+
+
+if __name__ == "__main__":
+    unittest.main()
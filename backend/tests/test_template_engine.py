@@ -0,0 +1,154 @@
+"""
+Unit tests for template_engine.py and the overload policy
+
+Covers:
+  - Gap detection from roles.json skills (missing, beginner-level, tools)
+  - A complete, valid 30-day roadmap composed without the LLM
+  - Priority order and the daily hours budget
+  - Baseline overlay: only days on already-known skills are swapped
+  - Pipeline: LLM failure and overload serve the rule-based roadmap
+  - A call queued past its deadline degrades instead of erroring
+"""
+import asyncio
+import copy
+import json
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import baselines
+import main
+import pipeline
+import template_engine
+from mock_data import MOCK_ROADMAP_RESPONSE
+from models import RoadmapRequest, RoadmapResponse
+from normalizer import post_process_roadmap
+from role_registry import RoleRegistry
+from scheduler import LLMScheduler, PRIORITY_INTERACTIVE
+
+DATA = Path(__file__).parent.parent / "data"
+ROLES = RoleRegistry.from_dict(json.loads((DATA / "roles.json").read_text(encoding="utf-8")))
+SAMPLE = (DATA / "sample_resume.txt").read_text(encoding="utf-8")
+ROLE = "Data Analyst"
+
+
+class TestAnalyze(unittest.TestCase):
+
+    def test_gaps_by_tier(self):
+        role = {
+            "core_technical": ["SQL", "PyTorch/TensorFlow"],
+            "supporting_skills": ["Statistics"],
+            "tools": ["Git", "Docker"],
+            "soft_skills": ["Communication"],
+        }
+        skills, gaps = template_engine.analyze("Skills: SQL (beginner), TensorFlow, Git", role)
+        self.assertEqual({s["name"]: s["level"] for s in skills},
+                         {"SQL": "beginner", "PyTorch/TensorFlow": "intermediate", "Git": "intermediate"})
+        self.assertEqual([g["skill"] for g in gaps["critical"]], [])
+        self.assertEqual([g["skill"] for g in gaps["important"]], ["SQL", "Statistics"])
+        self.assertEqual([g["skill"] for g in gaps["nice_to_have"]], ["Docker"])
+
+    def test_unknown_skill_gets_generic_steps(self):
+        steps = template_engine.topic_steps("Underwater basket weaving")
+        self.assertEqual(len(steps), 2)
+        self.assertIn("Underwater basket weaving", steps[0]["objective"])
+        self.assertEqual(template_engine.topic_steps("Docker")[0], template_engine.topic_steps("docker")[0])
+
+
+class TestCompose(unittest.TestCase):
+
+    def test_every_role_composes_a_valid_30_day_plan_quickly(self):
+        for name, role in ROLES.items():
+            started = time.perf_counter()
+            result = template_engine.compose_roadmap(name, SAMPLE, role)
+            self.assertLess(time.perf_counter() - started, 0.1)
+            RoadmapResponse(**post_process_roadmap(result, name))
+            self.assertEqual([d["day"] for d in result["roadmap"]["days"]], list(range(1, 31)))
+            self.assertEqual(len(result["roadmap"]["weekly_milestones"]), 4)
+
+    def test_priority_order_and_hours_budget(self):
+        result = template_engine.compose_roadmap(ROLE, SAMPLE, ROLES[ROLE], daily_hours=2)
+        days = result["roadmap"]["days"]
+        first_critical = result["gap_analysis"]["critical"][0]["skill"]
+        self.assertEqual(result["roadmap"]["weekly_milestones"][0]["skills_gained"][0], first_critical)
+        study = [d for d in days if d["day"] not in template_engine.REVIEW_DAYS + template_engine.CAPSTONE_DAYS]
+        self.assertTrue(all(d["hours"] <= 2 for d in study))
+
+    def test_plan_is_deterministic(self):
+        self.assertEqual(template_engine.compose_roadmap(ROLE, SAMPLE, ROLES[ROLE]),
+                         template_engine.compose_roadmap(ROLE, SAMPLE, ROLES[ROLE]))
+
+
+class TestBaselineOverlay(unittest.TestCase):
+
+    def test_known_skill_days_swapped_for_gaps(self):
+        baseline = post_process_roadmap(copy.deepcopy(MOCK_ROADMAP_RESPONSE), ROLE)
+        days = [{"day": n, "objective": "Python warm-up", "resource": "Docs", "task": "Practice", "hours": 2}
+                for n in range(1, 31)]
+        days[5]["objective"] = "Excel pivot tables"
+        baseline["roadmap"]["days"] = days
+
+        result = template_engine.compose_roadmap(ROLE, SAMPLE, ROLES[ROLE], baseline)
+        objectives = [d["objective"] for d in result["roadmap"]["days"]]
+        self.assertEqual(objectives[5], "Excel pivot tables")          # on a gap: kept
+        self.assertFalse(any(o == "Python warm-up" for o in objectives))
+        self.assertEqual(result["flagship_project"], baseline["flagship_project"])
+
+
+class TestDegradedPipeline(unittest.TestCase):
+
+    def setUp(self):
+        baselines.reset_baselines({})
+
+    def tearDown(self):
+        baselines.reset_baselines()
+
+    def _run(self, llm, overloaded=None, role=ROLES[ROLE]):
+        req = RoadmapRequest(resume_text=SAMPLE, dream_role=ROLE)
+        with patch.object(pipeline, "RESUME_REUSE", False), patch.object(pipeline, "ROADMAP_MODE", "single"):
+            return asyncio.run(pipeline.run_roadmap_pipeline(req, "", "", llm, overloaded=overloaded, role=role))
+
+    def test_llm_failure_serves_template(self):
+        async def llm(prompt, schema=None):
+            return None
+
+        result = self._run(llm)
+        self.assertIn("skill catalog", result["reasoning"])
+        self.assertEqual(result["role_requirements"]["core_technical"], ROLES[ROLE]["core_technical"])
+
+    def test_overload_skips_all_llm_calls(self):
+        async def llm(prompt, schema=None):
+            raise AssertionError("no LLM calls under load")
+
+        result = self._run(llm, overloaded=lambda: True)
+        self.assertIn("skill catalog", result["reasoning"])
+
+    def test_without_role_or_baseline_overload_is_ignored(self):
+        async def llm(prompt, schema=None):
+            return None
+
+        result = self._run(llm, overloaded=lambda: True, role=None)
+        self.assertEqual(result["reasoning"], MOCK_ROADMAP_RESPONSE["reasoning"])
+
+
+class TestQueueDeadline(unittest.TestCase):
+
+    def test_call_queued_past_max_wait_returns_none(self):
+        async def scenario():
+            sched = LLMScheduler(concurrency=1)
+            await sched.acquire()   # the only slot stays busy
+            with patch.object(main, "scheduler", sched):
+                llm = main._scheduled_llm(None, PRIORITY_INTERACTIVE, client_id="t", max_wait=0.05)
+                result = await llm("prompt")
+            sched.release()
+            return result
+
+        self.assertIsNone(asyncio.run(scenario()))
+
+
+if __name__ == "__main__":
+    unittest.main()
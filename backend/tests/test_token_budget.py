@@ -0,0 +1,106 @@
+"""
+Unit tests for token_budget.py
+
+Covers:
+  - Prompt token estimates and calibration from real counts (via call_llm's done chunk)
+  - Output estimates from JSON Schemas
+  - num_ctx / num_predict sizing and the LLM_MAX_CTX cap
+  - Resume condensing when the context would overflow
+"""
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import llm_service
+import token_budget
+from token_budget import (
+    estimate_tokens, observe_prompt_tokens, estimate_output_tokens,
+    size_options, condense_resume,
+)
+from llm_schemas import ROADMAP_SCHEMA, PROJECT_SCHEMA
+
+
+class TestEstimates(unittest.TestCase):
+
+    def setUp(self):
+        token_budget._calibration["ratio"] = 1.0
+
+    def tearDown(self):
+        token_budget._calibration["ratio"] = 1.0
+
+    def test_scales_with_text(self):
+        short = estimate_tokens("Python developer")
+        long = estimate_tokens("Python developer " * 100)
+        self.assertGreater(short, 0)
+        self.assertGreater(long, 50 * short)
+
+    def test_calibration_moves_towards_actual(self):
+        text = "word " * 100
+        before = estimate_tokens(text)
+        for _ in range(50):
+            observe_prompt_tokens(text, before * 2)
+        self.assertAlmostEqual(estimate_tokens(text) / before, 2.0, delta=0.05)
+
+    def test_calibrated_from_streamed_call(self):
+        # Ollama's order: the closing brace in a content chunk, then the counts in the done chunk
+        chunks = [
+            SimpleNamespace(message=SimpleNamespace(content=text), done=False, prompt_eval_count=None)
+            for text in ('{"a": ', '1}')
+        ] + [SimpleNamespace(message=SimpleNamespace(content=""), done=True, prompt_eval_count=400, eval_count=2,
+                             load_duration=0, prompt_eval_duration=10**9, eval_duration=10**8)]
+
+        class Stream(list):
+            def close(self):
+                pass
+
+        prompt = "word " * 100
+        with patch.object(llm_service.get_ollama_client(), "chat", return_value=Stream(chunks)):
+            self.assertEqual(llm_service.call_llm(prompt), {"a": 1})
+        self.assertGreater(token_budget._calibration["ratio"], 1.0)
+
+    def test_output_estimate_uses_cardinality(self):
+        self.assertGreater(estimate_output_tokens(ROADMAP_SCHEMA), 10 * estimate_output_tokens(PROJECT_SCHEMA))
+
+
+class TestSizing(unittest.TestCase):
+
+    def test_small_call_gets_small_context(self):
+        opts = size_options("Design a project.", PROJECT_SCHEMA)
+        self.assertEqual(opts["num_ctx"], token_budget.MIN_CTX)
+        self.assertLess(opts["num_predict"], 2048)
+
+    def test_context_fits_prompt_and_output(self):
+        prompt = "resume line " * 500
+        opts = size_options(prompt, ROADMAP_SCHEMA)
+        self.assertGreaterEqual(opts["num_ctx"], estimate_tokens(prompt) + opts["num_predict"])
+        self.assertEqual(opts["num_ctx"] % token_budget.CTX_STEP, 0)
+
+    @patch("token_budget.MAX_CTX", 4096)
+    def test_capped_at_max_ctx(self):
+        opts = size_options("resume line " * 1000, ROADMAP_SCHEMA)
+        self.assertEqual(opts["num_ctx"], 4096)
+
+
+class TestCondenseResume(unittest.TestCase):
+
+    def test_short_resume_untouched(self):
+        text = "Python\nSQL"
+        self.assertIs(condense_resume(text, 1000), text)
+
+    def test_drops_duplicates_first(self):
+        text = "Built APIs with Flask\n" * 50 + "Python   SQL"
+        condensed = condense_resume(text, 30)
+        self.assertEqual(condensed, "Built APIs with Flask\nPython SQL")
+
+    def test_truncates_to_budget(self):
+        text = "\n".join(f"Project {i}: built a data pipeline" for i in range(200))
+        condensed = condense_resume(text, 100)
+        self.assertLessEqual(estimate_tokens(condensed), 100)
+        self.assertTrue(condensed.startswith("Project 0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Unit tests for tracing.py
+
+Covers:
+  - Span nesting across asyncio tasks and worker threads
+  - No-op spans outside a trace
+  - Server-Timing header and OTLP payload shape
+  - Request middleware (X-Request-ID, Server-Timing)
+"""
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import tracing
+from tracing import start_trace, span, current_span, current_request_id, to_otlp
+
+
+class TestSpans(unittest.TestCase):
+
+    def test_noop_outside_trace(self):
+        with span("orphan") as sp:
+            sp.set(a=1)
+        current_span().set(b=2)
+        self.assertIsNone(current_request_id())
+
+    def test_nesting_across_tasks_and_threads(self):
+        def blocking():
+            with span("thread_work"):
+                current_span().set(cache="miss")
+
+        async def child(name):
+            with span(name):
+                await asyncio.to_thread(blocking)
+
+        async def run():
+            with patch.object(tracing, "TRACE_LOG", False):
+                with start_trace("req", request_id="abc") as trace:
+                    with span("parent") as parent:
+                        await asyncio.gather(child("a"), child("b"))
+            return trace, parent
+
+        trace, parent = asyncio.run(run())
+        by_name = {}
+        for s in trace.spans:
+            by_name.setdefault(s.name, []).append(s)
+        self.assertEqual(trace.request_id, "abc")
+        self.assertEqual(len(by_name["thread_work"]), 2)
+        self.assertEqual({s.parent_id for s in by_name["a"] + by_name["b"]}, {parent.span_id})
+        child_ids = {s.span_id for s in by_name["a"] + by_name["b"]}
+        self.assertEqual({s.parent_id for s in by_name["thread_work"]}, child_ids)
+        self.assertEqual(by_name["thread_work"][0].attrs, {"cache": "miss"})
+
+    def test_error_is_recorded(self):
+        with patch.object(tracing, "TRACE_LOG", False):
+            with start_trace("req") as trace:
+                with self.assertRaises(ValueError):
+                    with span("boom"):
+                        raise ValueError("x")
+        self.assertEqual(trace.spans[0].attrs["error"], "ValueError")
+
+    def test_server_timing_and_otlp(self):
+        with patch.object(tracing, "TRACE_LOG", False):
+            with start_trace("req") as trace:
+                with span("llm.roadmap"):
+                    pass
+                with span("llm.roadmap"):
+                    pass
+        header = trace.server_timing()
+        self.assertEqual(header.count("llm.roadmap;dur="), 1)
+        self.assertIn("total;dur=", header)
+
+        payload = to_otlp(trace)
+        spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        self.assertEqual(len(spans), 3)
+        self.assertTrue(all(s["traceId"] == trace.trace_id for s in spans))
+        self.assertEqual(spans[1]["parentSpanId"], trace.root.span_id)
+
+
+class TestMiddleware(unittest.TestCase):
+
+    def test_headers(self):
+        from fastapi.testclient import TestClient
+        import main
+
+        client = TestClient(main.app)
+        with patch.object(tracing, "TRACE_LOG", False):
+            res = client.get("/roles", headers={"X-Request-ID": "req-42"})
+        self.assertEqual(res.headers["x-request-id"], "req-42")
+        self.assertIn("total;dur=", res.headers["server-timing"])
+
+        self.assertNotIn("server-timing", client.get("/health").headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
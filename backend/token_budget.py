@@ -0,0 +1,138 @@
+"""
+Token estimates and per-call context sizing for Ollama.
+
+No tokenizer is shipped with the model runtime, so prompt size is
+estimated with a word/symbol model calibrated against Llama/Mistral
+SentencePiece tokenizers (~1.3 tokens per word, ~1 per symbol). The
+ratio self-corrects from Ollama's reported `prompt_eval_count`.
+
+Output size is estimated from the call's JSON Schema (llm_schemas.py):
+every key, string and number is costed, and fixed-length arrays
+(30 days, 4 milestones) are multiplied out.
+"""
+import math
+import re
+
+from config import env
+from log_config import get_logger
+
+
+# ── Constants ───────────────────────────────────────────────────
+
+MAX_CTX = int(env("LLM_MAX_CTX", "16384"))        # hard ceiling for num_ctx
+MIN_CTX = 2048
+CTX_STEP = 1024                                         # num_ctx is rounded up to this
+OUTPUT_MARGIN = float(env("LLM_OUTPUT_MARGIN", "1.6"))
+DEFAULT_NUM_PREDICT = 4096                              # calls without a schema
+MIN_NUM_PREDICT = 512
+
+TOKENS_PER_WORD = 1.3
+TOKENS_PER_SYMBOL = 1.0
+STRING_TOKENS = 18        # typical free-text field ("objective": "...")
+NUMBER_TOKENS = 2
+KEY_TOKENS = 4            # "key": plus punctuation
+UNBOUNDED_ITEMS = 5       # assumed length of arrays without maxItems
+CALIBRATION_WEIGHT = 0.1  # EWMA weight of each observed prompt
+
+_WORD_RE = re.compile(r"\w+")
+_SYMBOL_RE = re.compile(r"[^\w\s]")
+
+_calibration = {"ratio": 1.0}
+
+logger = get_logger("tokens")
+
+
+# ── Estimators ──────────────────────────────────────────────────
+
+def _raw_estimate(text: str) -> float:
+    words = len(_WORD_RE.findall(text))
+    symbols = len(_SYMBOL_RE.findall(text))
+    return words * TOKENS_PER_WORD + symbols * TOKENS_PER_SYMBOL
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimated token count of `text` for the local model."""
+    return math.ceil(_raw_estimate(text) * _calibration["ratio"])
+
+
+def observe_prompt_tokens(text: str, actual: int) -> None:
+    """Fold Ollama's real prompt_eval_count into the estimator's ratio."""
+    raw = _raw_estimate(text)
+    if raw <= 0 or actual <= 0:
+        return
+    ratio = _calibration["ratio"]
+    _calibration["ratio"] = ratio + CALIBRATION_WEIGHT * (actual / raw - ratio)
+
+
+def estimate_output_tokens(schema: dict) -> int:
+    """Expected size of a response that fills `schema`."""
+    kind = schema.get("type")
+    if kind == "object":
+        props = schema.get("properties", {})
+        return 2 + sum(KEY_TOKENS + estimate_output_tokens(p) for p in props.values())
+    if kind == "array":
+        items = schema.get("maxItems", UNBOUNDED_ITEMS)
+        return 2 + items * (1 + estimate_output_tokens(schema.get("items", {})))
+    if kind in ("integer", "number", "boolean"):
+        return NUMBER_TOKENS
+    return STRING_TOKENS
+
+
+# ── Sizing ──────────────────────────────────────────────────────
+
+def size_options(prompt: str, schema: dict | None = None) -> dict:
+    """
+    num_ctx / num_predict for one call: room for the prompt plus the expected
+    output (with margin), rounded up and capped at LLM_MAX_CTX.
+    """
+    prompt_tokens = estimate_tokens(prompt)
+    if schema:
+        num_predict = max(MIN_NUM_PREDICT, math.ceil(estimate_output_tokens(schema) * OUTPUT_MARGIN))
+    else:
+        num_predict = DEFAULT_NUM_PREDICT
+
+    needed = prompt_tokens + num_predict
+    num_ctx = min(MAX_CTX, max(MIN_CTX, math.ceil(needed / CTX_STEP) * CTX_STEP))
+    if needed > num_ctx:
+        # Give the output whatever is left; the prompt must not be truncated
+        num_predict = max(MIN_NUM_PREDICT, num_ctx - prompt_tokens)
+        logger.warning("Prompt ~%d tokens leaves only %d for output (LLM_MAX_CTX=%d)",
+                       prompt_tokens, num_predict, MAX_CTX)
+    return {"num_ctx": num_ctx, "num_predict": num_predict}
+
+
+def resume_token_budget(prompt_without_resume: str, schema: dict | None) -> int:
+    """Tokens the resume may use so prompt + expected output fit in LLM_MAX_CTX."""
+    sizing = size_options(prompt_without_resume, schema)
+    return MAX_CTX - estimate_tokens(prompt_without_resume) - sizing["num_predict"]
+
+
+def condense_resume(text: str, max_tokens: int) -> str:
+    """
+    Shrink a resume to `max_tokens`: collapse whitespace, drop duplicate
+    lines, then keep whole lines from the top until the budget is spent.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    lines, seen = [], set()
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if line and line.lower() not in seen:
+            seen.add(line.lower())
+            lines.append(line)
+    condensed = "\n".join(lines)
+    if estimate_tokens(condensed) <= max_tokens:
+        logger.info("Resume condensed to ~%d tokens", estimate_tokens(condensed))
+        return condensed
+
+    kept, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    logger.warning("Resume truncated to ~%d tokens (%d/%d lines) to fit the context window",
+                   used, len(kept), len(lines))
+    return "\n".join(kept)
@@ -0,0 +1,241 @@
+"""
+Lightweight request tracing — spans per pipeline stage, no extra deps.
+
+Features:
+  - One trace per request (request ID from X-Request-ID or generated)
+  - Nested spans via contextvars, so they follow asyncio tasks and
+    asyncio.to_thread workers (LLM calls, PDF extraction, GitHub fetches)
+  - Structured log record per finished trace (career_brain.trace)
+  - Optional export to an OTLP/HTTP collector (OTEL_EXPORTER_OTLP_ENDPOINT)
+  - Server-Timing header value with the per-stage breakdown
+
+Spans opened outside a trace (CLI batch runs, tests) are no-ops.
+"""
+import contextvars
+import functools
+import json
+import logging
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+from config import env
+
+
+# ── Constants ───────────────────────────────────────────────────
+
+TRACE_LOG = env("TRACE_LOG", "true").lower() == "true"
+OTLP_ENDPOINT = env("OTEL_EXPORTER_OTLP_ENDPOINT", "").rstrip("/")
+SERVICE_NAME = "career-brain"
+EXPORT_QUEUE_SIZE = 256
+
+logger = logging.getLogger("career_brain.trace")
+
+_current_trace: contextvars.ContextVar["Trace | None"] = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("span", default=None)
+
+
+# ── Data ────────────────────────────────────────────────────────
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attrs")
+
+    def __init__(self, name: str, parent_id: str | None, attrs: dict):
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attrs = attrs
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict:
+        out = {"name": self.name, "span_id": self.span_id, "duration_ms": round(self.duration_ms, 2)}
+        if self.parent_id:
+            out["parent_id"] = self.parent_id
+        if self.attrs:
+            out["attrs"] = self.attrs
+        return out
+
+
+class _NoopSpan:
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Trace:
+    """All spans recorded for one request (shared by its tasks and threads)."""
+
+    def __init__(self, request_id: str, name: str):
+        self.request_id = request_id
+        self.trace_id = secrets.token_hex(16)
+        self.root = Span(name, None, {})
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: total per stage name, in start order."""
+        totals: dict[str, float] = {}
+        for span in sorted(self.spans, key=lambda s: s.start_ns):
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        entries = [f"{name};dur={ms:.1f}" for name, ms in totals.items()]
+        entries.append(f"total;dur={self.root.duration_ms:.1f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> dict:
+        return {
+            "request_id": self.request_id,
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "duration_ms": round(self.root.duration_ms, 2),
+            "attrs": self.root.attrs,
+            "spans": [s.to_dict() for s in sorted(self.spans, key=lambda s: s.start_ns)],
+        }
+
+
+# ── Public API ──────────────────────────────────────────────────
+
+def new_request_id() -> str:
+    return secrets.token_hex(8)
+
+
+@contextmanager
+def start_trace(name: str, request_id: str | None = None, **attrs):
+    """Open a trace for one request; logs/exports it on exit."""
+    trace = Trace(request_id or new_request_id(), name)
+    trace.root.attrs.update(attrs)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(trace.root)
+    try:
+        yield trace
+    finally:
+        trace.root.end_ns = time.time_ns()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        _emit(trace)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a stage inside the current trace. Yields the span so callers can .set() attributes."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NOOP
+        return
+    parent = _current_span.get()
+    current = Span(name, parent.span_id if parent else None, attrs)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set(error=type(e).__name__)
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        trace.add(current)
+
+
+def traced(name: str):
+    """Decorator form of span() for whole functions."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span():
+    """The innermost open span (or a no-op outside a trace)."""
+    return _current_span.get() or _NOOP
+
+
+def current_request_id() -> str | None:
+    trace = _current_trace.get()
+    return trace.request_id if trace else None
+
+
+# ── Output ──────────────────────────────────────────────────────
+
+def _emit(trace: Trace) -> None:
+    if TRACE_LOG:
+        logger.info("trace %s", trace.root.name, extra={"trace": trace.to_dict()})
+    if OTLP_ENDPOINT:
+        try:
+            _exporter().put_nowait(trace)
+        except queue.Full:
+            pass  # never block a request on the collector
+
+
+def to_otlp(trace: Trace) -> dict:
+    """OTLP/HTTP JSON payload (ExportTraceServiceRequest) for one trace."""
+
+    def attrs(values: dict) -> list[dict]:
+        return [{"key": k, "value": {"stringValue": str(v)}} for k, v in values.items()]
+
+    spans = []
+    for s in [trace.root, *trace.spans]:
+        item = {
+            "traceId": trace.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or s.start_ns),
+            "attributes": attrs({"request_id": trace.request_id, **s.attrs}),
+        }
+        if s.parent_id:
+            item["parentSpanId"] = s.parent_id
+        spans.append(item)
+    return {"resourceSpans": [{
+        "resource": {"attributes": attrs({"service.name": SERVICE_NAME})},
+        "scopeSpans": [{"scope": {"name": "career_brain.tracing"}, "spans": spans}],
+    }]}
+
+
+_export_queue: queue.Queue | None = None
+_export_lock = threading.Lock()
+
+
+def _exporter() -> queue.Queue:
+    """Lazily start the background thread that posts traces to the collector."""
+    global _export_queue
+    with _export_lock:
+        if _export_queue is None:
+            _export_queue = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+            threading.Thread(target=_export_loop, args=(_export_queue,), daemon=True,
+                             name="otlp-exporter").start()
+    return _export_queue
+
+
+def _export_loop(q: queue.Queue) -> None:
+    from urllib.request import urlopen, Request
+
+    url = f"{OTLP_ENDPOINT}/v1/traces"
+    while True:
+        trace = q.get()
+        body = json.dumps(to_otlp(trace)).encode()
+        try:
+            req = Request(url, data=body, headers={"Content-Type": "application/json"})
+            with urlopen(req, timeout=5):
+                pass
+        except Exception as e:
+            logger.debug("OTLP export failed: %s", e)